@@ -13,4 +13,16 @@ APP_SETTINGS = {
     },
     "description": """Un editor di glossario per LaTeX che semplifica la creazione e la gestione di definizioni e abbreviazioni in documenti tecnici e scientifici. Supporta la formattazione matematica, la gestione di categorie e l'esportazione in formato LaTeX.""",
     "github_url": "https://github.com/AntonioDEM/LaTeX-Glossary-Editor",
-}
\ No newline at end of file
+}
+
+"""
+Impostazioni delle prestazioni
+"""
+PERFORMANCE_SETTINGS = {
+    # Progetti recenti mantenuti aperti (connessioni, cache e stato della vista)
+    "recent_projects_max": 6,
+    # Memoria massima stimata per le cache dei progetti recenti (MB)
+    "recent_projects_max_memory_mb": 64,
+    # Manutenzione leggera (PRAGMA optimize, incremental vacuum) alla chiusura di un progetto
+    "maintenance_on_close": False,
+}
@@ -0,0 +1,83 @@
+"""
+Confronta l'ordinamento di 100.000 chiavi con ORDER BY binario, con la collation
+ITALIAN (chiavi di ordinamento in cache fredda e calda) e con la colonna sort_key indicizzata.
+
+Uso: python benchmarks/bench_collation.py [numero_chiavi]
+"""
+import sys
+import time
+import random
+
+from common import create_sample_database
+from src.collation import connect, collation_key
+from src.latex_text import make_sort_key
+
+PREFIXES = ['àncora', 'Ancora', 'perché', 'Perche', 'città', 'Città', 'élite', 'Elite',
+            'caffè', 'zucchero', 'Università', 'unità', 'però', 'Òmega', 'omega']
+
+
+def italian_keys(n_keys):
+    """Chiavi con accenti e maiuscole mescolate"""
+    rng = random.Random(42)
+    return [f"{rng.choice(PREFIXES)}{i:06d}" for i in rng.sample(range(n_keys), n_keys)]
+
+
+# Chiavi scritte con gli accenti LaTeX e la chiave di ordinamento attesa
+LATEX_ACCENTS = {
+    "perch\\'e": 'perche', 'citt\\`{a}': 'citta', '\\textbf{Universit\\`a}': 'universita',
+    '\\"{\\i}': 'i', "\\'{E}lite": 'elite', '\\^o \\~n \\=a \\.z': 'o n a z',
+}
+
+
+def check_latex_accents():
+    """Le chiavi con accenti LaTeX devono ordinarsi come quelle con le lettere accentate"""
+    for text, expected in LATEX_ACCENTS.items():
+        assert make_sort_key(text) == expected, f"{text!r}: {make_sort_key(text)!r} != {expected!r}"
+    print(f"Accenti LaTeX: {len(LATEX_ACCENTS)} chiavi di ordinamento corrette")
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {time.perf_counter() - start:6.3f} s")
+    return result
+
+
+def main():
+    n_keys = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    check_latex_accents()
+    db = create_sample_database(0, 1)
+    keys = italian_keys(n_keys)
+    category = 'Generale'
+    with connect(db.db_path) as conn:
+        cursor = conn.cursor()
+        category_id = cursor.execute(
+            'SELECT id FROM categories WHERE name = ?', (category,)).fetchone()[0]
+        cursor.executemany('''
+            INSERT INTO entries (category_id, key, canonical_key, name, first, text, sort_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(category_id, key, key.lower(), key, key, key, None) for key in keys])
+        conn.commit()
+    timed("backfill sort_key", db.backfill_plain_text)
+
+    query = 'SELECT key FROM entries WHERE category_id = ? ORDER BY '
+    with connect(db.db_path) as conn:
+        cursor = conn.cursor()
+        binary = timed("ORDER BY key (binario)", lambda: cursor.execute(
+            query + 'key', (category_id,)).fetchall())
+        collation_key.cache_clear()
+        timed("ORDER BY key COLLATE ITALIAN (fredda)", lambda: cursor.execute(
+            query + 'key COLLATE ITALIAN', (category_id,)).fetchall())
+        italian = timed("ORDER BY key COLLATE ITALIAN (calda)", lambda: cursor.execute(
+            query + 'key COLLATE ITALIAN', (category_id,)).fetchall())
+        timed("ORDER BY sort_key (indice)", lambda: cursor.execute(
+            query + 'sort_key, key COLLATE ITALIAN', (category_id,)).fetchall())
+        timed("sorted() in Python", lambda: sorted(keys, key=collation_key))
+
+    print(f"Prime chiavi (binario):  {[row[0] for row in binary[:4]]}")
+    print(f"Prime chiavi (ITALIAN):  {[row[0] for row in italian[:4]]}")
+    print(f"Chiavi in cache: {collation_key.cache_info().currsize}")
+
+
+if __name__ == "__main__":
+    main()
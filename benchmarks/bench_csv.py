@@ -0,0 +1,70 @@
+"""
+Importa un foglio CSV di 100.000 sigle con intestazioni personalizzate (mappatura
+delle colonne), poi esporta in CSV e TSV e reimporta verificando il giro completo.
+
+Uso: python benchmarks/bench_csv.py [numero_righe]
+"""
+import os
+import sys
+import csv
+import time
+import sqlite3
+import tempfile
+
+from common import create_sample_database
+from src.glossary_db import GlossaryDatabase
+
+MAPPING = {'Sigla': 'key', 'Forma estesa': 'first', 'Descrizione': 'description',
+           'Area': 'category', 'Matematica': 'is_math'}
+
+
+def write_sheet(path, n_rows):
+    """Foglio come lo mantengono i terminologi, con qualche riga non valida"""
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Sigla', 'Forma estesa', 'Descrizione', 'Area', 'Matematica', 'Note'])
+        for i in range(n_rows):
+            key = f"SIG{i:06d}" if i % 1000 else ''  # una riga su mille senza sigla
+            writer.writerow([key, f"Sigla numero {i}", f"Descrizione, con virgola, {i}",
+                             f"Area {i % 10}", 'sì' if i % 50 == 0 else '', 'ignorata'])
+
+
+def timed(label, n_rows, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:6.2f} s  ({n_rows / elapsed:8.0f} righe/s)")
+    return result
+
+
+def snapshot(db):
+    with sqlite3.connect(db.db_path) as conn:
+        return sorted(conn.execute('''
+            SELECT c.name, c.group_name, c.comment, e.key, e.type, e.name, e.first, e.text,
+                   e.description, e.is_math, e.format_flags
+            FROM entries e JOIN categories c ON e.category_id = c.id
+        ''').fetchall())
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    directory = tempfile.mkdtemp(prefix="glossary_csv_")
+    sheet = os.path.join(directory, "sigle.csv")
+    write_sheet(sheet, n_rows)
+
+    db = create_sample_database(0, 1, directory)
+    result = timed("import_from_csv (mappatura)", n_rows,
+                   lambda: db.import_from_csv(sheet, MAPPING))
+    print(f"  importate {result['imported']}, categorie {result['categories']}, "
+          f"errori {len(result['errors'])} (es. {result['errors'][:1]})")
+
+    for extension in ('.csv', '.tsv'):
+        path = os.path.join(directory, f"export{extension}")
+        timed(f"export_to_csv ({extension})", n_rows, lambda: db.export_to_csv(path))
+        copy = GlossaryDatabase(os.path.join(directory, f"copy{extension}.db"))
+        timed(f"import_from_csv ({extension})", n_rows, lambda: copy.import_from_csv(path))
+        print(f"  giro senza perdite: {snapshot(db) == snapshot(copy)}")
+
+
+if __name__ == "__main__":
+    main()
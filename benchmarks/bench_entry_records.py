@@ -0,0 +1,41 @@
+"""
+Confronta memoria e tempi di get_all_entries (lista di dict)
+con get_entry_records (EntryRecord compatti).
+
+Uso: python benchmarks/bench_entry_records.py [numero_definizioni]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from common import create_sample_database
+
+
+def measure(label, func):
+    """Misura tempo e memoria allocata dal risultato di func"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {len(result):>8} righe  {elapsed:7.3f} s  "
+          f"memoria {current / 1024 / 1024:7.1f} MB  picco {peak / 1024 / 1024:7.1f} MB")
+    return result
+
+
+def main():
+    n_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Creazione database con {n_entries} definizioni...")
+    db = create_sample_database(n_entries)
+
+    dicts = measure("get_all_entries", db.get_all_entries)
+    del dicts
+    records = measure("get_entry_records", db.get_entry_records)
+    del records
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Esporta 100.000 definizioni in JSON Lines, le reimporta in un database vuoto e
+verifica che il giro sia senza perdite; per confronto misura export_to_latex.
+
+Uso: python benchmarks/bench_jsonl.py [numero_definizioni]
+"""
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+
+from common import create_sample_database
+from src.glossary_db import GlossaryDatabase
+from src.jsonl_io import export_jsonl, import_jsonl
+
+COLUMNS = ('c.name', 'c.group_name', 'c.comment', 'e.key', 'e.type', 'e.name', 'e.first',
+           'e.text', 'e.description', 'e.is_math', 'e.format_flags')
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<30} {time.perf_counter() - start:6.2f} s")
+    return result
+
+
+def snapshot(db):
+    """Contenuto confrontabile del database, indipendente da id e date"""
+    with sqlite3.connect(db.db_path) as conn:
+        return sorted(conn.execute(f'''
+            SELECT {', '.join(COLUMNS)} FROM entries e JOIN categories c ON e.category_id = c.id
+        ''').fetchall())
+
+
+def main():
+    n_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    source = create_sample_database(n_entries, 20)
+    with sqlite3.connect(source.db_path) as conn:
+        # Formattazione e metadati di categoria variati, per verificare che non si perdano
+        conn.execute('UPDATE entries SET format_flags = (id % 6) * 0x10101 + 0x201000 WHERE id % 3 = 0')
+        conn.execute("UPDATE categories SET group_name = 'gruppo', comment = 'Commento ' || id")
+    source.backfill_plain_text()
+
+    directory = tempfile.mkdtemp(prefix="glossary_jsonl_")
+    jsonl_path = os.path.join(directory, "glossario.jsonl")
+    timed("export_jsonl", lambda: export_jsonl(source, jsonl_path))
+    print(f"{'dimensione file':<30} {os.path.getsize(jsonl_path) / 1024 / 1024:6.1f} MB")
+
+    target = GlossaryDatabase(os.path.join(directory, "target.db"))
+    result = timed("import_jsonl", lambda: import_jsonl(target, jsonl_path))
+    timed("import_jsonl (aggiornamento)", lambda: import_jsonl(target, jsonl_path))
+    timed("export_to_latex (confronto)", source.export_to_latex)
+
+    identical = snapshot(source) == snapshot(target)
+    print(f"Definizioni importate: {result['imported']}, errori: {len(result['errors'])}, "
+          f"giro senza perdite: {identical}")
+
+
+if __name__ == "__main__":
+    main()
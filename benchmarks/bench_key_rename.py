@@ -0,0 +1,44 @@
+"""
+Rinomina 50 chiavi in un albero di 2.000 sorgenti LaTeX generato: prima in prova
+(diff), poi applicando le modifiche, in sequenza e con il pool di processi.
+
+Uso: python benchmarks/bench_key_rename.py [numero_file]
+"""
+import os
+import sys
+import shutil
+import random
+import tempfile
+
+from common import create_sample_database
+from bench_usage_scan import write_tree, timed
+from src.key_rename import KeyRenamer, format_rename_report
+
+RENAMES = {f"key{i:06d}": f"chiave{i:06d}" for i in range(0, 10_000, 200)}
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source = tempfile.mkdtemp(prefix="glossary_tree_")
+    write_tree(source, n_files, 10_000, random.Random(42))
+
+    for label, threshold in (("sequenziale", sys.maxsize), (f"{os.cpu_count()} processi", 16)):
+        tree = tempfile.mkdtemp(prefix="glossary_rename_")
+        shutil.rmtree(tree)
+        shutil.copytree(source, tree)
+        db = create_sample_database(10_000, 20)
+        renamer = KeyRenamer(db, parallel_threshold=threshold)
+
+        def summary(report):
+            return {'file': len(report['files']), 'riferimenti': report['replacements'],
+                    'definizioni': report['entries']}
+
+        timed(f"prova ({label})", lambda: summary(renamer.rename(RENAMES, tree, dry_run=True)))
+        reports = []
+        timed(f"applica ({label})", lambda: summary(
+            reports.append(renamer.rename(RENAMES, tree, dry_run=False)) or reports[-1]))
+    print(format_rename_report(reports[-1], slowest=5))
+
+
+if __name__ == "__main__":
+    main()
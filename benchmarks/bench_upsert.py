@@ -0,0 +1,82 @@
+"""
+Confronta 10.000 salvataggi ripetuti con il vecchio percorso DELETE + INSERT
+e con GlossaryDatabase.upsert_entry (INSERT ... ON CONFLICT DO UPDATE).
+
+Uso: python benchmarks/bench_upsert.py [numero_salvataggi]
+"""
+import os
+import sys
+import time
+import sqlite3
+
+from common import create_sample_database
+
+FORMATS = {
+    'name': {'format_type': '\\textbf{}', 'is_math_mode': False, 'first_letter_bold': False},
+    'text': {'format_type': '\\textbf{}', 'is_math_mode': False, 'first_letter_bold': False},
+    'first': {'format_type': 'Normale', 'is_math_mode': False, 'first_letter_bold': True},
+}
+
+
+def entry_data(i):
+    key = f"save{i % 100:03d}"
+    return {
+        'key': key, 'type': '\\acronymtype', 'name': f"\\textbf{{{key}}}",
+        'first': f"\\textbf{{S}}alvataggio {i}", 'text': f"\\textbf{{{key}}}",
+        'description': f"Salvataggio ripetuto numero {i}", 'is_math': 0
+    }
+
+
+def legacy_save(db, category_id, data):
+    """Vecchio percorso di save_entry: elimina e reinserisce la riga"""
+    with sqlite3.connect(db.db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM entries WHERE category_id = ? AND LOWER(key) = LOWER(?)',
+                       (category_id, data['key']))
+        cursor.execute('''
+            INSERT INTO entries
+            (definition_id, category_id, key, type, name, first, text, description, is_math)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (f"DEF_{os.urandom(4).hex()}", category_id, data['key'], data['type'], data['name'],
+              data['first'], data['text'], data['description'], data['is_math']))
+        entry_id = cursor.lastrowid
+        for field_name, values in FORMATS.items():
+            cursor.execute('''
+                INSERT OR REPLACE INTO formatting_options
+                (entry_id, field_name, format_type, is_math_mode, first_letter_bold)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (entry_id, field_name, values['format_type'], values['is_math_mode'],
+                  values['first_letter_bold']))
+        conn.commit()
+
+
+def table_stats(db):
+    with sqlite3.connect(db.db_path) as conn:
+        cursor = conn.cursor()
+        max_id = cursor.execute('SELECT MAX(id) FROM entries').fetchone()[0]
+        formats = cursor.execute('SELECT COUNT(*) FROM formatting_options').fetchone()[0]
+    return max_id, formats, os.path.getsize(db.db_path)
+
+
+def main():
+    n_saves = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    for label in ("DELETE + INSERT", "upsert_entry"):
+        db = create_sample_database(10_000, 5)
+        category = "Generale"
+        category_id = db.cache.get_category_id(category)
+        start = time.perf_counter()
+        for i in range(n_saves):
+            if label == "upsert_entry":
+                db.upsert_entry(category, entry_data(i), FORMATS)
+            else:
+                legacy_save(db, category_id, entry_data(i))
+        elapsed = time.perf_counter() - start
+        max_id, formats, size = table_stats(db)
+        print(f"{label:<16} {n_saves} salvataggi in {elapsed:6.2f} s "
+              f"({n_saves / elapsed:6.0f}/s)  max id {max_id}  "
+              f"righe formatting_options {formats}  dimensione {size / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Scansiona un albero di sorgenti LaTeX generato (2.000 file più alcuni file grandi)
+in sequenza e con il pool di processi, poi misura le scansioni incrementali:
+nessuna modifica, file solo toccati (mtime) e file modificati.
+
+Uso: python benchmarks/bench_usage_scan.py [numero_file]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from pathlib import Path
+
+from common import create_sample_database
+from src.usage_scanner import UsageScanner
+
+COMMANDS = ['gls', 'Gls', 'glspl', 'acrshort', 'acrlong', 'acrfull', 'glsadd']
+
+
+def write_tree(root, n_files, n_keys, rng):
+    """Capitoli con testo e riferimenti; ogni 500 file uno grande (circa 4 MB)"""
+    paragraph = "Testo del paragrafo con un po' di contenuto e qualche formula $x^2$.\n"
+    for i in range(n_files):
+        directory = Path(root) / f"capitolo{i % 50:02d}"
+        directory.mkdir(exist_ok=True)
+        repeat = 2000 if i % 500 == 0 else 20
+        lines = []
+        for _ in range(repeat):
+            lines.append(paragraph * 5)
+            lines.append(f"Si veda \\{rng.choice(COMMANDS)}{{key{rng.randrange(n_keys):06d}}}.\n")
+            lines.append(f"% \\gls{{commentata{rng.randrange(10)}}}\n")
+        (directory / f"sezione{i:05d}.tex").write_text(''.join(lines), encoding='utf-8')
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<34} {time.perf_counter() - start:6.2f} s  {result}")
+    return result
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(42)
+    root = tempfile.mkdtemp(prefix="glossary_tree_")
+    write_tree(root, n_files, 10_000, rng)
+    size = sum(path.stat().st_size for path in Path(root).rglob('*.tex'))
+    print(f"{n_files} file, {size / 1024 / 1024:.0f} MB")
+
+    def report(result):
+        return {k: result[k] for k in ('scanned', 'unchanged', 'removed', 'references')}
+
+    sequential_db = create_sample_database(10_000, 20)
+    sequential = UsageScanner(sequential_db.db_path, parallel_threshold=sys.maxsize)
+    timed("scansione completa (sequenziale)", lambda: report(sequential.scan(root)))
+
+    db = create_sample_database(10_000, 20)
+    scanner = UsageScanner(db.db_path)
+    timed(f"scansione completa ({os.cpu_count()} processi)", lambda: report(scanner.scan(root)))
+    timed("nessuna modifica", lambda: report(scanner.scan(root)))
+
+    files = sorted(Path(root).rglob('*.tex'))
+    for path in files[:100]:
+        os.utime(path, (time.time() + 10, time.time() + 10))
+    timed("100 file solo toccati", lambda: report(scanner.scan(root)))
+    for path in files[100:200]:
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write("\\gls{key000001}\n")
+    timed("100 file modificati", lambda: report(scanner.scan(root)))
+
+    print(f"Definizioni non usate: {len(scanner.unused_entries())}, "
+          f"chiavi non definite: {len(scanner.undefined_keys())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import sqlite3
+import tempfile
+from pathlib import Path
+
+# Permette di eseguire i benchmark direttamente dalla cartella del progetto
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.glossary_db import GlossaryDatabase
+
+
+def create_sample_database(n_entries=100_000, n_categories=20, directory=None):
+    """
+    Crea un database temporaneo popolato con definizioni di prova
+    Args:
+        n_entries (int): Numero di definizioni da inserire
+        n_categories (int): Numero di categorie su cui distribuirle
+        directory (str): Cartella in cui creare il database (default: temporanea)
+    Returns:
+        GlossaryDatabase: Il database popolato
+    """
+    directory = directory or tempfile.mkdtemp(prefix="glossary_bench_")
+    db = GlossaryDatabase(os.path.join(directory, "bench.db"))
+
+    with sqlite3.connect(db.db_path) as conn:
+        cursor = conn.cursor()
+        categories = []
+        for i in range(n_categories):
+            name = f"Categoria {i:03d}"
+            cursor.execute('INSERT OR IGNORE INTO categories (name, category_id) VALUES (?, ?)',
+                           (name, f"CAT_BENCH_{i:03d}"))
+            cursor.execute('SELECT id FROM categories WHERE name = ?', (name,))
+            categories.append(cursor.fetchone()[0])
+
+        cursor.executemany('''
+            INSERT INTO entries
+            (definition_id, category_id, key, canonical_key, type, name, first, text,
+             description, is_math)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            (
+                f"DEF_{i:08x}",
+                categories[i % n_categories],
+                f"key{i:06d}",
+                f"key{i:06d}",
+                '\\acronymtype',
+                f"\\textbf{{K{i}}}",
+                f"\\textbf{{K}}ey numero {i}",
+                f"\\textbf{{K{i}}}",
+                f"Descrizione della definizione numero {i}",
+                0
+            )
+            for i in range(n_entries)
+        ))
+        conn.commit()
+    return db
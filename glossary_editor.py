@@ -3,23 +3,42 @@ from tkinter import ttk, messagebox, filedialog
 import time
 from datetime import datetime
 import sqlite3
+import csv
 import re
 import os
+import threading
+import queue
 from src.glossary_db import GlossaryDatabase
+from src.entry_record import canonical_key
+from src.collation import connect
 from src.db_manager import DatabaseManager
-from src.options_write import FormatDatabase, FormatManager, FormatWidgets
+from src.options_write import FormatDatabase, FormatManager, FormatWidgets, unpack_formats
 from src.glossary_os_handler import GlossaryOSHandler
 from src.project_manager import ProjectDialog
 from src.project_manager import ProjectManager
+from src.profiler import CommandProfiler
+from src.latency_monitor import LatencyMonitor
+from src.key_index import PrefixIndex
+from src.project_pool import ProjectPool, ProjectHandle
+from src.global_search import GlobalSearchDialog
+from src.duplicate_detector import DuplicateReportDialog
+from src.db_maintenance import DatabaseMaintenance, format_report
+from src.snapshots import SnapshotDialog
+from src.jsonl_io import export_jsonl, import_jsonl, JSONL_EXTENSION
+from src.csv_mapping import CsvMappingDialog
+from src.glossary_usage import export_used_entries
+from src.usage_scanner import UsageDialog
+from src.key_rename import RenameDialog
 from abt.about_window import AboutWindow  # Updated import path
 # In abt/about_window.py
-from abt.info import APP_SETTINGS
+from abt.info import APP_SETTINGS, PERFORMANCE_SETTINGS
 
 
 class DatabaseViewer(ttk.Frame):
     def __init__(self, parent, db):
             ttk.Frame.__init__(self, parent)
             self.db = db
+            self.rows = None
             print("\n=== Debug: Inizializzazione DatabaseViewer ===")
             print(f"Database path: {self.db.db_path if self.db else 'None'}")
             self.setup_ui()
@@ -82,11 +101,8 @@ class DatabaseViewer(ttk.Frame):
             return
         print("\n=== Debug: Aggiornamento vista database ===")
                 
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-                
         try:
-            with sqlite3.connect(self.db.db_path) as conn:
+            with connect(self.db.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT e.id, c.name, e.key, e.type, e.name, 
@@ -94,26 +110,12 @@ class DatabaseViewer(ttk.Frame):
                         c.group_name, c.comment
                     FROM entries e
                     JOIN categories c ON e.category_id = c.id
-                    ORDER BY c.name, e.key
+                    ORDER BY c.name COLLATE ITALIAN, e.sort_key, e.key COLLATE ITALIAN
                 ''')
                 
                 rows = cursor.fetchall()
                 print(f"Recuperate {len(rows)} righe")
-                for row in rows:
-                    values = [
-                        row[0],              # ID
-                        row[1],              # Categoria
-                        row[2],              # Chiave
-                        row[3],              # Tipo
-                        row[4],              # Nome
-                        row[5],              # First
-                        row[6],              # Testo
-                        row[7],              # Descrizione
-                        row[8],              # Gruppo (dalla tabella categories)
-                        row[9]               # Commento
-                    ]
-                    print(f"Inserimento riga - Categoria: {values[1]}, Chiave: {values[2]}, Gruppo: {values[8]}")
-                    self.tree.insert('', 'end', values=values)
+                self.show_rows(rows)
                         
             print("Aggiornamento vista completato")
                     
@@ -124,6 +126,27 @@ class DatabaseViewer(ttk.Frame):
             
                 print("===============================\n")
 
+    def show_rows(self, rows):
+        """Mostra le righe nella vista (usato anche per ripristinare un progetto recente)"""
+        self.rows = rows
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        for row in rows:
+            values = [
+                row[0],              # ID
+                row[1],              # Categoria
+                row[2],              # Chiave
+                row[3],              # Tipo
+                row[4],              # Nome
+                row[5],              # First
+                row[6],              # Testo
+                row[7],              # Descrizione
+                row[8],              # Gruppo (dalla tabella categories)
+                row[9]               # Commento
+            ]
+            print(f"Inserimento riga - Categoria: {values[1]}, Chiave: {values[2]}, Gruppo: {values[8]}")
+            self.tree.insert('', 'end', values=values)
+
 class GlossaryEditor(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -146,6 +169,15 @@ class GlossaryEditor(tk.Tk):
         self.db = None # Sarà inizializzato quando si carica un progetto
         self.db_manager = None
         self.current_project = None
+
+        # Progetti recenti mantenuti aperti per un cambio progetto rapido
+        self.project_pool = ProjectPool(
+            max_projects=PERFORMANCE_SETTINGS["recent_projects_max"],
+            max_memory_mb=PERFORMANCE_SETTINGS["recent_projects_max_memory_mb"],
+            maintenance_on_close=PERFORMANCE_SETTINGS["maintenance_on_close"]
+        )
+        self.maintenance_on_close = tk.BooleanVar(value=self.project_pool.maintenance_on_close)
+        self._maintenance_queue = queue.Queue()
         
         # Inizializza le variabili
         self.category_var = tk.StringVar()
@@ -155,6 +187,12 @@ class GlossaryEditor(tk.Tk):
         self.current_category = self.category_var
         self.current_file = tk.StringVar(value="Nessun file selezionato")
 
+        # Filtro della lista definizioni: indice per prefisso e popolamento a blocchi
+        self.filter_var = tk.StringVar()
+        self.key_index = PrefixIndex()
+        self.selected_entry_key = None
+        self._populate_job = None
+
 
         # Initialize database
         self.db = GlossaryDatabase()
@@ -164,10 +202,20 @@ class GlossaryEditor(tk.Tk):
         
         # Contenitore per i campi di input
         self.fields = {}
+
+        # Profilazione su richiesta dei comandi (variabile d'ambiente o menu Help)
+        self.profiler = CommandProfiler()
+        self.profiling_enabled = tk.BooleanVar(value=self.profiler.enabled)
+        # Monitor dei blocchi del ciclo degli eventi
+        self.latency_monitor = LatencyMonitor(self)
+        self._instrument_commands()
         
         # Crea l'interfaccia
         self.create_menu()
         
+        # Barra di stato con la latenza del ciclo degli eventi
+        self.create_status_bar()
+
         # Create notebook for tabs
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -189,9 +237,75 @@ class GlossaryEditor(tk.Tk):
         # Aggiungi il gestore per la chiusura della finestra
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+        # Avvia il monitoraggio della latenza
+        self.latency_monitor.start()
+
          # Se non c'è nessun progetto aperto, mostra il dialog dei progetti
         self.show_project_dialog()
     
+    # Comandi dell'interfaccia da profilare quando la profilazione è attiva
+    PROFILED_COMMANDS = (
+        'save_entry', 'delete_entry', 'import_latex_file', 'export_latex_file',
+        'load_project', 'on_category_select', 'on_entry_select',
+    )
+
+    def _instrument_commands(self):
+        """Avvolge i comandi dell'interfaccia prima che vengano collegati ai widget"""
+        for name in self.PROFILED_COMMANDS:
+            command = self.profiler.wrap(name, getattr(self, name))
+            setattr(self, name, self.latency_monitor.track(name, command))
+
+    def create_status_bar(self):
+        """Crea la barra di stato con la latenza attuale e massima"""
+        status_bar = ttk.Frame(self, relief=tk.SUNKEN)
+        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.latency_var = tk.StringVar(value="Latenza: 0 ms (max 0 ms)")
+        ttk.Label(status_bar, textvariable=self.latency_var).pack(side=tk.RIGHT, padx=5)
+        self.latency_monitor.listeners.append(self.update_latency_status)
+        self.category_status_var = tk.StringVar(value="")
+        ttk.Label(status_bar, textvariable=self.category_status_var).pack(side=tk.LEFT, padx=5)
+
+    def update_category_status(self):
+        """Mostra nella barra di stato il riepilogo della categoria selezionata"""
+        category = self.category_var.get()
+        summary = self.db.get_category_summary(category) if self.db and category else None
+        if not summary:
+            self.category_status_var.set("")
+            return
+        text = f"{category}: {summary['entry_count']} definizioni ({summary['math_count']} matematiche)"
+        if summary['last_modified']:
+            text += f", ultima modifica {summary['last_modified']}"
+        self.category_status_var.set(text)
+
+    def update_latency_status(self, current_ms, max_ms):
+        """Aggiorna la barra di stato con i valori del monitor"""
+        self.latency_var.set(f"Latenza: {current_ms:.0f} ms (max {max_ms:.0f} ms)")
+
+    def export_latency_history(self):
+        """Esporta lo storico dei blocchi dell'interfaccia"""
+        log_dir = self.os_handler.get_log_directory()
+        log_dir.mkdir(parents=True, exist_ok=True)
+        filename = filedialog.asksaveasfilename(
+            initialdir=log_dir,
+            initialfile=f"latenze_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            defaultextension=".json",
+            filetypes=[("File JSON", "*.json"), ("Tutti i file", "*.*")]
+        )
+        if filename:
+            try:
+                self.latency_monitor.export_history(filename)
+                messagebox.showinfo("Successo", "Storico latenze esportato correttamente")
+            except Exception as e:
+                messagebox.showerror("Errore", f"Errore durante l'esportazione: {str(e)}")
+
+    def toggle_profiling(self):
+        """Attiva o disattiva la profilazione dei comandi"""
+        self.profiler.enabled = self.profiling_enabled.get()
+        if self.profiler.enabled:
+            messagebox.showinfo("Profilazione",
+                                f"Profilazione attiva. I profili verranno salvati in:\n"
+                                f"{self.profiler.get_profile_directory()}")
+
     def open_data_folder(self):
         """Apre la cartella dei dati dell'applicazione"""
         import os
@@ -212,13 +326,29 @@ class GlossaryEditor(tk.Tk):
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Gestione Progetti", command=self.show_project_dialog)  # Aggiunto
+        file_menu.add_command(label="Cerca in tutti i progetti", command=self.show_global_search)
         file_menu.add_separator()  # Aggiunto
         #file_menu.add_command(label="Importa da LaTeX", command=self.import_latex_file)
         file_menu.add_command(label="Esporta in LaTeX", command=self.export_latex_file)
+        file_menu.add_command(label="Esporta per bib2gls (.bib)", command=self.export_bib_file)
+        file_menu.add_command(label="Esporta definizioni usate dal documento",
+                              command=self.export_used_entries_file)
+        file_menu.add_command(label="Importa da JSONL", command=self.import_jsonl_file)
+        file_menu.add_command(label="Esporta in JSONL", command=self.export_jsonl_file)
+        file_menu.add_command(label="Importa da CSV/TSV", command=self.import_csv_file)
+        file_menu.add_command(label="Esporta in CSV/TSV", command=self.export_csv_file)
         file_menu.add_separator()
         file_menu.add_command(label="Nuova Categoria", command=self.new_category)
         file_menu.add_command(label="Elimina Categoria", command=self.delete_category)
         file_menu.add_command(label="Pulisci Gruppi", command=self.db.cleanup_group_names)
+        file_menu.add_command(label="Trova Duplicati", command=self.show_duplicates)
+        file_menu.add_command(label="Uso delle Definizioni nei Sorgenti", command=self.show_usage)
+        file_menu.add_command(label="Rinomina Chiavi", command=self.show_rename_keys)
+        file_menu.add_command(label="Manutenzione Database", command=self.run_maintenance)
+        file_menu.add_command(label="Snapshot e Ripristino", command=self.show_snapshots)
+        file_menu.add_checkbutton(label="Manutenzione alla chiusura del progetto",
+                                  variable=self.maintenance_on_close,
+                                  command=self.toggle_maintenance_on_close)
         file_menu.add_separator()
         file_menu.add_command(label="Apri Cartella Dati", command=self.open_data_folder)
         file_menu.add_separator()
@@ -227,17 +357,20 @@ class GlossaryEditor(tk.Tk):
         # Menu Help
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
+        help_menu.add_checkbutton(label="Profilazione comandi", variable=self.profiling_enabled,
+                                  command=self.toggle_profiling)
+        help_menu.add_command(label="Esporta storico latenze", command=self.export_latency_history)
+        help_menu.add_command(label="Azzera storico latenze", command=self.latency_monitor.reset)
+        help_menu.add_separator()
         help_menu.add_command(label="About", command=self.show_about)
     
     def load_project(self, project_name):
-        # Close existing connections
-        if self.db_manager:
-            self.db_manager.close()
-        if hasattr(self, 'db_viewer') and self.db_viewer.db:
-            self.db_viewer.db = None
-        """Carica un progetto esistente"""
+        """Carica un progetto esistente (o lo riprende dai progetti recenti)"""
         project = self.project_manager.get_project(project_name)
         if project:
+            # Salva lo stato della vista del progetto che si sta lasciando
+            self._save_view_state()
+
             # Aggiorna il titolo con il nome del progetto
             self.title(f"LaTeX Glossary Editor - {project[1]}")
 
@@ -249,25 +382,90 @@ class GlossaryEditor(tk.Tk):
             # Ottieni il percorso del database del progetto
             db_path = self.os_handler.get_database_path(project[4])  # project[4] è database_name
             
-            # Inizializza database e manager con il path corretto
-            self.db = GlossaryDatabase(db_path)
-            self.db_manager = DatabaseManager(db_path)
-            self.db_manager.connect()
-            
-            # Aggiorna l'interfaccia 
-            self.update_category_list()
+            handle = self.project_pool.get(project[1])
+            if handle is not None and str(handle.db.db_path) == str(db_path):
+                # Progetto recente: connessione e cache sono già pronte
+                print(f"Progetto '{project[1]}' ripreso dai progetti recenti")
+                cache_reloaded = handle.db.cache.ensure_fresh()
+            else:
+                # Inizializza database e manager con il path corretto
+                db = GlossaryDatabase(db_path)
+                db_manager = DatabaseManager.standalone(db_path)
+                db_manager.connect()
+
+                # Popola la cache in memoria del progetto
+                db.cache.load()
+                handle = ProjectHandle(project[1], db, db_manager)
+                cache_reloaded = True
+
+                # Progetti creati con versioni precedenti: calcola il testo semplice
+                if db.count_missing_plain_text():
+                    threading.Thread(target=db.backfill_plain_text, daemon=True).start()
+            self.project_pool.put(handle)
+
+            self.db = handle.db
+            self.db_manager = handle.db_manager
             
             # Salva il riferimento al progetto corrente
             self.current_project = project
+
+            # Ripristina categoria, filtro e selezione del progetto
+            state = handle.view_state
+            self.category_var.set(state.get('category', ''))
+            self.filter_var.set(state.get('filter', ''))
+            self.selected_entry_key = state.get('selected_key')
+
+            # Aggiorna l'interfaccia 
+            self.update_category_list()
+            if self.category_var.get() not in self.category_combo['values']:
+                self.category_var.set('')
+                self.update_category_list()
+            else:
+                self.on_category_select()
             
             # Aggiorna la vista del database
             if hasattr(self, 'db_viewer'):
                 self.db_viewer.db = self.db  # Aggiorna il riferimento al database
-                self.db_viewer.update_view()
+                if handle.viewer_rows is not None and not cache_reloaded:
+                    self.db_viewer.show_rows(handle.viewer_rows)
+                else:
+                    self.db_viewer.update_view()
                 
             return True
         return False
 
+    def _save_view_state(self):
+        """Memorizza lo stato della vista del progetto corrente nel suo handle"""
+        if not self.current_project:
+            return
+        handle = self.project_pool.get(self.current_project[1])
+        if handle is None:
+            return
+        handle.view_state = {
+            'category': self.category_var.get(),
+            'filter': self.filter_var.get(),
+            'selected_key': self.selected_entry_key,
+        }
+        if hasattr(self, 'db_viewer'):
+            handle.viewer_rows = self.db_viewer.rows
+
+    def refresh_project_stats(self, last_import_seconds=None):
+        """Aggiorna in background le statistiche in cache del progetto corrente"""
+        if not self.current_project:
+            return
+        self.update_category_status()
+        threading.Thread(
+            target=self.project_manager.refresh_project_stats,
+            args=(self.current_project[1], last_import_seconds),
+            daemon=True
+        ).start()
+
+    def forget_project(self, project_name):
+        """Chiude un progetto recente (es. dopo la sua eliminazione)"""
+        if self.current_project and self.current_project[1] == project_name:
+            return
+        self.project_pool.discard(project_name)
+
     def show_project_dialog(self):
         """Mostra la finestra di gestione progetti"""
         from src.project_manager import ProjectDialog
@@ -293,6 +491,140 @@ class GlossaryEditor(tk.Tk):
             project_name = dialog.project_list.item(item)['text']
             self.load_project(project_name)
 
+    def show_global_search(self):
+        """Mostra la finestra di ricerca in tutti i progetti"""
+        GlobalSearchDialog(self, self.project_manager)
+
+    def show_duplicates(self):
+        """Mostra il rapporto delle definizioni duplicate del progetto corrente"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+        DuplicateReportDialog(self, self.db.db_path)
+
+    def run_maintenance(self):
+        """Esegue in background la manutenzione del database del progetto corrente"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+        maintenance = DatabaseMaintenance(self.db.db_path)
+        stats = maintenance.page_stats()
+        convert = False
+        if stats['auto_vacuum'] != 2:
+            convert = messagebox.askyesno(
+                "Manutenzione",
+                "Il database non usa l'incremental vacuum: lo spazio delle definizioni "
+                f"eliminate ({stats['free_bytes'] / 1024:.0f} KB liberi) non viene restituito.\n"
+                "Convertirlo ora? Serve un VACUUM completo, una sola volta.")
+
+        def worker():
+            try:
+                self._maintenance_queue.put(('ok', maintenance.run(convert=convert)))
+            except sqlite3.Error as e:
+                self._maintenance_queue.put(('error', str(e)))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.category_status_var.set("Manutenzione del database in corso...")
+        self.after(200, self._poll_maintenance_queue)
+
+    def _poll_maintenance_queue(self):
+        """Mostra il rapporto della manutenzione quando il thread ha terminato"""
+        try:
+            status, result = self._maintenance_queue.get_nowait()
+        except queue.Empty:
+            self.after(200, self._poll_maintenance_queue)
+            return
+        self.update_category_status()
+        if status == 'ok':
+            messagebox.showinfo("Manutenzione completata", format_report(result))
+        else:
+            messagebox.showerror("Errore", f"Errore durante la manutenzione: {result}")
+
+    def show_usage(self):
+        """Mostra dove sono citate le definizioni nei sorgenti del documento"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+        UsageDialog(self, self.db.db_path)
+
+    def show_rename_keys(self):
+        """Rinomina chiavi nel progetto e nei riferimenti dei sorgenti LaTeX"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+        RenameDialog(self, self.db, self.fields['key'].get().strip())
+
+    def on_keys_renamed(self, renames):
+        """
+        Aggiorna lista, indice delle chiavi e modulo dopo una rinomina
+        Args:
+            renames (dict): chiave canonica vecchia -> chiave nuova
+        """
+        if self.selected_entry_key:
+            self.selected_entry_key = renames.get(canonical_key(self.selected_entry_key),
+                                                  self.selected_entry_key)
+        filter_key = renames.get(canonical_key(self.filter_var.get()))
+        if filter_key:
+            self.filter_var.set(filter_key)
+        self.update_category_list()
+        self.update_entries_list()
+        if self.entries_list.curselection():
+            self.on_entry_select(None)
+        else:
+            self.selected_entry_key = None
+            self.clear_fields()
+
+    def show_snapshots(self):
+        """Mostra gli snapshot del progetto corrente"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+        SnapshotDialog(self, self.current_project[1], self.db.db_path)
+
+    def reload_project(self, project_name):
+        """Rilegge un progetto dal database (es. dopo il ripristino di uno snapshot)"""
+        self.project_pool.discard(project_name)
+        if self.current_project and self.current_project[1] == project_name:
+            self.current_project = None
+            self.load_project(project_name)
+
+    def reload_project_when_done(self, project_name):
+        """
+        Prepara la rilettura di un progetto modificato da un thread (es. ripristino
+        di uno snapshot). Il controllo avviene qui, non nella finestra che ha
+        avviato l'operazione, così funziona anche se questa viene chiusa prima
+        Returns:
+            callable: Da chiamare dal thread a operazione terminata
+        """
+        finished = threading.Event()
+
+        def poll():
+            if finished.is_set():
+                self.reload_project(project_name)
+            else:
+                self.after(200, poll)
+
+        self.after(200, poll)
+        return finished.set
+
+    def toggle_maintenance_on_close(self):
+        """Attiva o disattiva la manutenzione leggera alla chiusura dei progetti"""
+        self.project_pool.maintenance_on_close = self.maintenance_on_close.get()
+
+    def open_entry(self, project_name, category, key):
+        """Apre una definizione, caricando prima il suo progetto se necessario"""
+        if not self.current_project or self.current_project[1] != project_name:
+            if not self.load_project(project_name):
+                messagebox.showerror("Errore", f"Impossibile aprire il progetto '{project_name}'")
+                return
+        self.category_var.set(category)
+        self.on_category_select()
+        # Il filtro sulla chiave rende la definizione subito visibile nella lista
+        self.selected_entry_key = key
+        self.filter_var.set(key)
+        if self.entries_list.curselection():
+            self.on_entry_select(None)
+
     def show_about(self):
         """Mostra la finestra About"""
         from abt.about_window import AboutWindow
@@ -410,11 +742,19 @@ class GlossaryEditor(tk.Tk):
         list_frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(list_frame, text="Definizioni esistenti:").pack(fill=tk.X)
+
+        # Campo filtro: restringe le chiavi mentre si digita
+        filter_frame = ttk.Frame(list_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 2))
+        ttk.Label(filter_frame, text="Filtro:").pack(side=tk.LEFT)
+        ttk.Entry(filter_frame, textvariable=self.filter_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        self.filter_var.trace_add('write', lambda *args: self.apply_entries_filter())
         
         list_scroll = ttk.Scrollbar(list_frame)
         list_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         
-        self.entries_list = tk.Listbox(list_frame, height=10)
+        # exportselection=False mantiene la selezione quando si scrive nel filtro
+        self.entries_list = tk.Listbox(list_frame, height=10, exportselection=False)
         self.entries_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         self.entries_list.config(yscrollcommand=list_scroll.set)
@@ -466,12 +806,44 @@ class GlossaryEditor(tk.Tk):
 
     def update_entries_list(self):
         """Aggiorna la lista delle definizioni per la categoria selezionata"""
-        self.entries_list.delete(0, tk.END)
+        keys = []
         category = self.category_var.get()
         if category:
-            entries = self.db.get_entries(category)
-            for entry in entries:
-                self.entries_list.insert(tk.END, entry['key'])
+            # Solo le chiavi, una pagina alla volta
+            for page in self.db.iter_entry_keys(category):
+                keys.extend(page)
+        self.key_index.rebuild(keys)
+        self.apply_entries_filter()
+
+    # Numero di chiavi inserite nella lista per ogni passo del ciclo degli eventi
+    POPULATE_CHUNK_SIZE = 500
+
+    def apply_entries_filter(self):
+        """Ripopola la lista con le chiavi che corrispondono al filtro"""
+        if self._populate_job is not None:
+            self.after_cancel(self._populate_job)
+            self._populate_job = None
+
+        self.entries_list.delete(0, tk.END)
+        keys = self.key_index.search(self.filter_var.get().strip())
+        self._populate_entries_chunk(keys, 0)
+
+    def _populate_entries_chunk(self, keys, start):
+        """Inserisce un blocco di chiavi e pianifica il successivo con after"""
+        chunk = keys[start:start + self.POPULATE_CHUNK_SIZE]
+        if chunk:
+            self.entries_list.insert(tk.END, *chunk)
+            # Ripristina la selezione se la chiave selezionata è in questo blocco
+            if self.selected_entry_key in chunk:
+                index = start + chunk.index(self.selected_entry_key)
+                self.entries_list.selection_set(index)
+                self.entries_list.see(index)
+
+        next_start = start + self.POPULATE_CHUNK_SIZE
+        if next_start < len(keys):
+            self._populate_job = self.after(1, self._populate_entries_chunk, keys, next_start)
+        else:
+            self._populate_job = None
     
     def on_category_select(self, event=None):
         """Gestisce la selezione di una categoria"""
@@ -490,38 +862,35 @@ class GlossaryEditor(tk.Tk):
             return
             
         # Aggiorna la lista delle entries
+        self.selected_entry_key = None
         self.update_entries_list()
+        self.update_category_status()
         
-        # Ottieni il commento dalla categoria selezionata
+        # Ottieni commento e gruppo della categoria dalla cache
         try:
-            print(f"Tentativo di connessione al database: {self.db.db_path}")
-            with sqlite3.connect(self.db.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT comment, group_name FROM categories WHERE name = ?', (category,))
-                result = cursor.fetchone()
-                
-                # Aggiorna il campo commento e gruppo
-                print(f"Result from query: {result}")
-                self.category_comment.delete(0, tk.END)
-                self.fields['group'].delete(0, tk.END)
-                if result:
-                    comment, group_name = result
-                    if comment:
-                        self.category_comment.insert(0, comment)
-                    if group_name:
-                        # Prima controlla se ha \group{}
-                        match = re.search(r'\\group{(.*?)}', group_name)
-                        if match:
-                            cleaned_group = match.group(1)
-                        else:
-                            cleaned_group = group_name
-                        
-                        self.fields['group'].insert(0, cleaned_group)
-                        print(f"Gruppo caricato: {cleaned_group} (originale: {group_name})")
-                    print(f"Commento caricato: {result[0]}")
-                    print(f"Gruppo caricato: {result[1]}")
-                else:
-                    print("Nessun commento trovato nel database")
+            result = self.db.cache.get_category(category)
+            
+            # Aggiorna il campo commento e gruppo
+            print(f"Categoria in cache: {result}")
+            self.category_comment.delete(0, tk.END)
+            self.fields['group'].delete(0, tk.END)
+            if result:
+                comment, group_name = result['comment'], result['group_name']
+                if comment:
+                    self.category_comment.insert(0, comment)
+                if group_name:
+                    # Prima controlla se ha \group{}
+                    match = re.search(r'\\group{(.*?)}', group_name)
+                    if match:
+                        cleaned_group = match.group(1)
+                    else:
+                        cleaned_group = group_name
+                    
+                    self.fields['group'].insert(0, cleaned_group)
+                    print(f"Gruppo caricato: {cleaned_group} (originale: {group_name})")
+                print(f"Commento caricato: {comment}")
+            else:
+                print("Nessun commento trovato nel database")
         except sqlite3.Error as e:
             print(f"Errore SQL: {str(e)}")
         except Exception as e:
@@ -543,6 +912,7 @@ class GlossaryEditor(tk.Tk):
         print(f"Commento da salvare: {comment}")
         
         if self.db_manager.save_category_comment(category, comment):
+            self.db.cache.set_category(category, comment=comment)
             messagebox.showinfo("Successo", "Commento salvato correttamente")
             print("Commento salvato con successo")
         else:
@@ -568,6 +938,8 @@ class GlossaryEditor(tk.Tk):
                         VALUES (?, ?)
                     ''', (name, category_id))
                     conn.commit()
+                    self.db.cache.set_category(name, cursor.lastrowid)
+                    self.refresh_project_stats()
                     
                     print(f"Creata nuova categoria: {name} con ID: {category_id}")
                     
@@ -611,6 +983,7 @@ class GlossaryEditor(tk.Tk):
             success, message = self.db.delete_category(category)
             
             if success:
+                self.refresh_project_stats()
                 messagebox.showinfo("Successo", message)
                 self.clear_fields()
                 self.update_category_list()
@@ -631,6 +1004,7 @@ class GlossaryEditor(tk.Tk):
         try:
             # Salva il gruppo
             if self.db_manager.save_category_group(category, group):
+                self.db.cache.set_category(category, group_name=group or None)
                 # Aggiorna entrambe le viste
                 self.update_entries_list()
                 if hasattr(self, 'db_viewer'):
@@ -710,6 +1084,7 @@ class GlossaryEditor(tk.Tk):
                 return
                     
             key = self.entries_list.get(selection[0])
+            self.selected_entry_key = key
             category = self.category_var.get()
             format_db = FormatDatabase(self.db.db_path)
 
@@ -728,17 +1103,11 @@ class GlossaryEditor(tk.Tk):
                             e.description,
                             c.comment,
                             c.group_name,
-                            fo.format_type,
-                            fo.first_letter_bold,
-                            fo.is_math_mode,
-                            fo.format_type,
-                            fo.first_letter_bold,
-                            fo.is_math_mode
+                            e.format_flags
                         FROM entries e
                         JOIN categories c ON e.category_id = c.id
-                        LEFT JOIN formatting_options fo ON e.id = fo.entry_id AND fo.field_name = 'name'
-                        WHERE c.name = ? AND e.key = ?
-                    ''', (category, key))
+                        WHERE c.name = ? AND e.canonical_key = ?
+                    ''', (category, canonical_key(key)))
                         
                     entry = cursor.fetchone()
                     if entry:
@@ -752,14 +1121,15 @@ class GlossaryEditor(tk.Tk):
                         # Description: {entry[5]}
                         # Comment: {entry[6]}
                         # Group: {entry[7]}
-                        # Format Type: {entry[8]}
-                        # First Letter Bold: {entry[9]}
-                        # Is Math Mode: {entry[10]}
-                        # First Format Type: {entry[11]}
-                        # First Letter Bold Setting: {entry[12]}
-                        # First Math Mode: {entry[13]}
+                        # Format Flags: {entry[8]}
                         # """)
 
+                        # Formattazione dei tre campi già nella riga letta
+                        if entry[8] is not None:
+                            formats = unpack_formats(entry[8])
+                        else:
+                            formats = format_db.get_entry_formats(entry[0])
+
                         # Pulisci tutti i campi
                         self.clear_fields()
 
@@ -768,7 +1138,7 @@ class GlossaryEditor(tk.Tk):
                         self.fields['key'].insert(0, entry[1])
 
                         # 2. Gestione name con formattazione
-                        name_settings = format_db.get_format(entry[0], 'name')
+                        name_settings = formats['name']
                         name_text = entry[2]
                         if name_settings['format_type'] == '\\textbackslash':
                             name_text = name_text.replace('\\textbackslash ', '')
@@ -782,11 +1152,7 @@ class GlossaryEditor(tk.Tk):
                         self.name_format.set_values(**name_settings)
 
                         # 3. Gestione first con formattazione speciale
-                        first_settings = {
-                            'format_type': entry[11] or 'Normale',
-                            'first_letter_bold': bool(entry[12]),
-                            'is_math_mode': bool(entry[13])
-                        }
+                        first_settings = formats['first']
                         # Pulizia del testo first mantenendo eventuali contenuti matematici
                         first_text = entry[3]
                         if '($' in first_text:  # Se contiene formule matematiche in parentesi
@@ -797,7 +1163,7 @@ class GlossaryEditor(tk.Tk):
                         self.first_format.set_values(**first_settings)
 
                         # 4. Gestione text con formattazione
-                        text_settings = format_db.get_format(entry[0], 'text')
+                        text_settings = formats['text']
                         text_text = entry[4]
                         if text_settings['format_type'] == '\\textbackslash':
                             text_text = text_text.replace('\\textbackslash ', '')
@@ -827,13 +1193,13 @@ class GlossaryEditor(tk.Tk):
                             self.fields['group'].insert(0, group_value)
 
                         # 8. Impostazione modalità matematica globale
-                        self.math_mode.set(bool(entry[10]))
+                        self.math_mode.set(formats['name']['is_math_mode'])
 
                         # 9. Aggiornamento formattazioni finali
                         for field_name in ['name', 'text', 'first']:
                             format_widget = getattr(self, f'{field_name}_format', None)
                             if format_widget:
-                                settings = format_db.get_format(entry[0], field_name)
+                                settings = formats[field_name]
                                 #self.log_debug("on_entry_select", f"Formattazione per {field_name}: {settings}")
                                 format_widget.set_values(**settings)
 
@@ -950,11 +1316,7 @@ class GlossaryEditor(tk.Tk):
 
             # Gestione del gruppo
             category_name = self.category_var.get()
-            with sqlite3.connect(self.db.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT group_name FROM categories WHERE name = ?', (category_name,))
-                result = cursor.fetchone()
-                group_value = result[0] if result else None
+            group_value = self.db.cache.get_category_group(category_name)
 
             # Se il gruppo esiste, estrai solo il valore interno
             group_text = ""
@@ -1007,35 +1369,21 @@ class GlossaryEditor(tk.Tk):
             return
 
         try:
-            self.db_manager = DatabaseManager(self.db.db_path)
-            self.db_manager.connect()
-            self.db_manager.begin_transaction()
-
-            print("Inizio transazione database")
-
-            # Salva il commento
+            # Salva il commento solo se è cambiato
             comment = self.category_comment.get().strip()
-            if category:
-                print(f"Salvataggio commento per categoria {category}: {comment}")
-                self.db_manager.execute(
-                    'UPDATE categories SET comment = ? WHERE name = ?',
-                    (comment, category)
-                )
-
-            # Ottieni l'ID della categoria
-            cursor = self.db_manager.execute('''
-                SELECT id FROM categories WHERE name = ?
-            ''', (category,))
-            result = cursor.fetchone()
+            category_info = self.db.cache.get_category(category)
             
-            if not result:
+            if category_info is None:
                 print(f"Errore: categoria '{category}' non trovata nel database: {self.db.db_path}")
                 messagebox.showerror("Errore", f"Categoria '{category}' non trovata nel database")
-                self.db_manager.rollback()
                 return
-                
-            category_id = result[0]
-            print(f"ID Categoria trovato: {category_id}")
+
+            print(f"ID Categoria trovato: {category_info['id']}")
+            # Il commento, se cambiato, viene scritto insieme alla definizione
+            category_comment = None
+            if comment != (category_info['comment'] or ''):
+                print(f"Salvataggio commento per categoria {category}: {comment}")
+                category_comment = comment
 
             # Salva il gruppo nella tabella categories
             # Ottieni e formatta il valore del gruppo
@@ -1051,17 +1399,6 @@ class GlossaryEditor(tk.Tk):
                     
                 print(f"Salvataggio gruppo per categoria {category}: {group_text}")
 
-            # Genera un nuovo definition_id
-            definition_id = f"DEF_{os.urandom(4).hex()}"
-            print(f"Nuovo definition_id generato: {definition_id}")
-
-            # Prima cerca ed elimina l'entry esistente (case insensitive)
-            print(f"Eliminazione entry esistente per key: {key}")
-            self.db_manager.execute('''
-                DELETE FROM entries 
-                WHERE category_id = ? AND LOWER(key) = LOWER(?)
-            ''', (category_id, key))
-
             # Ottieni i widget di formattazione e i loro valori
             print("Elaborazione formattazione testi")
             widgets_info = {
@@ -1072,9 +1409,11 @@ class GlossaryEditor(tk.Tk):
 
             # Formatta i testi
             formatted_texts = {}
+            formats = {}
             for field, (widget, text) in widgets_info.items():
                 if widget:
                     values = widget.get_values()
+                    formats[field] = values
                     if field == 'first':
                         formatted_texts[field] = FormatManager.format_text(
                             text,
@@ -1099,50 +1438,27 @@ class GlossaryEditor(tk.Tk):
             description = self.fields['description'].get('1.0', tk.END).strip()
             print(f"Descrizione: {description[:50]}...")  # Primi 50 caratteri
 
-            # Salva la nuova entry
-            print("Salvataggio nuova entry")
-            cursor = self.db_manager.execute('''
-                INSERT INTO entries 
-                (definition_id, category_id, key, type, name, first, text, description, is_math)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                definition_id,
-                category_id,
-                key,
-                '\\acronymtype',
-                formatted_texts['name'],
-                formatted_texts['first'],
-                formatted_texts['text'],
-                description,
-                0
-            ))
-            entry_id = cursor.lastrowid
-            print(f"Nuovo entry_id: {entry_id}")
-
-            # Aggiorna le opzioni di formattazione
-            print("Salvataggio opzioni di formattazione")
-            for field_name in ['name', 'text', 'first']:
-                format_widget = getattr(self, f'{field_name}_format', None)
-                if format_widget:
-                    values = format_widget.get_values()
-                    self.db_manager.execute('''
-                        INSERT OR REPLACE INTO formatting_options 
-                        (entry_id, field_name, format_type, is_math_mode, first_letter_bold)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (
-                        entry_id,
-                        field_name,
-                        values['format_type'],
-                        values['is_math_mode'],
-                        values.get('first_letter_bold', False)
-                    ))
-                    print(f"Formattazione salvata per {field_name}")
-
-            self.db_manager.end_transaction()
-            print("Transazione completata con successo")
+            # Inserisce o aggiorna l'entry (id stabile) con formattazioni e commento
+            # della categoria in un'unica transazione
+            print("Salvataggio entry")
+            entry_id = self.db.upsert_entry(category, {
+                'key': key,
+                'type': '\\acronymtype',
+                'name': formatted_texts['name'],
+                'first': formatted_texts['first'],
+                'text': formatted_texts['text'],
+                'description': description,
+                'is_math': 0
+            }, formats, category_comment)
+            if entry_id is None:
+                messagebox.showerror("Errore Database", "Errore durante il salvataggio della definizione")
+                return
+            print(f"Entry salvata con id: {entry_id}")
             
             messagebox.showinfo("Successo", "Definizione salvata correttamente")
+            self.selected_entry_key = key
             self.update_entries_list()
+            self.refresh_project_stats()
             if hasattr(self, 'db_viewer'):
                 self.db_viewer.update_view()
                 # Aggiorna l'anteprima
@@ -1150,7 +1466,6 @@ class GlossaryEditor(tk.Tk):
 
         except sqlite3.Error as e:
             print(f"Errore durante il salvataggio: {str(e)}")
-            self.db_manager.rollback()
             messagebox.showerror("Errore Database", f"Errore durante il salvataggio: {str(e)}")
         finally:
             print("=== Fine Salvataggio Entry ===")
@@ -1158,7 +1473,10 @@ class GlossaryEditor(tk.Tk):
     def on_closing(self):
         """Gestisce la chiusura dell'applicazione"""
         if messagebox.askokcancel("Esci", "Vuoi davvero uscire?"):
-            self.db_manager.close()
+            self.latency_monitor.stop()
+            if self.db_manager:
+                self.db_manager.close()
+            self.project_pool.close_all()
             self.quit()
 
     def clean_format(self, text):
@@ -1218,7 +1536,11 @@ class GlossaryEditor(tk.Tk):
             
             try:
                 if self.db_manager.delete_entry(category, key):
+                    self.db.cache.remove_entry(category, key)
+                    self.refresh_project_stats()
                     self.entries_list.delete(selection[0])
+                    self.key_index.remove(key)
+                    self.selected_entry_key = None
                     self.clear_fields()
                     messagebox.showinfo("Successo", "Definizione eliminata")
                     
@@ -1246,7 +1568,9 @@ class GlossaryEditor(tk.Tk):
                     content = file.read()
                 
                 # Importa il contenuto nel database del progetto corrente
+                start = time.perf_counter()
                 self.db.import_from_latex(content)
+                self.refresh_project_stats(last_import_seconds=time.perf_counter() - start)
                 
                 # Aggiorna l'interfaccia
                 self.update_category_list()
@@ -1276,6 +1600,152 @@ class GlossaryEditor(tk.Tk):
                 messagebox.showerror("Errore", 
                                    f"Errore durante l'esportazione: {str(e)}")
 
+    def export_bib_file(self):
+        """Esporta le definizioni in un file .bib per bib2gls"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+
+        filename = filedialog.asksaveasfilename(
+            initialdir=self.os_handler.get_export_directory(),
+            defaultextension=".bib",
+            filetypes=[("File bib2gls", "*.bib"), ("Tutti i file", "*.*")]
+        )
+        if filename:
+            try:
+                written = self.db.export_to_bib(filename)
+                messagebox.showinfo("Successo",
+                                  f"Esportate {written} definizioni.\n"
+                                  "Caricarle nel documento con \\GlsXtrLoadResources (bib2gls).")
+            except (OSError, sqlite3.Error) as e:
+                messagebox.showerror("Errore",
+                                   f"Errore durante l'esportazione: {str(e)}")
+
+    def export_used_entries_file(self):
+        """Esporta in LaTeX solo le definizioni citate da un documento compilato o dai suoi sorgenti"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+
+        sources = filedialog.askopenfilenames(
+            title="File del documento (.aux, .glo, .acn o sorgenti .tex)",
+            filetypes=[("File del documento", "*.aux *.glo *.acn *.tex"), ("Tutti i file", "*.*")])
+        if not sources:
+            return
+        filename = filedialog.asksaveasfilename(
+            initialdir=self.os_handler.get_export_directory(),
+            defaultextension=".tex",
+            filetypes=[("File TEX", "*.tex"), ("Tutti i file", "*.*")]
+        )
+        if filename:
+            try:
+                report = export_used_entries(self.db, list(sources), filename)
+                message = (f"Chiavi citate dal documento: {report['referenced']}\n"
+                           f"Definizioni esportate: {report['exported']} "
+                           f"(di cui {report['dependencies']} citate nelle definizioni)")
+                if report['missing']:
+                    message += (f"\n\nChiavi non presenti nel progetto ({len(report['missing'])}):\n"
+                                + ", ".join(report['missing'][:20]))
+                messagebox.showinfo("Esportazione completata", message)
+            except (OSError, sqlite3.Error) as e:
+                messagebox.showerror("Errore",
+                                   f"Errore durante l'esportazione: {str(e)}")
+
+    def import_jsonl_file(self):
+        """Importa definizioni da un file JSON Lines"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+
+        filename = filedialog.askopenfilename(
+            filetypes=[("File JSON Lines", f"*{JSONL_EXTENSION}"), ("Tutti i file", "*.*")])
+        if filename:
+            try:
+                start = time.perf_counter()
+                result = import_jsonl(self.db, filename)
+                self.refresh_project_stats(last_import_seconds=time.perf_counter() - start)
+                self.update_category_list()
+
+                message = (f"Definizioni importate: {result['imported']}\n"
+                           f"Nuove categorie: {result['categories']}")
+                if result['errors']:
+                    message += f"\n\nRighe con errori: {len(result['errors'])}"
+                    for line_number, error in result['errors'][:10]:
+                        message += f"\n  riga {line_number}: {error}"
+                messagebox.showinfo("Importazione completata", message)
+            except (OSError, sqlite3.Error) as e:
+                messagebox.showerror("Errore", f"Errore durante l'importazione: {str(e)}")
+
+    def export_jsonl_file(self):
+        """Esporta le definizioni in un file JSON Lines"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+
+        filename = filedialog.asksaveasfilename(
+            initialdir=self.os_handler.get_export_directory(),
+            defaultextension=JSONL_EXTENSION,
+            filetypes=[("File JSON Lines", f"*{JSONL_EXTENSION}"), ("Tutti i file", "*.*")]
+        )
+        if filename:
+            try:
+                written = export_jsonl(self.db, filename)
+                messagebox.showinfo("Successo", f"Esportate {written} righe")
+            except (OSError, sqlite3.Error) as e:
+                messagebox.showerror("Errore",
+                                   f"Errore durante l'esportazione: {str(e)}")
+
+    def import_csv_file(self):
+        """Importa definizioni da un foglio CSV/TSV con mappatura delle colonne"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+
+        filename = filedialog.askopenfilename(
+            filetypes=[("File CSV/TSV", "*.csv *.tsv *.tab"), ("Tutti i file", "*.*")])
+        if not filename:
+            return
+        try:
+            dialog = CsvMappingDialog(self, filename, self.category_var.get() or 'Generale')
+            self.wait_window(dialog.window)
+            if dialog.mapping is None:
+                return
+
+            start = time.perf_counter()
+            result = self.db.import_from_csv(filename, dialog.mapping,
+                                             category_name=dialog.category)
+            self.refresh_project_stats(last_import_seconds=time.perf_counter() - start)
+            self.update_category_list()
+
+            message = (f"Definizioni importate: {result['imported']}\n"
+                       f"Nuove categorie: {result['categories']}")
+            if result['errors']:
+                message += f"\n\nRighe con errori: {len(result['errors'])}"
+                for line_number, error in result['errors'][:10]:
+                    message += f"\n  riga {line_number}: {error}"
+            messagebox.showinfo("Importazione completata", message)
+        except (OSError, ValueError, csv.Error, sqlite3.Error) as e:
+            messagebox.showerror("Errore", f"Errore durante l'importazione: {str(e)}")
+
+    def export_csv_file(self):
+        """Esporta le definizioni in CSV o TSV (in base all'estensione scelta)"""
+        if not self.current_project:
+            messagebox.showerror("Errore", "Aprire prima un progetto")
+            return
+
+        filename = filedialog.asksaveasfilename(
+            initialdir=self.os_handler.get_export_directory(),
+            defaultextension=".csv",
+            filetypes=[("File CSV", "*.csv"), ("File TSV", "*.tsv"), ("Tutti i file", "*.*")]
+        )
+        if filename:
+            try:
+                written = self.db.export_to_csv(filename)
+                messagebox.showinfo("Successo", f"Esportate {written} righe")
+            except (OSError, csv.Error, sqlite3.Error) as e:
+                messagebox.showerror("Errore",
+                                   f"Errore durante l'esportazione: {str(e)}")
+
 
 if __name__ == "__main__":
     app = GlossaryEditor()
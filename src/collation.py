@@ -0,0 +1,44 @@
+import sqlite3
+import unicodedata
+from functools import lru_cache
+
+
+# Nome della collation registrata sulle connessioni: ORDER BY ... COLLATE ITALIAN
+COLLATION_NAME = 'ITALIAN'
+
+
+def primary_key(text):
+    """Livello primario: lettere senza accenti, minuscole (è == e, A == a)"""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+
+
+@lru_cache(maxsize=262144)
+def collation_key(text):
+    """
+    Chiave di ordinamento a tre livelli, calcolata una volta per valore e memorizzata:
+    lettere di base, poi accenti (e < è), poi maiuscole (a < A)
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    accents = tuple(
+        (index, ch) for index, ch in enumerate(decomposed) if unicodedata.combining(ch)
+    )
+    return primary_key(text), accents, text.swapcase()
+
+
+def compare(a, b):
+    """Funzione di confronto per sqlite3.Connection.create_collation"""
+    key_a = collation_key(a)
+    key_b = collation_key(b)
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def register_collation(conn):
+    """Registra la collation ITALIAN su una connessione"""
+    conn.create_collation(COLLATION_NAME, compare)
+    return conn
+
+
+def connect(db_path, **kwargs):
+    """sqlite3.connect con la collation ITALIAN già registrata"""
+    return register_collation(sqlite3.connect(db_path, **kwargs))
@@ -0,0 +1,74 @@
+import csv
+import tkinter as tk
+from tkinter import ttk
+from .glossary_db import GlossaryDatabase, CSV_COLUMNS
+
+
+# Voce della lista per le colonne da non importare
+IGNORE_LABEL = '(ignora)'
+
+
+def read_csv_header(file_path, delimiter=None):
+    """Legge solo l'intestazione di un file CSV/TSV"""
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as file:
+        reader = csv.reader(file, delimiter=GlossaryDatabase.csv_delimiter(file_path, delimiter))
+        return next(reader, [])
+
+
+class CsvMappingDialog:
+    """
+    Finestra per associare le colonne di un foglio CSV/TSV ai campi delle definizioni.
+    Dopo la chiusura, mapping contiene {colonna: campo} oppure None se annullata
+    """
+    def __init__(self, parent, file_path, default_category='Generale'):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Importa da CSV/TSV")
+        self.window.transient(parent)
+        self.header = read_csv_header(file_path)
+        self.mapping = None
+        self.category = default_category
+        self._choices = {}
+
+        self._create_widgets(default_category)
+        self.window.grab_set()
+
+    def _create_widgets(self, default_category):
+        main_frame = ttk.Frame(self.window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(main_frame, text="Colonna del file").grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(main_frame, text="Campo").grid(row=0, column=1, sticky=tk.W)
+        for row, column in enumerate(self.header, 1):
+            ttk.Label(main_frame, text=column).grid(row=row, column=0, sticky=tk.W, pady=2)
+            guess = column.strip().lower()
+            choice = tk.StringVar(value=guess if guess in CSV_COLUMNS else IGNORE_LABEL)
+            ttk.Combobox(main_frame, textvariable=choice, state='readonly', width=18,
+                         values=(IGNORE_LABEL,) + CSV_COLUMNS).grid(row=row, column=1, padx=5)
+            self._choices[column] = choice
+
+        row = len(self.header) + 1
+        ttk.Label(main_frame, text="Categoria predefinita").grid(row=row, column=0, sticky=tk.W, pady=(10, 0))
+        self.category_var = tk.StringVar(value=default_category)
+        ttk.Entry(main_frame, textvariable=self.category_var).grid(row=row, column=1, padx=5, pady=(10, 0))
+
+        self.error_var = tk.StringVar()
+        ttk.Label(main_frame, textvariable=self.error_var, foreground='red').grid(
+            row=row + 1, column=0, columnspan=2, sticky=tk.W)
+
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.grid(row=row + 2, column=0, columnspan=2, sticky=tk.E, pady=(10, 0))
+        ttk.Button(btn_frame, text="Importa", command=self._confirm).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Annulla", command=self.window.destroy).pack(side=tk.LEFT, padx=2)
+
+    def _confirm(self):
+        mapping = {column: choice.get() for column, choice in self._choices.items()
+                   if choice.get() != IGNORE_LABEL}
+        if 'key' not in mapping.values():
+            self.error_var.set("Associare una colonna al campo 'key'")
+            return
+        # Le colonne non associate vanno ignorate anche se hanno il nome di un campo
+        for column in self.header:
+            mapping.setdefault(column, IGNORE_LABEL)
+        self.mapping = mapping
+        self.category = self.category_var.get().strip() or 'Generale'
+        self.window.destroy()
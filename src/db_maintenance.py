@@ -0,0 +1,111 @@
+import sqlite3
+import time
+
+
+# Valori di PRAGMA auto_vacuum
+AUTO_VACUUM_MODES = {0: 'NONE', 1: 'FULL', 2: 'INCREMENTAL'}
+
+
+class DatabaseMaintenance:
+    """
+    Manutenzione di un database di progetto: PRAGMA optimize, ANALYZE,
+    incremental vacuum (sui database con auto_vacuum=INCREMENTAL) e quick_check
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def page_stats(self):
+        """Restituisce dimensione pagina, pagine totali, pagine libere e modalità auto_vacuum"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            stats = {}
+            for pragma in ('page_size', 'page_count', 'freelist_count', 'auto_vacuum'):
+                cursor.execute(f'PRAGMA {pragma}')
+                stats[pragma] = cursor.fetchone()[0]
+        stats['size'] = stats['page_size'] * stats['page_count']
+        stats['free_bytes'] = stats['page_size'] * stats['freelist_count']
+        return stats
+
+    def is_incremental(self):
+        """True se il database usa auto_vacuum=INCREMENTAL"""
+        return self.page_stats()['auto_vacuum'] == 2
+
+    def run(self, analyze=True, vacuum=True, check=True, convert=False):
+        """
+        Esegue la manutenzione
+        Args:
+            analyze (bool): Aggiorna le statistiche del pianificatore con ANALYZE
+            vacuum (bool): Restituisce le pagine libere con incremental_vacuum
+            check (bool): Verifica l'integrità con PRAGMA quick_check
+            convert (bool): Converte il database ad auto_vacuum=INCREMENTAL (VACUUM completo)
+        Returns:
+            dict: Rapporto con dimensioni, byte recuperati, esito del controllo e durate
+        """
+        start = time.perf_counter()
+        before = self.page_stats()
+        report = {
+            'size_before': before['size'],
+            'auto_vacuum': AUTO_VACUUM_MODES.get(before['auto_vacuum'], before['auto_vacuum']),
+            'steps': {},
+            'integrity': None,
+        }
+
+        # isolation_level=None: VACUUM e i PRAGMA non devono stare in una transazione
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            cursor = conn.cursor()
+
+            def step(name, *statements):
+                step_start = time.perf_counter()
+                for statement in statements:
+                    cursor.execute(statement).fetchall()
+                report['steps'][name] = time.perf_counter() - step_start
+
+            if analyze:
+                step('analyze', 'ANALYZE')
+            step('optimize', 'PRAGMA optimize')
+
+            if convert and before['auto_vacuum'] != 2:
+                step('vacuum', 'PRAGMA auto_vacuum = INCREMENTAL', 'VACUUM')
+                report['auto_vacuum'] = 'INCREMENTAL'
+            elif vacuum and before['auto_vacuum'] == 2:
+                step('incremental_vacuum', 'PRAGMA incremental_vacuum')
+
+            if check:
+                check_start = time.perf_counter()
+                cursor.execute('PRAGMA quick_check')
+                messages = [row[0] for row in cursor.fetchall()]
+                report['steps']['quick_check'] = time.perf_counter() - check_start
+                report['integrity'] = 'ok' if messages == ['ok'] else '\n'.join(messages)
+        finally:
+            conn.close()
+
+        after = self.page_stats()
+        report['size_after'] = after['size']
+        report['reclaimed'] = before['size'] - after['size']
+        report['free_bytes'] = after['free_bytes']
+        report['seconds'] = time.perf_counter() - start
+        print(f"Manutenzione {self.db_path}: {report['reclaimed']} byte recuperati "
+              f"in {report['seconds']:.2f} s, controllo: {report['integrity']}")
+        return report
+
+    def run_quick(self):
+        """Manutenzione leggera per la chiusura del progetto: optimize e incremental vacuum"""
+        return self.run(analyze=False, vacuum=True, check=False)
+
+
+def format_report(report):
+    """Formatta il rapporto di manutenzione come testo"""
+    lines = [
+        f"Dimensione: {report['size_before'] / 1024:.0f} KB -> {report['size_after'] / 1024:.0f} KB",
+        f"Spazio recuperato: {report['reclaimed'] / 1024:.0f} KB",
+        f"Auto vacuum: {report['auto_vacuum']}",
+    ]
+    if report['auto_vacuum'] != 'INCREMENTAL' and report['free_bytes']:
+        lines.append(f"Spazio libero non recuperabile senza VACUUM: {report['free_bytes'] / 1024:.0f} KB")
+    if report['integrity'] is not None:
+        lines.append(f"Controllo integrità: {report['integrity']}")
+    for name, seconds in report['steps'].items():
+        lines.append(f"  {name}: {seconds * 1000:.0f} ms")
+    lines.append(f"Tempo totale: {report['seconds']:.2f} s")
+    return '\n'.join(lines)
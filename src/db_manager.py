@@ -2,6 +2,7 @@ import sqlite3
 import os
 from tkinter import messagebox
 from .glossary_os_handler import GlossaryOSHandler
+from .entry_record import canonical_key
 
 class DatabaseManager:
     _instance = None  # Corrected from _instancee
@@ -37,6 +38,19 @@ class DatabaseManager:
             
         return cls._instance
     
+    @classmethod
+    def standalone(cls, db_path):
+        """Crea un'istanza indipendente dal singleton, con una propria connessione.
+
+        Usata dal pool dei progetti recenti per mantenere aperte le connessioni
+        di più progetti senza che il cambio di percorso chiuda quella attuale.
+        """
+        instance = super().__new__(cls)
+        instance.db_path = db_path
+        instance.conn = None
+        instance.cursor = None
+        return instance
+
     def connect(self):
         """Crea una connessione al database se non esiste già"""
         if self.conn is None:
@@ -94,8 +108,8 @@ class DatabaseManager:
                 SELECT e.id 
                 FROM entries e
                 JOIN categories c ON e.category_id = c.id
-                WHERE c.name = ? AND e.key = ?
-            ''', (category, key))
+                WHERE c.name = ? AND e.canonical_key = ?
+            ''', (category, canonical_key(key)))
             
             result = cursor.fetchone()
             if not result:
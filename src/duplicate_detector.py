@@ -0,0 +1,262 @@
+import re
+import sys
+import sqlite3
+import argparse
+import threading
+import unicodedata
+from collections import defaultdict
+import tkinter as tk
+from tkinter import ttk, messagebox
+from .entry_record import strip_key_wrapper
+
+
+def normalize_key(key):
+    """Normalizza una chiave: senza \\newglossaryentry{}, minuscola, solo lettere e cifre"""
+    return re.sub(r'[^0-9a-z]', '', strip_key_wrapper(key).casefold())
+
+
+def normalize_text(text):
+    """Normalizza una descrizione: senza accenti, comandi LaTeX e punteggiatura"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r'\\[a-zA-Z]+', ' ', text)
+    text = re.sub(r'[^0-9a-z]+', ' ', text.casefold())
+    return ' '.join(text.split())
+
+
+class DuplicateDetector:
+    """
+    Rileva definizioni duplicate e quasi duplicate in un database di progetto.
+
+    - Duplicati: stessa chiave normalizzata in più categorie (o con grafie diverse).
+    - Quasi duplicati: descrizioni simili, stimate con MinHash a permutazione singola
+      sui trigrammi di caratteri e candidati trovati con LSH a bande: il costo è
+      lineare nel numero di definizioni invece che quadratico.
+    """
+    # Oltre questa dimensione un secchio LSH non viene confrontato a coppie:
+    # si raggruppano solo le firme identiche
+    LARGE_BUCKET = 200
+
+    def __init__(self, db_path, threshold=0.7, num_bins=32, bands=8, min_length=12):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.num_bins = num_bins
+        self.bands = bands
+        self.rows_per_band = num_bins // bands
+        self.min_length = min_length
+        self._entries = None
+
+    def _load_entries(self):
+        """Legge le definizioni dal database (una sola volta)"""
+        if self._entries is None:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT e.id, c.name, e.key, e.description
+                    FROM entries e
+                    JOIN categories c ON e.category_id = c.id
+                ''')
+                self._entries = []
+                for entry_id, category, key, description in cursor:
+                    self._entries.append({
+                        'id': entry_id, 'category': category,
+                        'key': strip_key_wrapper(key), 'description': description or ''
+                    })
+        return self._entries
+
+    def find_key_duplicates(self):
+        """Restituisce i gruppi di definizioni con la stessa chiave normalizzata"""
+        groups = defaultdict(list)
+        for entry in self._load_entries():
+            groups[normalize_key(entry['key'])].append(entry)
+        return [
+            {'normalized_key': norm, 'entries': entries}
+            for norm, entries in sorted(groups.items())
+            if norm and len(entries) > 1
+        ]
+
+    def _signature(self, text):
+        """Firma MinHash a permutazione singola: un hash per trigramma, minimo per cella"""
+        if len(text) < self.min_length:
+            return None
+        bins = [None] * self.num_bins
+        for i in range(len(text) - 2):
+            h = hash(text[i:i + 3]) & 0xFFFFFFFFFFFF
+            index = h % self.num_bins
+            value = h // self.num_bins
+            if bins[index] is None or value < bins[index]:
+                bins[index] = value
+        return tuple(bins)
+
+    @staticmethod
+    def _similarity(sig_a, sig_b):
+        """Stima della similarità di Jaccard dalle celle non vuote delle due firme"""
+        matches = total = 0
+        for a, b in zip(sig_a, sig_b):
+            if a is None and b is None:
+                continue
+            total += 1
+            if a == b:
+                matches += 1
+        return matches / total if total else 0.0
+
+    def find_near_duplicates(self):
+        """Restituisce le coppie di definizioni con descrizioni quasi identiche"""
+        entries = self._load_entries()
+        signatures = {}
+        buckets = defaultdict(list)
+        for index, entry in enumerate(entries):
+            signature = self._signature(normalize_text(entry['description']))
+            if signature is None:
+                continue
+            signatures[index] = signature
+            for band in range(self.bands):
+                start = band * self.rows_per_band
+                buckets[(band, signature[start:start + self.rows_per_band])].append(index)
+
+        # Coppie candidate: definizioni che condividono almeno una banda
+        candidates = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) <= self.LARGE_BUCKET:
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        candidates.add((a, b))
+                continue
+            # Banda molto comune (es. descrizioni ripetute da un modello): il confronto
+            # a coppie sarebbe quadratico, quindi solo firme identiche, ciascuna
+            # accoppiata alla prima del suo gruppo
+            by_signature = defaultdict(list)
+            for index in members:
+                by_signature[signatures[index]].append(index)
+            for group in by_signature.values():
+                for other in group[1:]:
+                    candidates.add((group[0], other))
+
+        pairs = []
+        for a, b in candidates:
+            similarity = self._similarity(signatures[a], signatures[b])
+            if similarity >= self.threshold:
+                pairs.append({'similarity': round(similarity, 2), 'a': entries[a], 'b': entries[b]})
+        pairs.sort(key=lambda pair: (-pair['similarity'], pair['a']['key'], pair['b']['key']))
+        return pairs
+
+    def report(self):
+        """Restituisce il rapporto completo: duplicati e quasi duplicati"""
+        return {
+            'key_duplicates': self.find_key_duplicates(),
+            'near_duplicates': self.find_near_duplicates(),
+        }
+
+
+def format_report(report):
+    """Formatta il rapporto come testo"""
+    lines = [f"Chiavi duplicate: {len(report['key_duplicates'])}"]
+    for group in report['key_duplicates']:
+        places = ', '.join(f"{e['category']}/{e['key']}" for e in group['entries'])
+        lines.append(f"  {group['normalized_key']}: {places}")
+    lines.append(f"Descrizioni quasi duplicate: {len(report['near_duplicates'])}")
+    for pair in report['near_duplicates']:
+        a, b = pair['a'], pair['b']
+        lines.append(f"  {pair['similarity']:.2f}  {a['category']}/{a['key']}  ~  {b['category']}/{b['key']}")
+    return '\n'.join(lines)
+
+
+class DuplicateReportDialog:
+    """Finestra con il rapporto dei duplicati del progetto corrente"""
+    def __init__(self, parent, db_path):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Definizioni duplicate")
+        self.window.geometry("800x450")
+        self.parent = parent
+        self.window.transient(parent)
+        self._items = {}
+        self._result = None
+
+        self._create_widgets()
+        self.summary_var.set("Analisi in corso...")
+
+        # Su progetti grandi il rapporto richiede qualche secondo: fuori dal thread di Tk
+        def worker():
+            try:
+                self._result = ('done', DuplicateDetector(db_path).report())
+            except Exception as e:
+                self._result = ('error', str(e))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.window.after(100, self._poll_report)
+
+    def _poll_report(self):
+        if not self.window.winfo_exists():
+            return
+        if self._result is None:
+            self.window.after(100, self._poll_report)
+            return
+        kind, value = self._result
+        if kind == 'error':
+            self.summary_var.set("")
+            messagebox.showerror("Errore", value, parent=self.window)
+            return
+        self._show_report(value)
+
+    def _create_widgets(self):
+        main_frame = ttk.Frame(self.window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = ('Tipo', 'Somiglianza', 'Definizione', 'Simile a')
+        self.tree = ttk.Treeview(main_frame, columns=columns, show='headings')
+        widths = {'Tipo': 120, 'Somiglianza': 90, 'Definizione': 260, 'Simile a': 260}
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=widths[col])
+        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        self.tree.bind('<Double-1>', self._open_selected)
+
+        self.summary_var = tk.StringVar()
+        ttk.Label(self.window, textvariable=self.summary_var).pack(fill=tk.X, padx=10, pady=(0, 5))
+
+    def _show_report(self, report):
+        for group in report['key_duplicates']:
+            first = group['entries'][0]
+            for other in group['entries'][1:]:
+                item = self.tree.insert('', 'end', values=(
+                    'Chiave', '1.00',
+                    f"{first['category']}/{first['key']}", f"{other['category']}/{other['key']}"))
+                self._items[item] = first
+        for pair in report['near_duplicates']:
+            a, b = pair['a'], pair['b']
+            item = self.tree.insert('', 'end', values=(
+                'Descrizione', f"{pair['similarity']:.2f}",
+                f"{a['category']}/{a['key']}", f"{b['category']}/{b['key']}"))
+            self._items[item] = a
+
+        self.summary_var.set(f"{len(report['key_duplicates'])} chiavi duplicate, "
+                             f"{len(report['near_duplicates'])} descrizioni quasi duplicate")
+
+    def _open_selected(self, event=None):
+        """Apre nell'editor la prima definizione della riga selezionata"""
+        selection = self.tree.selection()
+        entry = self._items.get(selection[0]) if selection else None
+        if entry and hasattr(self.parent, 'open_entry') and self.parent.current_project:
+            self.parent.open_entry(self.parent.current_project[1], entry['category'], entry['key'])
+
+
+def main(argv=None):
+    """Uso da riga di comando: python -m src.duplicate_detector percorso/progetto.db"""
+    parser = argparse.ArgumentParser(description="Trova definizioni duplicate in un progetto")
+    parser.add_argument('db_path', help="Percorso del database del progetto")
+    parser.add_argument('--threshold', type=float, default=0.7,
+                        help="Somiglianza minima delle descrizioni (0-1)")
+    args = parser.parse_args(argv)
+
+    report = DuplicateDetector(args.db_path, threshold=args.threshold).report()
+    print(format_report(report))
+    return 1 if report['key_duplicates'] or report['near_duplicates'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+from collections import namedtuple
+
+
+# Colonne restituite da GlossaryDatabase.get_entry_records, nell'ordine della SELECT
+ENTRY_RECORD_FIELDS = (
+    'id', 'category_name', 'key', 'type', 'name', 'first', 'text',
+    'description', 'is_math', 'created_at', 'updated_at'
+)
+
+# Prefisso con cui le versioni precedenti salvavano alcune chiavi
+KEY_WRAPPER_PREFIX = '\\newglossaryentry{'
+
+# Campi con pochi valori distinti ripetuti su molte righe: condivisi tra i record
+_SHARED_FIELDS = ('category_name', 'type', 'created_at', 'updated_at')
+
+
+class EntryRecord(namedtuple('EntryRecord', ENTRY_RECORD_FIELDS)):
+    """Definizione immutabile e compatta (nessun __dict__ per istanza)"""
+    __slots__ = ()
+
+    def as_dict(self):
+        """Restituisce il record come dizionario, per il codice che usa ancora i dict"""
+        return dict(zip(self._fields, self))
+
+
+def strip_key_wrapper(key):
+    """Rimuove l'eventuale \\newglossaryentry{...} attorno a una chiave"""
+    if key.startswith(KEY_WRAPPER_PREFIX) and key.endswith('}'):
+        return key[len(KEY_WRAPPER_PREFIX):-1]
+    return key
+
+
+def canonical_key(key):
+    """Forma canonica di una chiave per confronti e ricerche (senza wrapper, minuscola)"""
+    return strip_key_wrapper(key.strip()).strip().lower()
+
+
+def build_entry_records(rows):
+    """
+    Costruisce i record a partire dalle righe del cursore
+    Args:
+        rows (iterable): Righe nell'ordine di ENTRY_RECORD_FIELDS
+    Returns:
+        list: Lista di EntryRecord con i valori ripetuti condivisi
+    """
+    shared = {}
+    shared_positions = [ENTRY_RECORD_FIELDS.index(field) for field in _SHARED_FIELDS]
+    records = []
+    make = EntryRecord._make
+
+    for row in rows:
+        row = list(row)
+        for pos in shared_positions:
+            value = row[pos]
+            if value is not None:
+                row[pos] = shared.setdefault(value, value)
+        records.append(make(row))
+    return records
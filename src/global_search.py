@@ -0,0 +1,217 @@
+import heapq
+import sqlite3
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+from .entry_record import strip_key_wrapper
+
+
+class GlobalSearch:
+    """Cerca le definizioni in tutti i database dei progetti tramite ATTACH a blocchi"""
+    # SQLite consente al massimo 10 database collegati per connessione
+    ATTACH_BATCH_SIZE = 9
+
+    def __init__(self, project_manager):
+        self.project_manager = project_manager
+
+    def _project_databases(self):
+        """Restituisce (nome progetto, percorso database) per i progetti esistenti"""
+        databases = []
+        for project in self.project_manager.get_all_projects():
+            db_path = self.project_manager.get_project_db_path(project)
+            if db_path.exists():
+                databases.append((project[1], db_path))
+        return databases
+
+    def search(self, term, limit=500):
+        """
+        Cerca un termine in chiave, nome e testo delle definizioni di tutti i progetti
+        Args:
+            term (str): Testo da cercare (senza distinzione maiuscole/minuscole)
+            limit (int): Numero massimo di risultati
+        Returns:
+            list: Lista di dict con project, category, key, name, text, description
+        """
+        term = term.strip()
+        if not term:
+            return []
+        # % e _ nel termine vanno cercati alla lettera, non come caratteri jolly
+        escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        pattern = f"%{escaped}%"
+        like = "LIKE ? ESCAPE '\\'"
+        lowered = term.lower()
+
+        def rank(hit):
+            # Prima le chiavi identiche al termine, poi quelle che iniziano con esso
+            key = hit['key'].lower()
+            return (key != lowered, not key.startswith(lowered), key, hit['project'])
+
+        # Solo i migliori limit risultati restano in memoria, blocco dopo blocco:
+        # una corrispondenza esatta in un progetto esaminato per ultimo non va persa
+        hits = []
+        databases = self._project_databases()
+        with sqlite3.connect(':memory:', uri=True) as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(databases), self.ATTACH_BATCH_SIZE):
+                batch = databases[start:start + self.ATTACH_BATCH_SIZE]
+                attached = []
+                try:
+                    for index, (project_name, db_path) in enumerate(batch):
+                        alias = self._attach(cursor, f"p{index}", project_name, db_path)
+                        if alias:
+                            attached.append((alias, project_name))
+
+                    if attached:
+                        query = " UNION ALL ".join(
+                            f'''SELECT ? AS project, c.name, e.key, e.name, e.text, e.description
+                                FROM {alias}.entries e
+                                JOIN {alias}.categories c ON e.category_id = c.id
+                                WHERE e.key {like} OR e.name {like} OR e.text {like}'''
+                            for alias, _ in attached
+                        )
+                        params = []
+                        for _, project_name in attached:
+                            params.extend((project_name, pattern, pattern, pattern))
+                        cursor.execute(query, params)
+                        for project, category, key, name, text, description in cursor.fetchall():
+                            # I progetti non ancora aperti con questa versione possono avere chiavi con il wrapper
+                            hits.append({
+                                'project': project, 'category': category, 'key': strip_key_wrapper(key),
+                                'name': name, 'text': text, 'description': description
+                            })
+                        hits = heapq.nsmallest(limit, hits, key=rank)
+                finally:
+                    for alias, _ in attached:
+                        cursor.execute(f"DETACH DATABASE {alias}")
+
+        return sorted(hits, key=rank)
+
+    @staticmethod
+    def _attach(cursor, alias, project_name, db_path):
+        """
+        Collega in sola lettura il database di un progetto e verifica che abbia le tabelle
+        delle definizioni. Un database illeggibile o estraneo viene scollegato e saltato
+        Returns:
+            str: L'alias del database collegato, o None
+        """
+        uri = f"{db_path.as_uri()}?mode=ro"
+        try:
+            cursor.execute(f"ATTACH DATABASE ? AS {alias}", (uri,))
+        except sqlite3.Error as e:
+            print(f"Impossibile collegare il progetto {project_name}: {e}")
+            return None
+        try:
+            # Un file che non è un database SQLite dà errore solo alla prima lettura
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {alias}.sqlite_master "
+                f"WHERE type = 'table' AND name IN ('entries', 'categories')")
+            if cursor.fetchone()[0] == 2:
+                return alias
+        except sqlite3.Error as e:
+            print(f"Progetto {project_name} non leggibile: {e}")
+        cursor.execute(f"DETACH DATABASE {alias}")
+        return None
+
+
+class GlobalSearchDialog:
+    """Finestra di ricerca delle definizioni in tutti i progetti"""
+    def __init__(self, parent, project_manager):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Cerca in tutti i progetti")
+        self.window.geometry("800x450")
+        self.parent = parent
+        self.search_engine = GlobalSearch(project_manager)
+        self._hits = {}  # item del Treeview -> risultato
+        self._result = None
+        self._searching = False
+
+        self.window.transient(parent)
+        self._create_widgets()
+
+    def _create_widgets(self):
+        main_frame = ttk.Frame(self.window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Campo di ricerca
+        search_frame = ttk.Frame(main_frame)
+        search_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(search_frame, text="Cerca:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        search_entry.bind('<Return>', lambda e: self._search())
+        search_entry.focus_set()
+        self.search_button = ttk.Button(search_frame, text="Cerca", command=self._search)
+        self.search_button.pack(side=tk.LEFT)
+
+        # Risultati
+        columns = ('Progetto', 'Categoria', 'Chiave', 'Nome', 'Testo')
+        self.results = ttk.Treeview(main_frame, columns=columns, show='headings')
+        widths = {'Progetto': 140, 'Categoria': 120, 'Chiave': 120, 'Nome': 180, 'Testo': 180}
+        for col in columns:
+            self.results.heading(col, text=col)
+            self.results.column(col, width=widths[col])
+        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=self.results.yview)
+        self.results.configure(yscrollcommand=scrollbar.set)
+        self.results.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        self.results.bind('<Double-1>', self._open_selected)
+
+        self.status_var = tk.StringVar(value="Doppio clic su un risultato per aprirlo")
+        ttk.Label(self.window, textvariable=self.status_var).pack(fill=tk.X, padx=10, pady=(0, 5))
+
+    def _search(self):
+        """Avvia la ricerca in un thread separato e ne attende il risultato"""
+        if self._searching:
+            return
+        for item in self.results.get_children():
+            self.results.delete(item)
+        self._hits = {}
+        self._result = None
+        self._searching = True
+        self.search_button.config(state='disabled')
+        self.status_var.set("Ricerca in corso...")
+        term = self.search_var.get()
+
+        # Con molti progetti la ricerca scorre parecchi blocchi di ATTACH: fuori dal thread di Tk
+        def worker():
+            start = time.perf_counter()
+            try:
+                hits = self.search_engine.search(term)
+                self._result = ('done', hits, time.perf_counter() - start)
+            except Exception as e:
+                self._result = ('error', str(e), None)
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.window.after(100, self._poll_search)
+
+    def _poll_search(self):
+        if not self.window.winfo_exists():
+            return
+        if self._result is None:
+            self.window.after(100, self._poll_search)
+            return
+        kind, value, elapsed = self._result
+        self._result = None
+        self._searching = False
+        self.search_button.config(state='normal')
+        if kind == 'error':
+            self.status_var.set("")
+            messagebox.showerror("Errore", f"Errore durante la ricerca: {value}", parent=self.window)
+            return
+
+        for hit in value:
+            item = self.results.insert('', 'end', values=(
+                hit['project'], hit['category'], hit['key'], hit['name'], hit['text']))
+            self._hits[item] = hit
+        self.status_var.set(f"{len(value)} risultati in {elapsed * 1000:.0f} ms")
+
+    def _open_selected(self, event=None):
+        """Apre nell'editor la definizione selezionata"""
+        selection = self.results.selection()
+        if not selection:
+            return
+        hit = self._hits.get(selection[0])
+        if hit and hasattr(self.parent, 'open_entry'):
+            self.parent.open_entry(hit['project'], hit['category'], hit['key'])
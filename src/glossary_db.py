@@ -1,9 +1,16 @@
 import sqlite3
 import os
 import re
+import csv
+import hashlib
 from datetime import datetime
 from .latex_parser import parse_glossary_entry  # Aggiunto il punto per l'importazione relativa
 from .glossary_os_handler import GlossaryOSHandler
+from .entry_record import build_entry_records, strip_key_wrapper, canonical_key
+from .project_cache import ProjectCache
+from .options_write import pack_formats, unpack_formats, migrate_formatting_options
+from .latex_text import latex_to_plain, make_sort_key
+from .collation import connect
 
 
 #costante di default per import e export
@@ -22,11 +29,47 @@ DEFAULT_GLOSSARY_ENTRY = '''%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
     }
 '''
 
+# Colonne di entries selezionabili nelle query paginate
+ENTRY_COLUMNS = (
+    'id', 'definition_id', 'category_id', 'key', 'canonical_key', 'type', 'name', 'first',
+    'text', 'description', 'is_math', 'format_flags', 'name_plain', 'text_plain',
+    'sort_key', 'created_at', 'updated_at'
+)
+
+# Campi dei record di interscambio (JSONL, CSV) nell'ordine in cui vengono scritti
+EXPORT_FIELDS = ('category', 'group', 'comment', 'key', 'type', 'name', 'first', 'text',
+                 'description', 'is_math', 'formats')
+
+# Intestazione CSV/TSV: la formattazione è l'intero compatto di format_flags
+CSV_COLUMNS = EXPORT_FIELDS[:-1] + ('format_flags',)
+
+# Intestazione del file .bib: come caricarlo con bib2gls
+BIB_HEADER = '''% Glossario generato da LaTeX Glossary Editor per bib2gls
+% Uso nel preambolo (glossaries-extra con l'opzione record):
+%   \\GlsXtrLoadResources[src={{{name}}},match={{entrytype=acronym}},type=\\acronymtype,selection={{recorded and deps}}]
+%   \\GlsXtrLoadResources[src={{{name}}},not-match={{entrytype=acronym}},selection={{recorded and deps}}]
+% Le sigle (@acronym) vanno nella lista degli acronimi, le altre definizioni
+% nel glossario indicato dal loro campo type.
+% Solo le definizioni usate nel documento vengono caricate e compilate.
+
+'''
+
+# Versione dello schema in PRAGMA user_version: le riparazioni una tantum girano
+# solo sui database con una versione inferiore, non a ogni apertura
+SCHEMA_LATEX_ACCENTS = 1
+SCHEMA_CANONICAL_KEYS = 2
+SCHEMA_VERSION = SCHEMA_CANONICAL_KEYS
+
+# Valori di cella interpretati come "vero" (is_math)
+_TRUE_VALUES = {'1', 'true', 'vero', 'si', 'sì', 'yes', 'x'}
+
 class GlossaryDatabase:
     def __init__(self, db_path=None):
         self.os_handler = GlossaryOSHandler()
         self.os_handler.ensure_directories_exist()
         self.db_path = db_path or self.os_handler.get_database_path()
+        # Cache in memoria di categorie e definizioni (popolata al caricamento del progetto)
+        self.cache = ProjectCache(self.db_path)
         self._create_database()
         # Aggiungi qui la chiamata per correggere gli ID NULL
         self.fix_null_category_ids()
@@ -75,6 +118,12 @@ class GlossaryDatabase:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
 
+            # Ha effetto solo sui database nuovi (senza tabelle): lo spazio delle righe
+            # eliminate può essere restituito con PRAGMA incremental_vacuum
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('PRAGMA user_version')
+            version = cursor.fetchone()[0]
+
             # Tabella categories
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS categories (
@@ -95,12 +144,17 @@ class GlossaryDatabase:
                     definition_id TEXT UNIQUE,
                     category_id INTEGER,
                     key TEXT NOT NULL,
+                    canonical_key TEXT,
                     type TEXT NOT NULL DEFAULT '\\acronymtype',
                     name TEXT NOT NULL,
                     first TEXT NOT NULL,
                     text TEXT NOT NULL,
                     description TEXT,
                     is_math BOOLEAN DEFAULT 0,
+                    format_flags INTEGER,
+                    name_plain TEXT COLLATE NOCASE,
+                    text_plain TEXT COLLATE NOCASE,
+                    sort_key TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE,
@@ -129,11 +183,343 @@ class GlossaryDatabase:
                 (name, category_id) 
                 VALUES ("Generale", ?)
             ''', (generale_id,))
+            self._migrate_format_flags(cursor)
+            self._migrate_canonical_keys(cursor, version)
+            self._migrate_plain_text_columns(cursor, version)
+            self._create_category_stats(cursor)
+            self._create_usage_tables(cursor)
+            if version < SCHEMA_VERSION:
+                cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
             conn.commit()
             print("Database creato correttamente")
             # Verifica e correggi eventuali category_id NULL
             self.fix_null_category_ids()
     
+    def _migrate_format_flags(self, cursor):
+        """Aggiunge entries.format_flags ai database esistenti e vi sposta formatting_options"""
+        cursor.execute('PRAGMA table_info(entries)')
+        if 'format_flags' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE entries ADD COLUMN format_flags INTEGER')
+        migrated = migrate_formatting_options(cursor)
+        if migrated:
+            print(f"Formattazione di {migrated} definizioni migrata in entries.format_flags")
+
+    def _migrate_canonical_keys(self, cursor, version):
+        """
+        Migrazione una tantum delle chiavi: toglie il wrapper \\newglossaryentry{...}
+        salvato dalle versioni precedenti, calcola canonical_key e crea l'indice univoco
+        """
+        cursor.execute('PRAGMA table_info(entries)')
+        if 'canonical_key' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE entries ADD COLUMN canonical_key TEXT')
+
+        # Il controllo scorre tutta la tabella: solo sui database non ancora migrati
+        needs_migration = False
+        if version < SCHEMA_CANONICAL_KEYS:
+            cursor.execute('''
+                SELECT COUNT(*) FROM entries
+                WHERE canonical_key IS NULL OR key LIKE '\\newglossaryentry{%'
+            ''')
+            needs_migration = cursor.fetchone()[0] > 0
+        if needs_migration:
+            cursor.execute('SELECT id, category_id, key, canonical_key FROM entries ORDER BY updated_at, id')
+            rows = cursor.fetchall()
+
+            # La stessa chiave può esistere sia con il wrapper sia senza: la riga
+            # modificata più di recente mantiene la chiave, le altre vengono
+            # rinominate (chiave_2, chiave_3, ...) senza perdere dati
+            latest = {}
+            for entry_id, category_id, key, _ in rows:
+                latest[(category_id, canonical_key(key))] = entry_id
+            taken = set(latest)
+
+            updates = []
+            renamed = []
+            for entry_id, category_id, key, current in rows:
+                clean = strip_key_wrapper(key.strip()).strip()
+                canonical = canonical_key(key)
+                if latest[(category_id, canonical)] != entry_id:
+                    suffix = 2
+                    while (category_id, canonical_key(f"{clean}_{suffix}")) in taken:
+                        suffix += 1
+                    clean = f"{clean}_{suffix}"
+                    canonical = canonical_key(clean)
+                    taken.add((category_id, canonical))
+                    renamed.append((key, clean))
+                if clean != key or current != canonical:
+                    updates.append((clean, canonical, entry_id))
+
+            # Prima si azzerano le chiavi canoniche da cambiare, così l'indice univoco
+            # (se già presente) non vede collisioni temporanee durante gli aggiornamenti
+            cursor.executemany('UPDATE entries SET canonical_key = NULL WHERE id = ?',
+                               [(entry_id,) for _, _, entry_id in updates])
+            cursor.executemany('UPDATE entries SET key = ?, canonical_key = ? WHERE id = ?', updates)
+            print(f"Chiavi migrate: {len(updates)} aggiornate, {len(renamed)} duplicati rinominati")
+            for old_key, new_key in renamed:
+                print(f"  {old_key} -> {new_key}")
+
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_canonical_key
+            ON entries(category_id, canonical_key)
+        ''')
+        # Ricerche per chiave in tutto il progetto (rinomina, uso nei sorgenti)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_entries_canonical ON entries(canonical_key)')
+
+    def _migrate_plain_text_columns(self, cursor, version):
+        """
+        Aggiunge le colonne di testo semplice e ordinamento con i relativi indici.
+        I valori delle righe esistenti vengono calcolati da backfill_plain_text()
+        """
+        cursor.execute('PRAGMA table_info(entries)')
+        existing = [row[1] for row in cursor.fetchall()]
+        for column, definition in (('name_plain', 'TEXT COLLATE NOCASE'),
+                                   ('text_plain', 'TEXT COLLATE NOCASE'),
+                                   ('sort_key', 'TEXT')):
+            if column not in existing:
+                cursor.execute(f'ALTER TABLE entries ADD COLUMN {column} {definition}')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_entries_sort_key ON entries(category_id, sort_key)
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_entries_name_plain ON entries(name_plain)')
+        # Le versioni precedenti lasciavano gli accenti LaTeX (\'e, \`a) nel testo
+        # semplice: quelle righe vengono ricalcolate da backfill_plain_text(), una volta sola
+        if version < SCHEMA_LATEX_ACCENTS:
+            cursor.execute('''
+                UPDATE entries SET sort_key = NULL
+                WHERE name_plain GLOB '*\\[''`"~=.^]*' OR text_plain GLOB '*\\[''`"~=.^]*'
+            ''')
+
+    def _create_category_stats(self, cursor):
+        """
+        Tabella aggregata per categoria mantenuta dai trigger su entries: numero di
+        definizioni, definizioni matematiche, ultima modifica e revisione. L'hash del
+        contenuto viene azzerato dai trigger e ricalcolato solo quando richiesto
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'category_stats'")
+        exists = cursor.fetchone() is not None
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS category_stats (
+                category_id INTEGER PRIMARY KEY,
+                entry_count INTEGER NOT NULL DEFAULT 0,
+                math_count INTEGER NOT NULL DEFAULT 0,
+                last_modified TIMESTAMP,
+                revision INTEGER NOT NULL DEFAULT 0,
+                content_hash TEXT
+            )
+        ''')
+        # Un UPDATE che sposta la definizione di categoria viene trattato
+        # come rimozione dalla vecchia e inserimento nella nuova. Solo le colonne
+        # che entrano nelle statistiche o nell'hash attivano il trigger: backfill
+        # di sort_key e testo semplice non cambiano la revisione della categoria.
+        # Il trigger viene ricreato perché i database esistenti hanno la versione
+        # senza elenco di colonne
+        cursor.executescript('''
+            CREATE TRIGGER IF NOT EXISTS entries_stats_insert AFTER INSERT ON entries
+            BEGIN
+                INSERT INTO category_stats (category_id, entry_count, math_count, last_modified, revision)
+                VALUES (NEW.category_id, 1, COALESCE(NEW.is_math, 0) != 0, NEW.updated_at, 1)
+                ON CONFLICT(category_id) DO UPDATE SET
+                    entry_count = entry_count + 1,
+                    math_count = math_count + excluded.math_count,
+                    last_modified = MAX(COALESCE(last_modified, ''), excluded.last_modified),
+                    revision = revision + 1,
+                    content_hash = NULL;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS entries_stats_delete AFTER DELETE ON entries
+            BEGIN
+                UPDATE category_stats SET
+                    entry_count = entry_count - 1,
+                    math_count = math_count - (COALESCE(OLD.is_math, 0) != 0),
+                    last_modified = CURRENT_TIMESTAMP,
+                    revision = revision + 1,
+                    content_hash = NULL
+                WHERE category_id = OLD.category_id;
+            END;
+
+            DROP TRIGGER IF EXISTS entries_stats_update;
+            CREATE TRIGGER entries_stats_update
+            AFTER UPDATE OF category_id, key, type, name, first, text, description,
+                            is_math, format_flags ON entries
+            BEGIN
+                UPDATE category_stats SET
+                    entry_count = entry_count - 1,
+                    math_count = math_count - (COALESCE(OLD.is_math, 0) != 0),
+                    revision = revision + 1,
+                    content_hash = NULL
+                WHERE category_id = OLD.category_id;
+                INSERT INTO category_stats (category_id, entry_count, math_count, last_modified, revision)
+                VALUES (NEW.category_id, 1, COALESCE(NEW.is_math, 0) != 0, NEW.updated_at, 1)
+                ON CONFLICT(category_id) DO UPDATE SET
+                    entry_count = entry_count + 1,
+                    math_count = math_count + excluded.math_count,
+                    last_modified = MAX(COALESCE(last_modified, ''), excluded.last_modified),
+                    revision = revision + 1,
+                    content_hash = NULL;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS categories_stats_delete AFTER DELETE ON categories
+            BEGIN
+                DELETE FROM category_stats WHERE category_id = OLD.id;
+            END;
+        ''')
+        if not exists:
+            self._fill_category_stats(cursor)
+
+    def _create_usage_tables(self, cursor):
+        """
+        Tabelle dell'analisi dei sorgenti LaTeX: usage_files ricorda mtime, dimensione
+        e hash di ogni file scansionato (per le scansioni incrementali), usage contiene
+        un riferimento \\gls per riga, con chiave, comando e numero di riga
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage_files (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                sha1 TEXT NOT NULL,
+                reference_count INTEGER NOT NULL DEFAULT 0,
+                scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL,
+                canonical_key TEXT NOT NULL,
+                key TEXT NOT NULL,
+                command TEXT NOT NULL,
+                line INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_canonical_key ON usage(canonical_key)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_path ON usage(path)')
+
+    @staticmethod
+    def _fill_category_stats(cursor):
+        """Ricalcola la tabella aggregata scorrendo tutte le definizioni"""
+        cursor.execute('DELETE FROM category_stats')
+        cursor.execute('''
+            INSERT INTO category_stats (category_id, entry_count, math_count, last_modified, revision)
+            SELECT category_id, COUNT(*), SUM(COALESCE(is_math, 0) != 0), MAX(updated_at), 1
+            FROM entries
+            WHERE category_id IS NOT NULL
+            GROUP BY category_id
+        ''')
+
+    def rebuild_category_stats(self):
+        """Ricostruisce la tabella aggregata (es. dopo modifiche fatte senza trigger)"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            self._fill_category_stats(cursor)
+            conn.commit()
+
+    def get_category_summaries(self):
+        """
+        Restituisce i riepiloghi di tutte le categorie senza scorrere le definizioni
+        Returns:
+            dict: nome categoria -> {entry_count, math_count, last_modified, revision}
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT c.name, COALESCE(s.entry_count, 0), COALESCE(s.math_count, 0),
+                       s.last_modified, COALESCE(s.revision, 0)
+                FROM categories c
+                LEFT JOIN category_stats s ON s.category_id = c.id
+            ''')
+            return {
+                name: {'entry_count': entry_count, 'math_count': math_count,
+                       'last_modified': last_modified, 'revision': revision}
+                for name, entry_count, math_count, last_modified, revision in cursor.fetchall()
+            }
+
+    def get_category_summary(self, category_name):
+        """Restituisce il riepilogo di una categoria o None"""
+        return self.get_category_summaries().get(category_name)
+
+    def get_category_content_hash(self, category_name):
+        """
+        Restituisce l'hash del contenuto di una categoria. Viene calcolato solo se le
+        definizioni sono cambiate dall'ultima richiesta, altrimenti è letto dalla tabella
+        """
+        category_id = self.cache.get_category_id(category_name)
+        if category_id is None:
+            return None
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT revision, content_hash FROM category_stats WHERE category_id = ?',
+                           (category_id,))
+            row = cursor.fetchone()
+            if row and row[1]:
+                return row[1]
+
+            digest = hashlib.sha1()
+            cursor.execute('''
+                SELECT key, type, name, first, text, description, is_math, format_flags
+                FROM entries WHERE category_id = ?
+                ORDER BY canonical_key
+            ''', (category_id,))
+            for values in cursor:
+                digest.update(repr(values).encode('utf-8'))
+            content_hash = digest.hexdigest()
+
+            if row:
+                # Salva l'hash solo se nel frattempo non ci sono state altre modifiche
+                cursor.execute('''
+                    UPDATE category_stats SET content_hash = ?
+                    WHERE category_id = ? AND revision = ?
+                ''', (content_hash, category_id, row[0]))
+                conn.commit()
+            return content_hash
+
+    @staticmethod
+    def plain_text_values(key, name, text):
+        """Restituisce (name_plain, text_plain, sort_key) per una definizione"""
+        name_plain = latex_to_plain(name)
+        return name_plain, latex_to_plain(text), make_sort_key(name_plain or key)
+
+    def count_missing_plain_text(self):
+        """Numero di definizioni senza testo semplice calcolato"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM entries WHERE sort_key IS NULL')
+            return cursor.fetchone()[0]
+
+    def backfill_plain_text(self, batch_size=2000):
+        """
+        Calcola name_plain, text_plain e sort_key delle definizioni che ne sono prive
+        Args:
+            batch_size (int): Righe aggiornate per transazione
+        Returns:
+            int: Numero di definizioni aggiornate
+        """
+        updated = 0
+        last_id = 0
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            while True:
+                cursor.execute('''
+                    SELECT id, key, name, text FROM entries
+                    WHERE sort_key IS NULL AND id > ?
+                    ORDER BY id LIMIT ?
+                ''', (last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                cursor.executemany(
+                    'UPDATE entries SET name_plain = ?, text_plain = ?, sort_key = ? WHERE id = ?',
+                    [(*self.plain_text_values(key, name, text), entry_id)
+                     for entry_id, key, name, text in rows]
+                )
+                conn.commit()
+                updated += len(rows)
+                last_id = rows[-1][0]
+        if updated:
+            print(f"Testo semplice calcolato per {updated} definizioni")
+        return updated
+
     def add_category(self, name, comment=None):
         """Aggiunge una nuova categoria con commento opzionale"""
         with sqlite3.connect(self.db_path) as conn:
@@ -142,6 +528,7 @@ class GlossaryDatabase:
                 cursor.execute('INSERT INTO categories (name, comment) VALUES (?, ?)', 
                              (name, comment))
                 conn.commit()
+                self.cache.set_category(name, cursor.lastrowid, comment=comment)
                 return True
             except sqlite3.IntegrityError:
                 print(f"Errore: la categoria {name} esiste già")
@@ -185,6 +572,7 @@ class GlossaryDatabase:
                 cursor.execute('DELETE FROM categories WHERE id = ?', (category_id,))
                 
                 conn.commit()
+                self.cache.remove_category(category_name)
                 return True, "Categoria eliminata con successo"
                 
             except sqlite3.Error as e:
@@ -198,22 +586,21 @@ class GlossaryDatabase:
             cursor.execute('UPDATE categories SET comment = ? WHERE name = ?', 
                          (comment, category_name))
             conn.commit()
-            return cursor.rowcount > 0
+            if cursor.rowcount > 0:
+                self.cache.set_category(category_name, comment=comment)
+                return True
+            return False
     
     def get_category_comment(self, category_name):
         """Ottiene il commento di una categoria"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT comment FROM categories WHERE name = ?', 
-                         (category_name,))
-            result = cursor.fetchone()
-            return result[0] if result else None
+        category = self.cache.get_category(category_name)
+        return category['comment'] if category else None
     
     def get_categories(self):
         """Restituisce tutte le categorie"""
-        with sqlite3.connect(self.db_path) as conn:
+        with connect(self.db_path) as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT name FROM categories ORDER BY name')
+            cursor.execute('SELECT name FROM categories ORDER BY name COLLATE ITALIAN')
             return [row[0] for row in cursor.fetchall()]
     
     def cleanup_group_names(self):
@@ -242,6 +629,7 @@ class GlossaryDatabase:
                         print(f"Categoria '{cat_name}': {group_name} -> {clean_value}")
                 
                 conn.commit()
+                self.cache.invalidate()
                 print("Pulizia completata")
                 return True
             
@@ -251,65 +639,193 @@ class GlossaryDatabase:
     
     def add_entry(self, category_name, entry_data):
         """Aggiunge o aggiorna una definizione"""
+        return self.upsert_entry(category_name, entry_data) is not None
+
+    def upsert_entry(self, category_name, entry_data, formats=None, category_comment=None):
+        """
+        Inserisce o aggiorna una definizione mantenendo stabile il suo id
+        Args:
+            category_name (str): Nome della categoria
+            entry_data (dict): key (senza \\newglossaryentry{}), name, first, text, description e opzionalmente type, is_math
+            formats (dict): Opzioni di formattazione per campo ('name', 'first', 'text'),
+                ognuna con format_type, is_math_mode, first_letter_bold
+            category_comment (str): Nuovo commento della categoria, scritto nella stessa
+                transazione della definizione (None: commento invariato)
+        Returns:
+            int: L'id della definizione o None in caso di errore
+        """
+        # Ottieni l'ID della categoria dalla cache
+        category_id = self.cache.get_category_id(category_name)
+        if category_id is None:
+            return None
+        key = strip_key_wrapper(entry_data['key'].strip()).strip()
+
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             try:
-                # Ottieni l'ID della categoria
-                cursor.execute('SELECT id FROM categories WHERE name = ?', (category_name,))
-                category_id = cursor.fetchone()
-                
-                if not category_id:
-                    return False
-                
-                # Crea l'entry LaTeX
-                latex_key = f"\\newglossaryentry{{{entry_data['key']}}}"
-                
-                # Aggiunge l'entry nel database
+                # In caso di conflitto sulla chiave aggiorna la riga esistente:
+                # id, definition_id e created_at restano invariati
                 cursor.execute('''
-                    INSERT OR REPLACE INTO entries
-                    (category_id, key, type, name, first, text, description, is_math)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO entries
+                    (definition_id, category_id, key, canonical_key, type, name, first, text,
+                     description, is_math, format_flags, name_plain, text_plain, sort_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(category_id, canonical_key) DO UPDATE SET
+                        key = excluded.key,
+                        type = excluded.type,
+                        name = excluded.name,
+                        first = excluded.first,
+                        text = excluded.text,
+                        description = excluded.description,
+                        is_math = excluded.is_math,
+                        format_flags = COALESCE(excluded.format_flags, entries.format_flags),
+                        name_plain = excluded.name_plain,
+                        text_plain = excluded.text_plain,
+                        sort_key = excluded.sort_key,
+                        updated_at = CURRENT_TIMESTAMP
                 ''', (
-                    category_id[0],
-                    latex_key,
-                    entry_data.get('type', '\\acronymtype'),
+                    f"DEF_{os.urandom(4).hex()}",
+                    category_id,
+                    key,
+                    canonical_key(key),
+                    entry_data.get('type') or '\\acronymtype',
                     entry_data['name'],
                     entry_data['first'],
                     entry_data['text'],
                     entry_data['description'],
-                    entry_data.get('is_math', False)
+                    entry_data.get('is_math', False),
+                    pack_formats(formats) if formats else None,
+                    *self.plain_text_values(key, entry_data['name'], entry_data['text'])
                 ))
-                
+
+                cursor.execute('''
+                    SELECT id FROM entries WHERE category_id = ? AND canonical_key = ?
+                ''', (category_id, canonical_key(key)))
+                entry_id = cursor.fetchone()[0]
+
+                if category_comment is not None:
+                    cursor.execute('UPDATE categories SET comment = ? WHERE id = ?',
+                                   (category_comment, category_id))
+
                 conn.commit()
-                return True
             except sqlite3.Error as e:
+                conn.rollback()
                 print(f"Errore database: {e}")
-                return False
+                return None
+
+        if category_comment is not None:
+            self.cache.set_category(category_name, comment=category_comment)
+        self.cache.set_entry(category_name, key, entry_id)
+        return entry_id
     
     def get_entries(self, category_name):
         """Restituisce tutte le definizioni per una categoria"""
-        with sqlite3.connect(self.db_path) as conn:
+        with connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT e.* FROM entries e
                 JOIN categories c ON e.category_id = c.id
                 WHERE c.name = ?
-                ORDER BY e.key
+                ORDER BY e.key COLLATE ITALIAN
             ''', (category_name,))
             
             columns = [desc[0] for desc in cursor.description]
-            entries = []
-            for row in cursor.fetchall():
-                entry = dict(zip(columns, row))
-                # Pulisci la chiave rimuovendo \newglossaryentry{...}
-                if entry['key'].startswith('\\newglossaryentry{'):
-                    entry['key'] = entry['key'][16:-1]  # Rimuovi \newglossaryentry{ e }
-                entries.append(entry)
-            return entries
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
+    def get_entries_page(self, category_name, after_key=None, limit=200, columns=('key',)):
+        """
+        Restituisce una pagina di definizioni con paginazione a chiave (keyset)
+        Args:
+            category_name (str): Nome della categoria
+            after_key (str): Chiave dell'ultima riga della pagina precedente
+            limit (int): Numero massimo di righe della pagina
+            columns (tuple): Colonne di entries da restituire
+        Returns:
+            tuple: (lista di dict con le colonne richieste, chiave per la pagina successiva o None)
+        """
+        invalid = [col for col in columns if col not in ENTRY_COLUMNS]
+        if invalid:
+            raise ValueError(f"Colonne non valide: {', '.join(invalid)}")
+
+        # La chiave serve sempre come cursore della pagina successiva
+        select = ', '.join(f'e.{col}' for col in columns)
+        query = f'''
+            SELECT e.key, {select} FROM entries e
+            WHERE e.category_id = (SELECT id FROM categories WHERE name = ?)
+        '''
+        params = [category_name]
+        if after_key is not None:
+            query += ' AND e.key > ? COLLATE NOCASE'
+            params.append(after_key)
+        query += ' ORDER BY e.key COLLATE NOCASE LIMIT ?'
+        params.append(limit)
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        entries = [dict(zip(columns, row[1:])) for row in rows]
+
+        next_key = rows[-1][0] if len(rows) == limit else None
+        return entries, next_key
+
+    def iter_entries(self, category_name, columns=('key',), page_size=500):
+        """Generatore che scorre le definizioni di una categoria pagina per pagina"""
+        after_key = None
+        while True:
+            entries, after_key = self.get_entries_page(
+                category_name, after_key, page_size, columns)
+            yield from entries
+            if after_key is None:
+                break
+
+    def iter_entry_keys(self, category_name, page_size=500):
+        """Generatore che restituisce le pagine di chiavi (solo la colonna key)"""
+        after_key = None
+        while True:
+            entries, after_key = self.get_entries_page(
+                category_name, after_key, page_size, ('key',))
+            if entries:
+                yield [entry['key'] for entry in entries]
+            if after_key is None:
+                break
+
+    def search_entries(self, term, category_name=None, limit=200):
+        """
+        Cerca nel testo semplice di nome e testo, senza markup LaTeX
+        Args:
+            term (str): Testo da cercare (senza distinzione maiuscole/minuscole)
+            category_name (str): Categoria da filtrare, None per tutte
+            limit (int): Numero massimo di risultati
+        Returns:
+            list: Lista di dict (category_name, key, name, text) ordinata per sort_key
+        """
+        term = latex_to_plain(term)
+        if not term:
+            return []
+        query = '''
+            SELECT c.name AS category_name, e.key, e.name, e.text
+            FROM entries e
+            JOIN categories c ON e.category_id = c.id
+            WHERE (e.name_plain LIKE ? OR e.text_plain LIKE ?)
+        '''
+        params = [f"%{term}%", f"%{term}%"]
+        if category_name is not None:
+            query += ' AND c.name = ?'
+            params.append(category_name)
+        query += ' ORDER BY e.sort_key, e.key LIMIT ?'
+        params.append(limit)
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
     def get_all_entries(self):
         """Restituisce tutte le entries nel database con i nomi delle categorie"""
-        with sqlite3.connect(self.db_path) as conn:
+        with connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT 
@@ -324,7 +840,7 @@ class GlossaryDatabase:
                     e.updated_at
                 FROM entries e
                 JOIN categories c ON e.category_id = c.id
-                ORDER BY c.name, e.key
+                ORDER BY c.name COLLATE ITALIAN, e.key COLLATE ITALIAN
             ''')
             
             columns = [description[0] for description in cursor.description]
@@ -334,57 +850,107 @@ class GlossaryDatabase:
             
             return entries
     
+    def get_entry_records(self, category_name=None):
+        """
+        Restituisce le definizioni come EntryRecord compatti e immutabili
+        Args:
+            category_name (str): Categoria da filtrare, None per tutte le categorie
+        Returns:
+            list: Lista di EntryRecord ordinata per categoria e chiave
+        """
+        query = '''
+            SELECT
+                e.id,
+                c.name,
+                e.key,
+                e.type,
+                e.name,
+                e.first,
+                e.text,
+                e.description,
+                e.is_math,
+                e.created_at,
+                e.updated_at
+            FROM entries e
+            JOIN categories c ON e.category_id = c.id
+        '''
+        params = ()
+        if category_name is not None:
+            query += ' WHERE c.name = ?'
+            params = (category_name,)
+        query += ' ORDER BY c.name COLLATE ITALIAN, e.key COLLATE ITALIAN'
+
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return build_entry_records(cursor)
+
     def delete_entry(self, category_name, key):
         """Elimina una definizione dal database"""
+        # Ottieni l'ID della categoria dalla cache
+        category_id = self.cache.get_category_id(category_name)
+        if category_id is None:
+            return False
+
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             try:
-                # Ottieni l'ID della categoria
-                cursor.execute('SELECT id FROM categories WHERE name = ?', (category_name,))
-                category_id = cursor.fetchone()
-                
-                if not category_id:
-                    return False
-                
-                # Crea la chiave LaTeX completa
-                latex_key = f"\\newglossaryentry{{{key}}}"
-                
                 # Elimina l'entry
                 cursor.execute('''
                     DELETE FROM entries 
-                    WHERE category_id = ? AND key = ?
-                ''', (category_id[0], latex_key))
+                    WHERE category_id = ? AND canonical_key = ?
+                ''', (category_id, canonical_key(key)))
                 
                 conn.commit()
-                return cursor.rowcount > 0
+                if cursor.rowcount > 0:
+                    self.cache.remove_entry(category_name, key)
+                    return True
+                return False
             except sqlite3.Error as e:
                 print(f"Errore database: {e}")
                 return False
             
-    def export_to_latex(self):
-        """Esporta tutte le definizioni in formato LaTeX"""
-        with sqlite3.connect(self.db_path) as conn:
+    def export_to_latex(self, keys=None):
+        """
+        Esporta le definizioni in formato LaTeX
+        Args:
+            keys (iterable): Chiavi da esportare (senza distinzione maiuscole/minuscole);
+                None esporta tutte le definizioni
+        """
+        with connect(self.db_path) as conn:
             cursor = conn.cursor()
             content = ""
+
+            entry_filter = ""
+            if keys is not None:
+                # Selezione in una tabella temporanea: niente limiti sul numero di parametri
+                cursor.execute('CREATE TEMP TABLE IF NOT EXISTS export_keys (canonical_key TEXT PRIMARY KEY)')
+                cursor.execute('DELETE FROM temp.export_keys')
+                cursor.executemany('INSERT OR IGNORE INTO temp.export_keys VALUES (?)',
+                                   ((canonical_key(key),) for key in keys))
+                entry_filter = "AND e.canonical_key IN (SELECT canonical_key FROM temp.export_keys)"
             
             # Prima controlla se la categoria Generale ha entries
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT EXISTS(
                     SELECT 1 FROM entries e 
                     JOIN categories c ON e.category_id = c.id 
-                    WHERE c.name = 'Generale'
+                    WHERE c.name = 'Generale' {entry_filter}
                 )
             ''')
             has_generale_entries = cursor.fetchone()[0]
             
             # Ottieni tutte le categorie con i loro commenti
-            cursor.execute('''
+            # (con una selezione di chiavi, solo quelle che ne contengono almeno una)
+            category_filter = (f"AND EXISTS(SELECT 1 FROM entries e WHERE e.category_id = c.id {entry_filter})"
+                               if keys is not None else "")
+            cursor.execute(f'''
                 SELECT c.name, c.comment 
                 FROM categories c
-                WHERE (c.name != 'Generale' OR (c.name = 'Generale' AND ?))
+                WHERE (c.name != 'Generale' OR (c.name = 'Generale' AND ?)) {category_filter}
                 ORDER BY 
                     CASE WHEN c.name = 'Generale' THEN 0 ELSE 1 END,
-                    c.name
+                    c.name COLLATE ITALIAN
             ''', (has_generale_entries,))
             
             for category_name, comment in cursor.fetchall():
@@ -397,12 +963,12 @@ class GlossaryDatabase:
                     
                 content += "\n"
                 
-                cursor.execute('''
+                cursor.execute(f'''
                     SELECT e.key, e.type, e.name, e.first, e.text, e.description, c.group_name
                     FROM entries e
                     JOIN categories c ON e.category_id = c.id
-                    WHERE c.name = ?
-                    ORDER BY e.key
+                    WHERE c.name = ? {entry_filter}
+                    ORDER BY e.key COLLATE ITALIAN
                 ''', (category_name,))
                 
                 rows = cursor.fetchall()
@@ -411,8 +977,6 @@ class GlossaryDatabase:
                     group_text = ""
                     
                     key = entry[0]
-                    if key.startswith('\\newglossaryentry{'):
-                        key = key[len('\\newglossaryentry{'):-1]
                     
                     # Gestione separata del gruppo
                     group_name = entry[6]
@@ -502,26 +1066,31 @@ class GlossaryDatabase:
                                 definition_id = f"DEF_{os.urandom(4).hex()}"
                                 cursor.execute('''
                                     INSERT INTO entries (
-                                        definition_id, category_id, key, type, name,
-                                        first, text, description, is_math
-                                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                        definition_id, category_id, key, canonical_key, type,
+                                        name, first, text, description, is_math,
+                                        name_plain, text_plain, sort_key
+                                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                                 ''', (
                                     definition_id,
                                     category_id,
-                                    entry['key'],
+                                    strip_key_wrapper(entry['key'].strip()).strip(),
+                                    canonical_key(entry['key']),
                                     entry['type'] or '\\acronymtype',
                                     entry['name'],
                                     entry['first'],
                                     entry['text'],
                                     entry['description'],
-                                    entry.get('is_math', False)
+                                    entry.get('is_math', False),
+                                    *self.plain_text_values(entry['key'], entry['name'], entry['text'])
                                 ))
                                 entry_id = cursor.lastrowid
 
                                 # Formatting Options
+                                formats = {}
                                 format_fields = ['name', 'first', 'text']
                                 for field in format_fields:
                                     value = entry[field]
+                                    first_letter_bold = False
                                     
                                     # Controlla prima \textbackslash
                                     has_textbackslash = '\\textbackslash' in value
@@ -548,24 +1117,342 @@ class GlossaryDatabase:
                                         elif has_mathbf: format_type = '\\mathbf{}'
                                         elif has_mathit: format_type = '\\mathit{}'
 
-                                    cursor.execute('''
-                                        INSERT INTO formatting_options
-                                        (entry_id, field_name, format_type, is_math_mode, first_letter_bold)
-                                        VALUES (?, ?, ?, ?, ?)
-                                    ''', (
-                                        entry_id, 
-                                        field,
-                                        format_type,
-                                        is_math_mode if has_textbackslash else is_math,
-                                        first_letter_bold
-                                    ))
+                                    formats[field] = {
+                                        'format_type': format_type,
+                                        'is_math_mode': is_math_mode if has_textbackslash else is_math,
+                                        'first_letter_bold': first_letter_bold
+                                    }
+
+                                # Tutta la formattazione in un'unica colonna compatta
+                                cursor.execute('UPDATE entries SET format_flags = ? WHERE id = ?',
+                                               (pack_formats(formats), entry_id))
                                 print(f"Entry {entry['key']} salvata")
                             except Exception as e:
                                 print(f"Errore: {entry['key']} - {str(e)}")
                         pos += 1
                         
             conn.commit()
+        # L'importazione tocca molte righe: la cache verrà ricaricata alla prossima lettura
+        self.cache.invalidate()
         print("Importazione completata")
             
     
-    
\ No newline at end of file
+    
+
+    def iter_export_records(self, category_name=None):
+        """
+        Genera i record di interscambio, uno per definizione, leggendo il database a blocchi.
+        Le categorie senza definizioni producono un record senza 'key'
+        Args:
+            category_name (str): Limita l'esportazione a una categoria
+        """
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            where = 'WHERE c.name = ?' if category_name else ''
+            params = (category_name,) if category_name else ()
+            cursor.execute(f'''
+                SELECT c.name, c.group_name, c.comment, e.key, e.type, e.name, e.first, e.text,
+                       e.description, e.is_math, e.format_flags
+                FROM categories c
+                LEFT JOIN entries e ON e.category_id = c.id
+                {where}
+                ORDER BY c.name COLLATE ITALIAN, e.sort_key, e.key COLLATE ITALIAN
+            ''', params)
+            cursor.arraysize = 1000
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    category, group, comment, key = row[:4]
+                    if key is None:
+                        yield {'category': category, 'group': group, 'comment': comment}
+                        continue
+                    record = dict(zip(EXPORT_FIELDS, row[:10]))
+                    record['is_math'] = bool(record['is_math'])
+                    # format_flags NULL (mai salvato) resta distinto da "tutto Normale"
+                    record['formats'] = unpack_formats(row[10]) if row[10] is not None else None
+                    yield record
+
+    def _record_values(self, record, category_id):
+        """Converte un record di interscambio nei valori dell'INSERT su entries"""
+        key = strip_key_wrapper(str(record.get('key') or '').strip()).strip()
+        if not key:
+            raise ValueError("chiave vuota")
+        name = record.get('name') or ''
+        text = record.get('text') or ''
+        formats = record.get('formats')
+        if isinstance(formats, dict):
+            format_flags = pack_formats(formats)
+        elif formats not in (None, ''):
+            format_flags = int(formats)
+        else:
+            format_flags = None
+        is_math = record.get('is_math')
+        if isinstance(is_math, str):
+            is_math = is_math.strip().lower() in _TRUE_VALUES
+        return (
+            # 8 byte: con 4 byte su centinaia di migliaia di righe le collisioni sono probabili
+            f"DEF_{os.urandom(8).hex()}",
+            category_id,
+            key,
+            canonical_key(key),
+            record.get('type') or '\\acronymtype',
+            name,
+            record.get('first') or '',
+            text,
+            record.get('description') or '',
+            bool(is_math),
+            format_flags,
+            *self.plain_text_values(key, name, text)
+        )
+
+    def import_records(self, rows, convert, default_category='Generale', batch_size=5000,
+                       progress=None):
+        """
+        Importa record di interscambio in blocchi di batch_size per transazione.
+        Le chiavi già presenti nella categoria vengono aggiornate; le righe non valide
+        sono raccolte in errors senza interrompere l'importazione
+        Args:
+            rows (iterable): Coppie (numero_riga, riga grezza), lette in streaming
+            convert (callable): convert(riga) -> dict del record, ValueError se non valida
+            default_category (str): Categoria dei record senza 'category'
+            batch_size (int): Definizioni per transazione
+            progress (callable): progress(righe_lette)
+        Returns:
+            dict: imported (definizioni scritte), categories (categorie create),
+                  errors (lista di (numero_riga, messaggio))
+        """
+        result = {'imported': 0, 'categories': 0, 'errors': []}
+        category_meta = {}  # id -> (gruppo, commento) già scritti in questa importazione
+        batch = []
+        insert = '''
+            INSERT INTO entries
+            (definition_id, category_id, key, canonical_key, type, name, first, text,
+             description, is_math, format_flags, name_plain, text_plain, sort_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(category_id, canonical_key) DO UPDATE SET
+                key = excluded.key,
+                type = excluded.type,
+                name = excluded.name,
+                first = excluded.first,
+                text = excluded.text,
+                description = excluded.description,
+                is_math = excluded.is_math,
+                format_flags = COALESCE(excluded.format_flags, entries.format_flags),
+                name_plain = excluded.name_plain,
+                text_plain = excluded.text_plain,
+                sort_key = excluded.sort_key,
+                updated_at = CURRENT_TIMESTAMP
+        '''
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT name, id FROM categories')
+            category_ids = {name.lower(): category_id for name, category_id in cursor.fetchall()}
+
+            def category_id_for(record):
+                name = (record.get('category') or default_category).strip()
+                category_id = category_ids.get(name.lower())
+                if category_id is None:
+                    cursor.execute('INSERT INTO categories (name, category_id) VALUES (?, ?)',
+                                   (name, f"CAT_{os.urandom(4).hex()}"))
+                    category_id = category_ids[name.lower()] = cursor.lastrowid
+                    result['categories'] += 1
+                # Gruppo e commento sono ripetuti su ogni riga: li scrive solo quando cambiano
+                meta = (record.get('group') or None, record.get('comment') or None)
+                if meta != (None, None) and category_meta.get(category_id) != meta:
+                    cursor.execute('''
+                        UPDATE categories
+                        SET group_name = COALESCE(?, group_name), comment = COALESCE(?, comment)
+                        WHERE id = ?
+                    ''', (*meta, category_id))
+                    category_meta[category_id] = meta
+                return category_id
+
+            def flush():
+                # Un errore del database in un blocco non lo scarta tutto: si ritorna
+                # al savepoint e si riprovano le righe una per una
+                cursor.execute('SAVEPOINT import_batch')
+                try:
+                    cursor.executemany(insert, [values for _, values in batch])
+                    result['imported'] += len(batch)
+                except sqlite3.Error:
+                    cursor.execute('ROLLBACK TO import_batch')
+                    for row_number, values in batch:
+                        try:
+                            cursor.execute(insert, values)
+                            result['imported'] += 1
+                        except sqlite3.Error as e:
+                            result['errors'].append((row_number, str(e)))
+                cursor.execute('RELEASE import_batch')
+                conn.commit()
+                batch.clear()
+
+            for row_number, raw in rows:
+                try:
+                    record = convert(raw)
+                    if record is None:
+                        continue
+                    category_id = category_id_for(record)
+                    if record.get('key') is not None:
+                        batch.append((row_number, self._record_values(record, category_id)))
+                except (ValueError, TypeError, KeyError) as e:
+                    result['errors'].append((row_number, str(e)))
+                    continue
+                if len(batch) >= batch_size:
+                    flush()
+                if progress and row_number % 10000 == 0:
+                    progress(row_number)
+            if batch:
+                flush()
+            conn.commit()
+
+        # Molte righe modificate: la cache verrà ricaricata alla prossima lettura
+        self.cache.invalidate()
+        print(f"Importate {result['imported']} definizioni "
+              f"({len(result['errors'])} righe con errori)")
+        return result
+
+    @staticmethod
+    def csv_delimiter(file_path, delimiter=None):
+        """Separatore del file: esplicito, oppure tabulazione per .tsv/.tab e virgola per il resto"""
+        if delimiter:
+            return delimiter
+        return '\t' if os.path.splitext(str(file_path))[1].lower() in ('.tsv', '.tab') else ','
+
+    @staticmethod
+    def _bib_group(group_name):
+        """Valore del campo group: il contenuto di \\group{...} oppure il valore così com'è"""
+        group_name = (group_name or '').strip()
+        match = re.search(r'\\group{(.*?)}', group_name)
+        return match.group(1) if match else group_name
+
+    def export_to_bib(self, file_path, category_name=None, progress=None):
+        """
+        Esporta le definizioni nel formato .bib di bib2gls, in streaming.
+        Le definizioni di tipo \\acronymtype diventano @acronym (short = testo,
+        long = prima occorrenza), le altre @entry con i campi name, first, text e type
+        Args:
+            file_path (str): File da scrivere
+            category_name (str): Limita l'esportazione a una categoria
+            progress (callable): progress(definizioni_scritte)
+        Returns:
+            int: Numero di definizioni scritte
+        """
+        written = 0
+        partial = f"{file_path}.partial"
+        with open(partial, 'w', encoding='utf-8', newline='\n') as file:
+            file.write(BIB_HEADER.format(name=os.path.splitext(os.path.basename(file_path))[0]))
+            current_category = None
+            for record in self.iter_export_records(category_name):
+                if 'key' not in record:
+                    continue
+                if record['category'] != current_category:
+                    current_category = record['category']
+                    file.write(f"% DEFINIZIONI {current_category}\n")
+                    if record['comment'] and record['comment'].strip():
+                        file.write(f"% {record['comment'].strip()}\n")
+                    file.write("\n")
+
+                if record['type'] in ('\\acronymtype', 'acronym'):
+                    entry_type = 'acronym'
+                    fields = [('short', record['text']), ('long', record['first'])]
+                else:
+                    entry_type = 'entry'
+                    fields = [('name', record['name']), ('first', record['first']),
+                              ('text', record['text'])]
+                    # Sempre presente: la risorsa di queste definizioni non imposta type
+                    entry_glossary = record['type']
+                    if not entry_glossary or entry_glossary == '\\glsdefaulttype':
+                        entry_glossary = 'main'
+                    fields.append(('type', entry_glossary))
+                fields.append(('description', record['description']))
+                fields.append(('group', self._bib_group(record['group'])))
+
+                body = ',\n'.join(f"  {field} = {{{value}}}" for field, value in fields if value)
+                file.write(f"@{entry_type}{{{record['key']},\n{body}\n}}\n\n")
+                written += 1
+                if progress and written % 10000 == 0:
+                    progress(written)
+        os.replace(partial, file_path)
+        print(f"Esportate {written} definizioni in {file_path}")
+        return written
+
+    def export_to_csv(self, file_path, delimiter=None, category_name=None):
+        """
+        Esporta le definizioni in CSV/TSV (UTF-8 con BOM, leggibile da Excel e LibreOffice)
+        Args:
+            file_path (str): File da scrivere
+            delimiter (str): Separatore (default in base all'estensione)
+            category_name (str): Limita l'esportazione a una categoria
+        Returns:
+            int: Numero di righe scritte (esclusa l'intestazione)
+        """
+        written = 0
+        partial = f"{file_path}.partial"
+        with open(partial, 'w', encoding='utf-8-sig', newline='') as file:
+            writer = csv.writer(file, delimiter=self.csv_delimiter(file_path, delimiter))
+            writer.writerow(CSV_COLUMNS)
+            for record in self.iter_export_records(category_name):
+                formats = record.get('formats')
+                record['is_math'] = int(record['is_math']) if 'is_math' in record else ''
+                record['format_flags'] = pack_formats(formats) if formats else ''
+                writer.writerow([record.get(column, '') for column in CSV_COLUMNS])
+                written += 1
+        os.replace(partial, file_path)
+        print(f"Esportate {written} righe in {file_path}")
+        return written
+
+    def import_from_csv(self, file_path, mapping=None, delimiter=None, category_name='Generale',
+                        batch_size=5000, progress=None):
+        """
+        Importa definizioni da un file CSV/TSV con intestazione, leggendolo in streaming
+        Args:
+            file_path (str): File da leggere
+            mapping (dict): Colonna del file -> campo (key, name, first, text, description,
+                type, category, group, comment, is_math, format_flags). Le colonne con
+                il nome di un campo sono mappate automaticamente; le altre sono ignorate
+            delimiter (str): Separatore (default in base all'estensione)
+            category_name (str): Categoria delle righe senza colonna category
+            batch_size (int): Definizioni per transazione
+            progress (callable): progress(righe_lette)
+        Returns:
+            dict: Il risultato di import_records
+        """
+        mapping = dict(mapping or {})
+
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as file:
+            reader = csv.reader(file, delimiter=self.csv_delimiter(file_path, delimiter))
+            header = next(reader, None)
+            if header is None:
+                return {'imported': 0, 'categories': 0, 'errors': []}
+            fields = []
+            for column in header:
+                field = mapping.get(column, column.strip().lower())
+                fields.append(field if field in CSV_COLUMNS else None)
+            if 'key' not in fields:
+                raise ValueError("Nessuna colonna mappata sul campo 'key'")
+
+            def convert(cells):
+                if not any(cell.strip() for cell in cells):
+                    return None
+                if len(cells) > len(fields):
+                    raise ValueError(f"{len(cells)} colonne invece di {len(fields)}")
+                record = {field: cell for field, cell in zip(fields, cells) if field}
+                # Riga con la sola categoria (come le esporta export_to_csv)
+                if not record.get('key', '').strip() and not any(
+                        record.get(field) for field in ('name', 'first', 'text', 'description')):
+                    record.pop('key', None)
+                if 'format_flags' in record:
+                    record['formats'] = record.pop('format_flags').strip()
+                # Fogli con la sola sigla e la forma estesa: i campi mancanti ripetono il nome
+                if record.get('key', '').strip():
+                    record['name'] = record.get('name') or strip_key_wrapper(record['key'].strip()).strip()
+                    record['first'] = record.get('first') or record['name']
+                    record['text'] = record.get('text') or record['name']
+                return record
+
+            # La riga 1 è l'intestazione
+            rows = ((reader.line_num, cells) for cells in reader)
+            return self.import_records(rows, convert, category_name, batch_size, progress)
@@ -50,6 +50,10 @@ class GlossaryOSHandler:
     def get_temp_directory(self):
         """Returns the directory for temporary files"""
         return self.get_base_directory() / "temp"
+
+    def get_snapshot_directory(self):
+        """Returns the directory for database snapshots"""
+        return self.get_base_directory() / "snapshots"
     
     def ensure_directories_exist(self):
         """Creates all necessary directories if they don't exist"""
@@ -0,0 +1,161 @@
+import os
+import re
+import sqlite3
+from pathlib import Path
+from .entry_record import canonical_key
+
+
+# Comandi della famiglia \gls che fanno riferimento a una definizione:
+# \gls{key}, \Glspl*[opzioni]{key}, \acrfull+{key}, \glsadd{key}, \glsdisp{key}{testo}, ...
+GLS_COMMANDS = (
+    'gls', 'Gls', 'GLS', 'glspl', 'Glspl', 'GLSpl',
+    'glstext', 'Glstext', 'GLStext', 'glsfirst', 'Glsfirst', 'GLSfirst',
+    'glsplural', 'glsfirstplural', 'glsname', 'Glsname', 'glsdesc', 'Glsdesc',
+    'glssymbol', 'glsdisp', 'glslink', 'glsadd', 'glsentryname', 'glsentrytext',
+    'glsentryfirst', 'glsentrydesc', 'glsxtrshort', 'glsxtrlong', 'glsxtrfull',
+    'acrshort', 'Acrshort', 'ACRshort', 'acrlong', 'Acrlong', 'ACRlong',
+    'acrfull', 'Acrfull', 'ACRfull', 'acrshortpl', 'Acrshortpl', 'acrlongpl',
+    'Acrlongpl', 'acrfullpl', 'Acrfullpl', 'acs', 'acl', 'acf', 'acsp', 'aclp', 'acfp',
+)
+GLS_REFERENCE = re.compile(
+    r'\\(?:' + '|'.join(sorted(GLS_COMMANDS, key=len, reverse=True)) + r')'
+    r'(?![A-Za-z])[*+]?\s*(?:\[[^\]]*\])?\s*\{([^{}]*)\}'
+)
+
+# Riferimenti registrati dalla compilazione:
+#   .aux (glossaries-extra, opzione record): \glsxtr@record{key}{...}
+#   .aux (glossaries):                       \@gls@reference{tipo}{key}{...}
+#   .glo/.acn (makeindex e xindy):           \glossentry{key} / \\glossentry{key}
+AUX_REFERENCE = re.compile(
+    r'\\glsxtr@record(?:@nameref)?\{([^{}]*)\}'
+    r'|\\@gls@reference\{[^{}]*\}\{([^{}]*)\}'
+    r'|\\+glossentry\{([^{}]*)\}'
+)
+
+# File prodotti dalla compilazione e letti con AUX_REFERENCE
+AUX_EXTENSIONS = ('.aux', '.glo', '.acn', '.slo')
+
+# Commento LaTeX: da % non preceduto da \ fino a fine riga
+_COMMENT = re.compile(r'(?<!\\)%.*')
+
+
+def references_in_text(text):
+    """Chiavi citate con i comandi \\gls in un testo LaTeX (senza i commenti)"""
+    keys = set()
+    for match in GLS_REFERENCE.finditer(_COMMENT.sub('', text)):
+        # \glsadd e simili ammettono più chiavi separate da virgole
+        keys.update(key.strip() for key in match.group(1).split(',') if key.strip())
+    return keys
+
+
+def keys_from_compiled_files(paths):
+    """Chiavi registrate nei file .aux/.glo/.acn della compilazione"""
+    keys = set()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as file:
+            for line in file:
+                for match in AUX_REFERENCE.finditer(line):
+                    key = next(group for group in match.groups() if group is not None)
+                    if key.strip():
+                        keys.add(key.strip())
+    return keys
+
+
+def iter_tex_files(paths):
+    """File .tex indicati o contenuti (ricorsivamente) nelle cartelle indicate"""
+    for path in map(Path, paths):
+        if path.is_dir():
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith('.tex'):
+                        yield Path(root) / name
+        else:
+            yield path
+
+
+def keys_from_sources(paths):
+    """Chiavi citate nei sorgenti .tex (file o cartelle)"""
+    keys = set()
+    for path in iter_tex_files(paths):
+        with open(path, 'r', encoding='utf-8', errors='replace') as file:
+            keys.update(references_in_text(file.read()))
+    return keys
+
+
+def collect_document_keys(paths):
+    """
+    Chiavi usate da un documento. I file della compilazione (.aux, .glo, .acn)
+    sono la fonte più precisa; i sorgenti .tex e le cartelle vengono scansionati
+    Args:
+        paths (list): File .aux/.glo/.acn/.tex o cartelle di sorgenti
+    Returns:
+        set: Le chiavi trovate, così come scritte nel documento
+    """
+    compiled = [path for path in paths if Path(path).suffix.lower() in AUX_EXTENSIONS]
+    sources = [path for path in paths if Path(path).suffix.lower() not in AUX_EXTENSIONS]
+    return keys_from_compiled_files(compiled) | keys_from_sources(sources)
+
+
+def resolve_dependencies(db_path, keys, batch_size=500):
+    """
+    Aggiunge alle chiavi quelle citate, anche indirettamente, nei campi delle
+    definizioni selezionate (es. \\gls{altra} in una descrizione)
+    Args:
+        db_path (Path): Database del progetto
+        keys (iterable): Chiavi di partenza
+    Returns:
+        tuple: (chiavi presenti nel database, in forma canonica, chiavi assenti)
+    """
+    wanted = {canonical_key(key) for key in keys}
+    found = set()
+    pending = set(wanted)
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        while pending:
+            batch = list(pending)
+            pending = set()
+            for start in range(0, len(batch), batch_size):
+                chunk = batch[start:start + batch_size]
+                cursor.execute(f'''
+                    SELECT canonical_key, name, first, text, description FROM entries
+                    WHERE canonical_key IN ({', '.join('?' * len(chunk))})
+                ''', chunk)
+                for key, *fields in cursor.fetchall():
+                    found.add(key)
+                    for reference in references_in_text(' '.join(field or '' for field in fields)):
+                        reference = canonical_key(reference)
+                        if reference not in wanted:
+                            wanted.add(reference)
+                            pending.add(reference)
+    return found, wanted - found
+
+
+def export_used_entries(db, paths, file_path):
+    """
+    Esporta in LaTeX solo le definizioni usate dal documento e le loro dipendenze
+    Args:
+        db (GlossaryDatabase): Database del progetto
+        paths (list): File .aux/.glo/.acn/.tex o cartelle di sorgenti
+        file_path (str): File .tex da scrivere
+    Returns:
+        dict: referenced (chiavi citate dal documento), exported (definizioni scritte),
+              dependencies (aggiunte per riferimenti interni), missing (chiavi non nel database)
+    """
+    referenced = {canonical_key(key) for key in collect_document_keys(paths)}
+    found, missing = resolve_dependencies(db.db_path, referenced)
+
+    content = db.export_to_latex(keys=found)
+    partial = f"{file_path}.partial"
+    with open(partial, 'w', encoding='utf-8') as file:
+        file.write(content)
+    os.replace(partial, file_path)
+
+    report = {
+        'referenced': len(referenced),
+        'exported': len(found),
+        'dependencies': len(found - referenced),
+        'missing': sorted(missing),
+    }
+    print(f"Esportate {report['exported']} definizioni usate "
+          f"({report['dependencies']} per dipendenza, {len(missing)} chiavi mancanti)")
+    return report
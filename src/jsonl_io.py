@@ -0,0 +1,61 @@
+import os
+import json
+
+
+# Formato di interscambio: una definizione JSON per riga, codificata UTF-8.
+# Le categorie senza definizioni sono scritte come righe senza "key".
+JSONL_EXTENSION = '.jsonl'
+
+
+def export_jsonl(db, file_path, category_name=None, progress=None):
+    """
+    Esporta le definizioni in JSON Lines senza caricarle tutte in memoria
+    Args:
+        db (GlossaryDatabase): Database del progetto
+        file_path (str): File da scrivere
+        category_name (str): Limita l'esportazione a una categoria
+        progress (callable): progress(righe_scritte)
+    Returns:
+        int: Numero di righe scritte
+    """
+    written = 0
+    partial = f"{file_path}.partial"
+    with open(partial, 'w', encoding='utf-8', newline='\n') as file:
+        for record in db.iter_export_records(category_name):
+            file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            file.write('\n')
+            written += 1
+            if progress and written % 10000 == 0:
+                progress(written)
+    os.replace(partial, file_path)
+    print(f"Esportate {written} righe in {file_path}")
+    return written
+
+
+def _parse_line(line):
+    """Decodifica una riga JSONL; None per le righe vuote"""
+    if not line.strip():
+        return None
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("la riga non è un oggetto JSON")
+    return record
+
+
+def import_jsonl(db, file_path, batch_size=5000, progress=None):
+    """
+    Importa definizioni da un file JSON Lines. Le righe sono lette una alla volta
+    e scritte a blocchi di batch_size per transazione; le chiavi già presenti nella
+    categoria vengono aggiornate
+    Args:
+        db (GlossaryDatabase): Database del progetto
+        file_path (str): File da leggere
+        batch_size (int): Definizioni per transazione
+        progress (callable): progress(righe_lette)
+    Returns:
+        dict: imported (definizioni scritte), categories (categorie create),
+              errors (lista di (numero_riga, messaggio))
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return db.import_records(enumerate(file, 1), _parse_line,
+                                 batch_size=batch_size, progress=progress)
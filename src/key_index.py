@@ -0,0 +1,61 @@
+from bisect import bisect_left
+
+
+class PrefixIndex:
+    """Indice ordinato in memoria per la ricerca delle chiavi per prefisso"""
+    def __init__(self, keys=()):
+        self.rebuild(keys)
+
+    def rebuild(self, keys):
+        """Ricostruisce l'indice a partire da un elenco di chiavi"""
+        pairs = sorted((key.lower(), key) for key in keys)
+        self._lower = [lower for lower, _ in pairs]
+        self._keys = [key for _, key in pairs]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return self._find(key) != -1
+
+    def _find(self, key):
+        """Restituisce la posizione della chiave o -1 se assente"""
+        lower = key.lower()
+        pos = bisect_left(self._lower, lower)
+        while pos < len(self._lower) and self._lower[pos] == lower:
+            if self._keys[pos] == key:
+                return pos
+            pos += 1
+        return -1
+
+    def add(self, key):
+        """Aggiunge una chiave mantenendo l'ordinamento"""
+        if key in self:
+            return
+        pos = self._insert_position(key)
+        self._lower.insert(pos, key.lower())
+        self._keys.insert(pos, key)
+
+    def _insert_position(self, key):
+        """Restituisce la posizione di inserimento ordinata per (minuscolo, chiave)"""
+        lower = key.lower()
+        pos = bisect_left(self._lower, lower)
+        while pos < len(self._lower) and self._lower[pos] == lower and self._keys[pos] < key:
+            pos += 1
+        return pos
+
+    def remove(self, key):
+        """Rimuove una chiave dall'indice"""
+        pos = self._find(key)
+        if pos != -1:
+            del self._lower[pos]
+            del self._keys[pos]
+
+    def search(self, prefix):
+        """Restituisce le chiavi che iniziano con il prefisso (senza distinzione maiuscole)"""
+        if not prefix:
+            return list(self._keys)
+        prefix = prefix.lower()
+        start = bisect_left(self._lower, prefix)
+        end = bisect_left(self._lower, prefix + '\U0010ffff', start)
+        return self._keys[start:end]
@@ -0,0 +1,452 @@
+import os
+import re
+import time
+import shutil
+import sqlite3
+import difflib
+import tempfile
+import multiprocessing
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from concurrent.futures import ProcessPoolExecutor
+from .glossary_usage import GLS_COMMANDS, iter_tex_files
+from .entry_record import canonical_key, strip_key_wrapper
+
+
+# Oltre ai comandi \gls, da riscrivere anche definizioni e comandi di stato
+# che citano la chiave senza stamparla
+RENAME_COMMANDS = GLS_COMMANDS + (
+    'newglossaryentry', 'newacronym', 'newabbreviation', 'glsreset', 'glsunset',
+    'glslocalreset', 'glslocalunset', 'ifglsused', 'glsrefentry',
+)
+_REFERENCE = re.compile(
+    r'(\\(?:' + '|'.join(sorted(RENAME_COMMANDS, key=len, reverse=True)) + r')'
+    r'(?![A-Za-z])[*+]?\s*(?:\[[^\]]*\])?\s*\{)([^{}]*)(\})'
+)
+_COMMENT_START = re.compile(r'(?<!\\)%')
+
+
+class RenameError(Exception):
+    """Rinomina non valida (chiave inesistente, già usata o ripetuta)"""
+
+
+def rewrite_references(text, renames):
+    """
+    Sostituisce le chiavi rinominate nei riferimenti di un testo LaTeX, fuori dai commenti
+    Args:
+        text (str): Testo LaTeX
+        renames (dict): chiave canonica vecchia -> chiave nuova
+    Returns:
+        tuple: (testo riscritto, numero di sostituzioni)
+    """
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        if _COMMENT_START.search(text, line_start, match.start()):
+            return match.group(0)
+        parts = match.group(2).split(',')
+        for index, part in enumerate(parts):
+            new_key = renames.get(canonical_key(part.strip()))
+            if new_key is not None:
+                # Mantiene gli spazi attorno alla chiave (\glsadd{a, b})
+                parts[index] = part.replace(part.strip(), new_key)
+                count += 1
+        return match.group(1) + ','.join(parts) + match.group(3)
+
+    return _REFERENCE.sub(replace, text), count
+
+
+def _rewrite_file(task):
+    """
+    Riscrive un file (eseguita nei processi del pool, deve restare a livello di modulo)
+    Args:
+        task (tuple): (percorso, rinomine, dry_run)
+    Returns:
+        dict: path, replacements, diff (solo in dry_run), backup (copia dell'originale,
+              solo se il file è stato riscritto), seconds, error
+    """
+    path, renames, dry_run = task
+    start = time.perf_counter()
+    result = {'path': path, 'replacements': 0, 'diff': None, 'backup': None, 'error': None}
+    try:
+        # newline='': le terminazioni di riga originali restano invariate
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            text = file.read()
+        lowered = text.lower()
+        # Filtro veloce: la maggior parte dei file non cita nessuna delle chiavi
+        if any(old in lowered for old in renames):
+            new_text, result['replacements'] = rewrite_references(text, renames)
+            if result['replacements']:
+                if dry_run:
+                    result['diff'] = ''.join(difflib.unified_diff(
+                        text.splitlines(keepends=True), new_text.splitlines(keepends=True),
+                        fromfile=path, tofile=path))
+                else:
+                    # Copia dell'originale per annullare la rinomina se qualcosa fallisce
+                    backup = f"{path}.rename_bak"
+                    shutil.copy2(path, backup)
+                    try:
+                        _atomic_write(path, new_text)
+                    except BaseException:
+                        os.unlink(backup)
+                        raise
+                    result['backup'] = backup
+    except (OSError, UnicodeDecodeError) as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _restore_backups(results):
+    """Rimette al loro posto gli originali dei file già riscritti"""
+    for result in results:
+        if result['backup']:
+            os.replace(result['backup'], result['path'])
+            result['backup'] = None
+
+
+def _discard_backups(results):
+    """Elimina le copie degli originali dopo la conferma della rinomina"""
+    for result in results:
+        if result['backup']:
+            os.unlink(result['backup'])
+            result['backup'] = None
+
+
+def _atomic_write(path, text):
+    """Scrive in un file temporaneo nella stessa cartella e lo sostituisce con os.replace"""
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.rename_', suffix='.tex')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class KeyRenamer:
+    """
+    Rinomina chiavi nel database del progetto e riscrive i riferimenti (\\gls{...},
+    \\acrshort{...}, \\newglossaryentry{...}) nei sorgenti LaTeX, in parallelo
+    """
+    def __init__(self, db, max_workers=None, parallel_threshold=16):
+        self.db = db
+        self.max_workers = max_workers
+        # Sotto questo numero di file l'avvio del pool costa più della riscrittura
+        self.parallel_threshold = parallel_threshold
+
+    def validate(self, renames):
+        """
+        Controlla le rinomine sul database
+        Args:
+            renames (dict): chiave vecchia -> chiave nuova
+        Returns:
+            dict: chiave canonica vecchia -> chiave nuova (senza le rinomine identiche)
+        """
+        normalized = {}
+        for old_key, new_key in renames.items():
+            old_key = strip_key_wrapper(old_key.strip()).strip()
+            new_key = strip_key_wrapper(new_key.strip()).strip()
+            if not old_key or not new_key:
+                raise RenameError("Chiave vuota")
+            if re.search(r'[\s{},%\\]', new_key):
+                raise RenameError(f"Chiave non valida: '{new_key}'")
+            if old_key == new_key:
+                continue
+            normalized[canonical_key(old_key)] = new_key
+
+        new_keys = [canonical_key(new_key) for new_key in normalized.values()]
+        if len(set(new_keys)) != len(new_keys):
+            raise RenameError("La stessa chiave nuova compare più volte")
+        with sqlite3.connect(self.db.db_path) as conn:
+            cursor = conn.cursor()
+            for old_key, new_key in normalized.items():
+                cursor.execute('SELECT 1 FROM entries WHERE canonical_key = ? LIMIT 1', (old_key,))
+                if cursor.fetchone() is None:
+                    raise RenameError(f"La chiave '{old_key}' non esiste nel progetto")
+                # Una differenza solo di maiuscole rinomina la riga stessa
+                if canonical_key(new_key) != old_key:
+                    if canonical_key(new_key) in normalized:
+                        raise RenameError(f"'{new_key}' è anche una chiave da rinominare")
+                    cursor.execute('SELECT 1 FROM entries WHERE canonical_key = ? LIMIT 1',
+                                   (canonical_key(new_key),))
+                    if cursor.fetchone() is not None:
+                        raise RenameError(f"La chiave '{new_key}' esiste già nel progetto")
+        return normalized
+
+    def rename(self, renames, source_root=None, dry_run=True, progress=None):
+        """
+        Rinomina le chiavi e riscrive i riferimenti nei sorgenti
+        Args:
+            renames (dict): chiave vecchia -> chiave nuova
+            source_root (str): Cartella dei sorgenti del documento (None: solo database)
+            dry_run (bool): Calcola solo il diff, senza modificare file e database
+            progress (callable): progress(file_elaborati, file_totali)
+        Returns:
+            dict: files (risultati per file modificato o con errori), scanned,
+                  replacements, entries (definizioni rinominate), renames (chiave
+                  canonica vecchia -> nuova), committed (False in prova o se un file
+                  non è stato riscritto: in quel caso nulla viene modificato; con
+                  errori nei file entries resta 0), seconds
+        """
+        start = time.perf_counter()
+        renames = self.validate(renames)
+        report = {'files': [], 'scanned': 0, 'replacements': 0, 'entries': 0,
+                  'renames': renames, 'committed': False}
+        if not renames:
+            report['seconds'] = 0.0
+            return report
+
+        # Prima i file (con una copia degli originali), poi il database in una
+        # transazione breve: durante la riscrittura l'editor può continuare a salvare.
+        # Se un file non viene riscritto o il database fallisce, i file già
+        # modificati tornano come prima e nulla viene confermato
+        try:
+            if source_root:
+                self._rewrite_sources(report, renames, source_root, dry_run, progress)
+            errors = [result for result in report['files'] if result['error']]
+            if not errors:
+                with sqlite3.connect(self.db.db_path) as conn:
+                    cursor = conn.cursor()
+                    report['entries'] = self._rename_in_database(cursor, renames)
+                    if dry_run:
+                        conn.rollback()
+                    else:
+                        conn.commit()
+                        report['committed'] = True
+            if report['committed']:
+                _discard_backups(report['files'])
+            else:
+                _restore_backups(report['files'])
+        except BaseException:
+            _restore_backups(report['files'])
+            raise
+        if report['committed']:
+            self.db.cache.invalidate()
+
+        report['seconds'] = time.perf_counter() - start
+        print(f"Rinomina {'(prova) ' if dry_run else ''}di {len(renames)} chiavi: "
+              f"{report['replacements']} riferimenti in {len(report['files'])} file, "
+              f"{report['entries']} definizioni, {report['seconds']:.2f} s")
+        return report
+
+    def _rewrite_sources(self, report, renames, source_root, dry_run, progress):
+        """Riscrive i riferimenti nei file .tex, in parallelo oltre parallel_threshold file"""
+        paths = [str(path) for path in iter_tex_files([source_root])]
+        tasks = [(path, renames, dry_run) for path in paths]
+        report['scanned'] = len(tasks)
+        if len(tasks) >= self.parallel_threshold:
+            # spawn: i processi non ereditano thread e stato di Tk del processo principale
+            with ProcessPoolExecutor(max_workers=self.max_workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                chunksize = max(1, len(tasks) // ((self.max_workers or os.cpu_count() or 1) * 4))
+                results = executor.map(_rewrite_file, tasks, chunksize=chunksize)
+                for done, result in enumerate(results, 1):
+                    self._collect(report, result)
+                    if progress:
+                        progress(done, len(tasks))
+        else:
+            for done, task in enumerate(tasks, 1):
+                self._collect(report, _rewrite_file(task))
+                if progress:
+                    progress(done, len(tasks))
+
+    @staticmethod
+    def _collect(report, result):
+        if result['replacements'] or result['error']:
+            report['files'].append(result)
+            report['replacements'] += result['replacements']
+
+    def _rename_in_database(self, cursor, renames):
+        """
+        Aggiorna chiavi, riferimenti nei campi delle definizioni e indice d'uso,
+        senza confermare la transazione
+        """
+        # Le chiavi da rinominare in una tabella temporanea: con migliaia di
+        # rinomine una condizione OR per chiave supera la profondità massima
+        # delle espressioni di SQLite
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS rename_keys (old_key TEXT PRIMARY KEY, new_key TEXT)')
+        cursor.execute('DELETE FROM temp.rename_keys')
+        cursor.executemany('INSERT INTO temp.rename_keys (old_key, new_key) VALUES (?, ?)',
+                           renames.items())
+
+        renamed = 0
+        cursor.execute('''
+            SELECT e.id, r.new_key, e.name, e.text
+            FROM temp.rename_keys r
+            JOIN entries e ON e.canonical_key = r.old_key
+        ''')
+        for entry_id, new_key, name, text in cursor.fetchall():
+            renamed += 1
+            cursor.execute('''
+                UPDATE entries SET key = ?, canonical_key = ?, name_plain = ?, text_plain = ?,
+                    sort_key = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (new_key, canonical_key(new_key),
+                  *self.db.plain_text_values(new_key, name, text), entry_id))
+
+        # \gls{vecchia} usato nei campi di altre definizioni (LIKE trova i candidati,
+        # rewrite_references sostituisce solo i riferimenti veri)
+        cursor.execute('''
+            SELECT id, name, first, text, description FROM entries e
+            WHERE EXISTS (
+                SELECT 1 FROM temp.rename_keys r
+                WHERE LOWER(e.name || e.first || e.text || COALESCE(e.description, ''))
+                      LIKE '%' || r.old_key || '%'
+            )
+        ''')
+        for entry_id, *fields in cursor.fetchall():
+            rewritten = [rewrite_references(field or '', renames) for field in fields]
+            if any(count for _, count in rewritten):
+                name, first, text, description = (value for value, _ in rewritten)
+                cursor.execute('''
+                    UPDATE entries SET name = ?, first = ?, text = ?, description = ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (name, first, text, description, entry_id))
+
+        # L'indice d'uso segue la rinomina senza dover riscansionare
+        cursor.executemany('UPDATE usage SET key = ?, canonical_key = ? WHERE canonical_key = ?',
+                           [(new_key, canonical_key(new_key), old_key)
+                            for old_key, new_key in renames.items()])
+        cursor.execute('DROP TABLE temp.rename_keys')
+        return renamed
+
+
+def format_rename_report(report, slowest=10):
+    """Riepilogo testuale con i tempi per file"""
+    lines = [
+        f"Definizioni rinominate: {report['entries']}",
+        f"File esaminati: {report['scanned']}",
+        f"File modificati: {sum(1 for result in report['files'] if result['replacements'])}",
+        f"Riferimenti riscritti: {report['replacements']}",
+        f"Tempo totale: {report['seconds']:.2f} s",
+    ]
+    errors = [result for result in report['files'] if result['error']]
+    if errors:
+        lines.append(f"File con errori: {len(errors)} - nessuna modifica applicata, "
+                     f"database e file ripristinati")
+        lines.extend(f"  {result['path']}: {result['error']}" for result in errors[:slowest])
+    timed = sorted(report['files'], key=lambda result: result['seconds'], reverse=True)[:slowest]
+    if timed:
+        lines.append("File più lenti:")
+        lines.extend(f"  {result['seconds'] * 1000:7.1f} ms  {result['replacements']:5d}  {result['path']}"
+                     for result in timed)
+    return '\n'.join(lines)
+
+
+class RenameDialog:
+    """Finestra per rinominare chiavi con anteprima delle modifiche ai sorgenti"""
+    def __init__(self, parent, db, initial_key=''):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Rinomina Chiavi")
+        self.window.geometry("800x600")
+        self.window.transient(parent)
+        self.parent = parent
+        self.renamer = KeyRenamer(db)
+        self._result = None
+
+        self._create_widgets(initial_key)
+
+    def _create_widgets(self, initial_key):
+        main_frame = ttk.Frame(self.window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(main_frame, text="Una rinomina per riga: chiave_vecchia chiave_nuova").pack(anchor=tk.W)
+        self.renames_text = tk.Text(main_frame, height=6)
+        self.renames_text.pack(fill=tk.X)
+        if initial_key:
+            self.renames_text.insert('1.0', f"{initial_key} ")
+
+        dir_frame = ttk.Frame(main_frame)
+        dir_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(dir_frame, text="Sorgenti:").pack(side=tk.LEFT)
+        self.root_var = tk.StringVar()
+        ttk.Entry(dir_frame, textvariable=self.root_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        ttk.Button(dir_frame, text="Sfoglia...", command=self._choose_root).pack(side=tk.LEFT)
+
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.pack(fill=tk.X)
+        self.buttons = [
+            ttk.Button(btn_frame, text="Anteprima", command=lambda: self._run(True)),
+            ttk.Button(btn_frame, text="Applica", command=lambda: self._run(False)),
+        ]
+        for button in self.buttons:
+            button.pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Chiudi", command=self.window.destroy).pack(side=tk.RIGHT)
+
+        self.output = tk.Text(main_frame, wrap=tk.NONE, font=('Courier', 9))
+        self.output.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+
+    def _choose_root(self):
+        directory = filedialog.askdirectory(parent=self.window, title="Cartella dei sorgenti del documento")
+        if directory:
+            self.root_var.set(directory)
+
+    def _parse_renames(self):
+        renames = {}
+        for number, line in enumerate(self.renames_text.get('1.0', tk.END).splitlines(), 1):
+            if not line.strip():
+                continue
+            parts = line.split()
+            if len(parts) != 2:
+                raise RenameError(f"Riga {number}: servono la chiave vecchia e quella nuova")
+            renames[parts[0]] = parts[1]
+        return renames
+
+    def _run(self, dry_run):
+        try:
+            renames = self._parse_renames()
+            self.renamer.validate(renames)
+        except (RenameError, sqlite3.Error) as e:
+            messagebox.showerror("Errore", str(e), parent=self.window)
+            return
+        if not dry_run and not messagebox.askyesno(
+                "Conferma", "Rinominare le chiavi e riscrivere i file sorgente?", parent=self.window):
+            return
+        for button in self.buttons:
+            button.state(['disabled'])
+        self.output.delete('1.0', tk.END)
+        self.output.insert(tk.END, "Elaborazione in corso...\n")
+        root = self.root_var.get().strip() or None
+
+        def worker():
+            try:
+                self._result = ('done', dry_run, self.renamer.rename(renames, root, dry_run))
+            except Exception as e:
+                # Anche BrokenProcessPool e simili: i pulsanti vanno riattivati comunque
+                self._result = ('error', dry_run, str(e))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.window.after(100, self._poll)
+
+    def _poll(self):
+        if not self.window.winfo_exists():
+            return
+        if self._result is None:
+            self.window.after(100, self._poll)
+            return
+        kind, dry_run, value = self._result
+        self._result = None
+        for button in self.buttons:
+            button.state(['!disabled'])
+        self.output.delete('1.0', tk.END)
+        if kind == 'error':
+            messagebox.showerror("Errore", value, parent=self.window)
+            return
+        self.output.insert(tk.END, format_rename_report(value) + '\n\n')
+        if dry_run:
+            for result in value['files']:
+                if result['diff']:
+                    self.output.insert(tk.END, result['diff'] + '\n')
+        elif value['committed'] and hasattr(self.parent, 'on_keys_renamed'):
+            self.parent.on_keys_renamed(value['renames'])
@@ -0,0 +1,96 @@
+import json
+import time
+import functools
+from collections import deque
+from datetime import datetime
+
+
+class LatencyMonitor:
+    """Misura i blocchi del ciclo degli eventi Tk tramite tick periodici con after()"""
+    def __init__(self, root, interval_ms=100, stall_threshold_ms=50, history_size=500):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.stall_threshold_ms = stall_threshold_ms
+        self.history = deque(maxlen=history_size)
+        self.current_stall_ms = 0.0
+        self.max_stall_ms = 0.0
+        self.listeners = []
+
+        self._expected = None
+        self._after_id = None
+        # Ultimo comando eseguito: (nome, inizio, fine)
+        self._current_command = None
+        self._last_command = None
+
+    def start(self):
+        """Avvia il monitoraggio"""
+        if self._after_id is None:
+            self._expected = time.perf_counter() + self.interval_ms / 1000
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        """Ferma il monitoraggio"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        """Confronta l'istante atteso con quello reale e registra i blocchi"""
+        now = time.perf_counter()
+        drift_ms = max(0.0, (now - self._expected) * 1000)
+        self.current_stall_ms = drift_ms
+
+        if drift_ms >= self.stall_threshold_ms:
+            self.max_stall_ms = max(self.max_stall_ms, drift_ms)
+            self.history.append({
+                'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+                'stall_ms': round(drift_ms, 1),
+                'command': self._command_during(now - drift_ms / 1000, now),
+            })
+
+        for listener in self.listeners:
+            listener(self.current_stall_ms, self.max_stall_ms)
+
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def _command_during(self, stall_start, stall_end):
+        """Restituisce il comando in esecuzione durante l'intervallo del blocco"""
+        for command in (self._current_command, self._last_command):
+            if command is None:
+                continue
+            name, started, finished = command
+            if started <= stall_end and (finished is None or finished >= stall_start):
+                return name
+        return None
+
+    def track(self, name, func):
+        """Avvolge un comando per sapere quale era in esecuzione durante un blocco"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            previous = self._current_command
+            self._current_command = (name, time.perf_counter(), None)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._last_command = (name, self._current_command[1], time.perf_counter())
+                self._current_command = previous
+        return wrapper
+
+    def reset(self):
+        """Azzera lo storico e il valore massimo"""
+        self.history.clear()
+        self.current_stall_ms = 0.0
+        self.max_stall_ms = 0.0
+
+    def export_history(self, file_path):
+        """Esporta lo storico dei blocchi in formato JSON per le segnalazioni di bug"""
+        data = {
+            'exported_at': datetime.now().isoformat(timespec='seconds'),
+            'interval_ms': self.interval_ms,
+            'stall_threshold_ms': self.stall_threshold_ms,
+            'max_stall_ms': round(self.max_stall_ms, 1),
+            'stalls': list(self.history),
+        }
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
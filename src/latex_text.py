@@ -0,0 +1,33 @@
+import re
+import unicodedata
+from .collation import primary_key
+
+
+# Accenti con simbolo di controllo: \'e, \`{a}, \"{\i}, \^o ... -> lettera accentata
+_ACCENTS = {"'": '\u0301', '`': '\u0300', '^': '\u0302', '"': '\u0308',
+            '~': '\u0303', '=': '\u0304', '.': '\u0307'}
+_ACCENT = re.compile(r'\\([\'`^"~=.])\s*(\{)?\s*(?:\\([ij])(?![A-Za-z])|([A-Za-z]))(?(2)\s*\})')
+# Caratteri con escape (tenuti), comandi e markup $ { } (rimossi): di \textbf{ETF} resta ETF
+_MARKUP = re.compile(r'\\([&%_#$])|\\[a-zA-Z]+\*?\s*|[${}]')
+
+
+def _compose_accent(match):
+    letter = match.group(3) or match.group(4)
+    return unicodedata.normalize('NFC', letter + _ACCENTS[match.group(1)])
+
+
+def latex_to_plain(text):
+    """
+    Restituisce il testo senza markup LaTeX: \\textbf, \\mathbf, $, graffe e comandi
+    Es. '$\\mathbf{L_{VA}}$' -> 'L_VA', '\\textbf{ETF}' -> 'ETF', 'perch\\'e' -> 'perché'
+    """
+    if not text:
+        return ''
+    text = _ACCENT.sub(_compose_accent, text)
+    text = _MARKUP.sub(lambda match: match.group(1) or '', text)
+    return ' '.join(text.split())
+
+
+def make_sort_key(text):
+    """Chiave di ordinamento: testo semplice senza accenti, minuscolo (come la collation ITALIAN)"""
+    return primary_key(latex_to_plain(text))
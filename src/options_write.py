@@ -5,6 +5,100 @@ from tkinter import ttk
 from .glossary_os_handler import GlossaryOSHandler
 
 
+# Formattazione compatta: 8 bit per campo nella colonna entries.format_flags
+#   bit 0-3: tipo di formato, bit 4: modalità matematica, bit 5: grassetto prima lettera
+FORMAT_FIELDS = ('name', 'first', 'text')
+FORMAT_TYPE_CODES = {
+    'Normale': 0,
+    '\\textbf{}': 1,
+    '\\textit{}': 2,
+    '\\mathbf{}': 3,
+    '\\mathit{}': 4,
+    '\\textbackslash': 5,
+}
+FORMAT_CODE_TYPES = {code: format_type for format_type, code in FORMAT_TYPE_CODES.items()}
+_MATH_BIT = 0x10
+_FIRST_BOLD_BIT = 0x20
+
+
+def _format_code(format_type):
+    """Restituisce il codice del tipo di formato (accetta anche la forma senza graffe)"""
+    if not format_type or format_type in ('Normale', 'normal'):
+        return 0
+    if format_type in FORMAT_TYPE_CODES:
+        return FORMAT_TYPE_CODES[format_type]
+    return FORMAT_TYPE_CODES.get(f"{format_type}{{}}", 0)
+
+
+def pack_formats(formats):
+    """
+    Comprime le opzioni di formattazione dei tre campi in un intero
+    Args:
+        formats (dict): campo -> {format_type, is_math_mode, first_letter_bold}
+    Returns:
+        int: Il valore per la colonna format_flags
+    """
+    flags = 0
+    for index, field_name in enumerate(FORMAT_FIELDS):
+        values = formats.get(field_name)
+        if not values:
+            continue
+        bits = _format_code(values.get('format_type'))
+        if values.get('is_math_mode'):
+            bits |= _MATH_BIT
+        if values.get('first_letter_bold'):
+            bits |= _FIRST_BOLD_BIT
+        flags |= bits << (8 * index)
+    return flags
+
+
+def unpack_formats(flags):
+    """Decomprime format_flags nelle opzioni di formattazione dei tre campi"""
+    flags = flags or 0
+    formats = {}
+    for index, field_name in enumerate(FORMAT_FIELDS):
+        bits = (flags >> (8 * index)) & 0xFF
+        formats[field_name] = {
+            'format_type': FORMAT_CODE_TYPES.get(bits & 0x0F, 'Normale'),
+            'is_math_mode': bool(bits & _MATH_BIT),
+            'first_letter_bold': bool(bits & _FIRST_BOLD_BIT)
+        }
+    return formats
+
+
+def migrate_formatting_options(cursor):
+    """
+    Sposta le righe di formatting_options nella colonna compatta entries.format_flags
+    Args:
+        cursor: Cursore di una connessione in cui esistono entries e formatting_options
+    Returns:
+        int: Numero di definizioni migrate
+    """
+    cursor.execute('''
+        SELECT fo.entry_id, fo.field_name, fo.format_type, fo.is_math_mode, fo.first_letter_bold
+        FROM formatting_options fo
+        JOIN entries e ON e.id = fo.entry_id
+        WHERE e.format_flags IS NULL
+    ''')
+    formats_by_entry = {}
+    for entry_id, field_name, format_type, is_math_mode, first_letter_bold in cursor.fetchall():
+        formats_by_entry.setdefault(entry_id, {})[field_name] = {
+            'format_type': format_type,
+            'is_math_mode': bool(is_math_mode),
+            'first_letter_bold': bool(first_letter_bold)
+        }
+    cursor.executemany(
+        'UPDATE entries SET format_flags = ? WHERE id = ?',
+        [(pack_formats(formats), entry_id) for entry_id, formats in formats_by_entry.items()]
+    )
+    # Le righe migrate (e quelle orfane) non servono più
+    cursor.execute('''
+        DELETE FROM formatting_options
+        WHERE entry_id NOT IN (SELECT id FROM entries WHERE format_flags IS NULL)
+    ''')
+    return len(formats_by_entry)
+
+
 class FormatDatabase:
     """Gestisce il database delle opzioni di formattazione"""
     def __init__(self, db_path=None):
@@ -32,35 +126,59 @@ class FormatDatabase:
             conn.commit()
     
     def save_format(self, entry_id, field_name, format_type, is_math_mode=False, first_letter_bold=False):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO formatting_options 
-                (entry_id, field_name, format_type, is_math_mode, first_letter_bold)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (entry_id, field_name, format_type, is_math_mode, first_letter_bold))
-            conn.commit()
+        """Salva la formattazione di un singolo campo nella colonna compatta"""
+        formats = self.get_entry_formats(entry_id)
+        formats[field_name] = {
+            'format_type': format_type,
+            'is_math_mode': is_math_mode,
+            'first_letter_bold': first_letter_bold
+        }
+        self.save_entry_formats(entry_id, formats)
     
     def get_format(self, entry_id, field_name):
+        """Restituisce la formattazione di un singolo campo"""
+        return self.get_entry_formats(entry_id).get(field_name, {
+            'format_type': 'Normale',
+            'is_math_mode': False,
+            'first_letter_bold': False
+        })
+
+    def get_entry_formats(self, entry_id):
+        """
+        Restituisce la formattazione dei tre campi di una definizione con una sola query
+        Returns:
+            dict: campo -> {format_type, is_math_mode, first_letter_bold}
+        """
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
+            cursor.execute('SELECT format_flags FROM entries WHERE id = ?', (entry_id,))
+            result = cursor.fetchone()
+            if result and result[0] is not None:
+                return unpack_formats(result[0])
+
+            # Definizione non ancora migrata: usa le righe di formatting_options
             cursor.execute('''
-                SELECT format_type, is_math_mode, first_letter_bold
+                SELECT field_name, format_type, is_math_mode, first_letter_bold
                 FROM formatting_options
-                WHERE entry_id = ? AND field_name = ?
-            ''', (entry_id, field_name))
-            result = cursor.fetchone()
-            if result:
-                return {
-                    'format_type': result[0],
-                    'is_math_mode': bool(result[1]),
-                    'first_letter_bold': bool(result[2])
+                WHERE entry_id = ?
+            ''', (entry_id,))
+            formats = unpack_formats(0)
+            for field_name, format_type, is_math_mode, first_letter_bold in cursor.fetchall():
+                formats[field_name] = {
+                    'format_type': format_type,
+                    'is_math_mode': bool(is_math_mode),
+                    'first_letter_bold': bool(first_letter_bold)
                 }
-            return {
-                'format_type': 'normal',
-                'is_math_mode': False,
-                'first_letter_bold': False
-            }
+            return formats
+
+    def save_entry_formats(self, entry_id, formats):
+        """Salva la formattazione dei tre campi con una sola istruzione"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('UPDATE entries SET format_flags = ? WHERE id = ?',
+                           (pack_formats(formats), entry_id))
+            cursor.execute('DELETE FROM formatting_options WHERE entry_id = ?', (entry_id,))
+            conn.commit()
 
 class FormatManager:
     """Gestisce la logica di formattazione del testo"""
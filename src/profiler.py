@@ -0,0 +1,66 @@
+import cProfile
+import io
+import os
+import pstats
+import functools
+from datetime import datetime
+from .glossary_os_handler import GlossaryOSHandler
+
+
+# Variabile d'ambiente che attiva la profilazione all'avvio
+PROFILE_ENV_VAR = "GLOSSARY_PROFILE"
+
+
+class CommandProfiler:
+    """Profila con cProfile i comandi dell'interfaccia su richiesta"""
+    def __init__(self, enabled=None, top_n=30):
+        self.os_handler = GlossaryOSHandler()
+        if enabled is None:
+            enabled = os.environ.get(PROFILE_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+        self.enabled = enabled
+        self.top_n = top_n
+        self._active = False  # Evita profili annidati (es. load_project dentro un altro comando)
+
+    def get_profile_directory(self):
+        """Restituisce la cartella dove salvare i profili"""
+        profile_dir = self.os_handler.get_log_directory() / "profiles"
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        return profile_dir
+
+    def wrap(self, name, func):
+        """Restituisce il comando avvolto: profilato solo se la profilazione è attiva"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled or self._active:
+                return func(*args, **kwargs)
+
+            profile = cProfile.Profile()
+            self._active = True
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                self._active = False
+                self._dump(name, profile)
+        return wrapper
+
+    def _dump(self, name, profile):
+        """Salva il file .pstats e un riepilogo testuale dei primi N risultati"""
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            base_path = self.get_profile_directory() / f"{name}_{timestamp}"
+            pstats_path = base_path.with_suffix(".pstats")
+            summary_path = base_path.with_suffix(".txt")
+
+            profile.dump_stats(str(pstats_path))
+
+            stream = io.StringIO()
+            stats = pstats.Stats(profile, stream=stream)
+            stats.strip_dirs().sort_stats("cumulative").print_stats(self.top_n)
+            with open(summary_path, "w", encoding="utf-8") as f:
+                f.write(f"Comando: {name}\n")
+                f.write(f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+                f.write(stream.getvalue())
+
+            print(f"Profilo di '{name}' salvato in: {pstats_path}")
+        except Exception as e:
+            print(f"Errore durante il salvataggio del profilo: {str(e)}")
@@ -0,0 +1,165 @@
+import os
+import json
+import hashlib
+import tempfile
+import zipfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+from .snapshots import SnapshotManager
+
+
+# Estensione e versione del formato dei pacchetti di progetto
+BUNDLE_EXTENSION = '.glossbundle'
+BUNDLE_FORMAT_VERSION = 1
+# Dimensione dei blocchi letti e scritti: il database non viene mai caricato tutto in memoria
+CHUNK_SIZE = 1024 * 1024
+
+MANIFEST_NAME = 'manifest.json'
+PROJECT_NAME = 'project.json'
+DATABASE_NAME = 'database.db'
+
+
+class BundleError(Exception):
+    """Pacchetto non valido o danneggiato"""
+
+
+def _copy_stream(source, target, digest, progress=None, total=None):
+    """Copia a blocchi da un file all'altro aggiornando l'hash; restituisce i byte copiati"""
+    copied = 0
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            return copied
+        digest.update(chunk)
+        target.write(chunk)
+        copied += len(chunk)
+        if progress:
+            progress(copied, total)
+
+
+def export_project_bundle(project_manager, project_name, bundle_path, progress=None):
+    """
+    Esporta un progetto in un unico file compresso: snapshot del database,
+    metadati del progetto e manifest con le checksum SHA-256
+    Args:
+        project_manager (ProjectManager): Gestore dei progetti
+        project_name (str): Nome del progetto
+        bundle_path (str): File del pacchetto da creare
+        progress (callable): progress(byte_scritti, byte_totali)
+    Returns:
+        dict: Il manifest scritto nel pacchetto
+    """
+    project = project_manager.get_project(project_name)
+    if not project:
+        raise BundleError(f"Progetto '{project_name}' non trovato")
+    db_path = project_manager.get_project_db_path(project)
+
+    metadata = {
+        'name': project[1],
+        'description': project[2],
+        'latex_file_path': project[3],
+        'created_at': project[5],
+        'last_modified': project[6],
+        'is_imported': bool(project[7]),
+    }
+    project_data = json.dumps(metadata, ensure_ascii=False, indent=2).encode('utf-8')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        partial = Path(f"{bundle_path}.partial")
+        try:
+            # Snapshot coerente anche se il progetto è aperto nell'editor
+            snapshot = Path(temp_dir) / DATABASE_NAME
+            SnapshotManager().copy_database(db_path, snapshot)
+            db_size = snapshot.stat().st_size
+            with zipfile.ZipFile(partial, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6) as bundle:
+                db_digest = hashlib.sha256()
+                with open(snapshot, 'rb') as source, bundle.open(DATABASE_NAME, 'w', force_zip64=True) as target:
+                    _copy_stream(source, target, db_digest, progress, db_size)
+                bundle.writestr(PROJECT_NAME, project_data)
+
+                manifest = {
+                    'format_version': BUNDLE_FORMAT_VERSION,
+                    'created': datetime.now().isoformat(timespec='seconds'),
+                    'project': metadata['name'],
+                    'files': {
+                        DATABASE_NAME: {'size': db_size, 'sha256': db_digest.hexdigest()},
+                        PROJECT_NAME: {'size': len(project_data),
+                                       'sha256': hashlib.sha256(project_data).hexdigest()},
+                    },
+                }
+                bundle.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+            os.replace(partial, bundle_path)
+        except BaseException:
+            # Niente pacchetti troncati accanto alla destinazione (disco pieno, snapshot fallito, ...)
+            if partial.exists():
+                partial.unlink()
+            raise
+
+    print(f"Pacchetto creato: {bundle_path} ({Path(bundle_path).stat().st_size / 1024:.0f} KB, "
+          f"database {db_size / 1024:.0f} KB)")
+    return manifest
+
+
+def read_manifest(bundle_path):
+    """Legge il manifest di un pacchetto senza estrarre il database"""
+    try:
+        with zipfile.ZipFile(bundle_path) as bundle:
+            manifest = json.loads(bundle.read(MANIFEST_NAME))
+    except (zipfile.BadZipFile, KeyError, ValueError) as e:
+        raise BundleError(f"Pacchetto non valido: {e}")
+    if manifest.get('format_version', 0) > BUNDLE_FORMAT_VERSION:
+        raise BundleError("Pacchetto creato con una versione più recente dell'applicazione")
+    return manifest
+
+
+def import_project_bundle(project_manager, bundle_path, progress=None):
+    """
+    Importa un pacchetto come nuovo progetto, verificando le checksum del manifest
+    Args:
+        project_manager (ProjectManager): Gestore dei progetti
+        bundle_path (str): File del pacchetto
+        progress (callable): progress(byte_estratti, byte_totali)
+    Returns:
+        str: Il nome del progetto creato (con suffisso se il nome era già usato)
+    """
+    project_name = None
+    partial = None
+    # Lettura, verifica e copia in un unico blocco: qualunque difetto del pacchetto
+    # (zip, JSON, campi mancanti, dati compressi corrotti) annulla la registrazione
+    try:
+        manifest = read_manifest(bundle_path)
+        files = manifest.get('files', {})
+        if DATABASE_NAME not in files or PROJECT_NAME not in files:
+            raise BundleError("Pacchetto incompleto")
+
+        with zipfile.ZipFile(bundle_path) as bundle:
+            project_data = bundle.read(PROJECT_NAME)
+            if hashlib.sha256(project_data).hexdigest() != files[PROJECT_NAME]['sha256']:
+                raise BundleError("Checksum dei metadati del progetto non valida")
+            metadata = json.loads(project_data)
+
+            project_name, database_name = project_manager.register_project(
+                metadata['name'], metadata.get('description') or "",
+                metadata.get('latex_file_path'), metadata.get('is_imported', False))
+            db_path = project_manager.os_handler.get_database_path(database_name)
+            partial = Path(f"{db_path}.partial")
+
+            db_digest = hashlib.sha256()
+            with bundle.open(DATABASE_NAME) as source, open(partial, 'wb') as target:
+                _copy_stream(source, target, db_digest, progress, files[DATABASE_NAME]['size'])
+            if db_digest.hexdigest() != files[DATABASE_NAME]['sha256']:
+                raise BundleError("Checksum del database non valida: pacchetto danneggiato")
+            os.replace(partial, db_path)
+    except (BundleError, OSError, zipfile.BadZipFile, zlib.error, ValueError, KeyError, TypeError) as e:
+        if partial is not None and partial.exists():
+            partial.unlink()
+        if project_name is not None:
+            project_manager.unregister_project(project_name)
+        if isinstance(e, BundleError):
+            raise
+        raise BundleError(f"Pacchetto danneggiato: {e}") from e
+
+    project_manager.refresh_project_stats(project_name)
+    print(f"Pacchetto importato come progetto '{project_name}'")
+    return project_name
@@ -0,0 +1,212 @@
+import sqlite3
+import sys
+from .entry_record import canonical_key
+
+
+class ProjectCache:
+    """
+    Cache in memoria delle categorie e dei riepiloghi delle definizioni di un progetto.
+
+    Viene popolata una volta sola e aggiornata in scrittura (write-through) dai metodi
+    che modificano il database. Le modifiche fatte da altri processi vengono rilevate
+    con PRAGMA data_version su una connessione dedicata: il valore cambia quando
+    un'altra connessione esegue un commit, anche una delle nostre. Per questo dopo
+    ogni scrittura nostra mark_synced() confronta il contatore delle modifiche
+    nell'intestazione del file: se è avanzato esattamente di uno il commit è solo il
+    nostro, altrimenti anche un altro processo ha scritto e la cache viene ricaricata.
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.categories = {}  # nome -> {'id', 'comment', 'group_name'}
+        # nome categoria -> {chiave canonica: (chiave, id entry)}
+        self.entries = {}
+        self.loaded = False
+        self._watch_conn = None
+        self._data_version = None
+        self._change_counter = None
+
+    def _data_version_now(self):
+        """Legge data_version sulla connessione di controllo"""
+        if self._watch_conn is None:
+            self._watch_conn = sqlite3.connect(self.db_path)
+        return self._watch_conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _change_counter_now(self):
+        """
+        Contatore delle modifiche nell'intestazione del database (byte 24-27),
+        incrementato a ogni commit con il journal di rollback
+        """
+        try:
+            with open(self.db_path, 'rb') as file:
+                header = file.read(28)
+        except OSError:
+            return None
+        return int.from_bytes(header[24:28], 'big') if len(header) == 28 else None
+
+    def load(self):
+        """Popola la cache leggendo categorie e chiavi dal database"""
+        # Stato letto prima dei dati: un commit esterno durante la lettura
+        # provoca al più un'altra ricarica, mai una modifica persa
+        self._sync_state()
+        categories = {}
+        entries = {}
+        names_by_id = {}
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, name, comment, group_name FROM categories')
+            for cat_id, name, comment, group_name in cursor.fetchall():
+                categories[name] = {'id': cat_id, 'comment': comment, 'group_name': group_name}
+                entries[name] = {}
+                names_by_id[cat_id] = name
+
+            cursor.execute('SELECT id, category_id, key FROM entries')
+            for entry_id, cat_id, key in cursor:
+                name = names_by_id.get(cat_id)
+                if name is None:
+                    continue
+                entries[name][canonical_key(key)] = (key, entry_id)
+
+        self.categories = categories
+        self.entries = entries
+        self.loaded = True
+        print(f"Cache progetto caricata: {len(categories)} categorie, "
+              f"{sum(len(keys) for keys in entries.values())} definizioni")
+
+    def _sync_state(self):
+        """Registra data_version e contatore delle modifiche attuali"""
+        try:
+            self._data_version = self._data_version_now()
+        except sqlite3.Error as e:
+            print(f"Errore nel controllo della cache: {str(e)}")
+            self._data_version = None
+        self._change_counter = self._change_counter_now()
+
+    def mark_synced(self):
+        """
+        Da chiamare dopo un nostro commit, già riportato nella cache. Se nel frattempo
+        anche un altro processo ha scritto (il contatore è avanzato di più di uno)
+        la cache viene ricaricata invece di dare per viste le sue modifiche
+        """
+        try:
+            data_version = self._data_version_now()
+        except sqlite3.Error as e:
+            print(f"Errore nel controllo della cache: {str(e)}")
+            self._data_version = None
+            return
+        counter = self._change_counter_now()
+        # +0: scrittura già registrata (es. la stessa modifica riportata due volte)
+        if (counter is None or self._change_counter is None
+                or counter - self._change_counter not in (0, 1)):
+            print("Modifiche esterne insieme alla scrittura: ricarico la cache del progetto")
+            self.load()
+            return
+        self._data_version = data_version
+        self._change_counter = counter
+
+    def ensure_fresh(self):
+        """
+        Ricarica la cache se non è popolata o se un altro processo ha modificato il database
+        Returns:
+            bool: True se la cache è stata ricaricata
+        """
+        if not self.loaded:
+            self.load()
+            return True
+        try:
+            if self._data_version_now() != self._data_version:
+                print("Modifiche esterne rilevate: ricarico la cache del progetto")
+                self.load()
+                return True
+        except sqlite3.Error as e:
+            print(f"Errore nel controllo della cache: {str(e)}")
+        return False
+
+    def estimated_size(self):
+        """Stima approssimativa in byte della memoria occupata dalla cache"""
+        size = sys.getsizeof(self.categories) + sys.getsizeof(self.entries)
+        for name, category in self.categories.items():
+            size += sys.getsizeof(name) + sys.getsizeof(category)
+            size += sum(sys.getsizeof(value) for value in category.values())
+        for keys in self.entries.values():
+            size += sys.getsizeof(keys)
+            size += sum(sys.getsizeof(canonical) + sys.getsizeof(key)
+                        for canonical, (key, _) in keys.items())
+        return size
+
+    def invalidate(self):
+        """Svuota la cache: verrà ricaricata alla prossima lettura"""
+        self.categories = {}
+        self.entries = {}
+        self.loaded = False
+
+    def close(self):
+        """Chiude la connessione di controllo"""
+        if self._watch_conn is not None:
+            self._watch_conn.close()
+            self._watch_conn = None
+
+    # --- Letture ---
+
+    def get_category(self, name):
+        """Restituisce {'id', 'comment', 'group_name'} della categoria o None"""
+        self.ensure_fresh()
+        return self.categories.get(name)
+
+    def get_category_id(self, name):
+        """Restituisce l'id della categoria o None"""
+        category = self.get_category(name)
+        return category['id'] if category else None
+
+    def get_category_group(self, name):
+        """Restituisce il gruppo della categoria o None"""
+        category = self.get_category(name)
+        return category['group_name'] if category else None
+
+    def get_entry_id(self, category_name, key):
+        """Restituisce l'id della definizione o None"""
+        self.ensure_fresh()
+        cached = self.entries.get(category_name, {}).get(canonical_key(key))
+        return cached[1] if cached else None
+
+    def get_entry_keys(self, category_name):
+        """Restituisce le chiavi della categoria"""
+        self.ensure_fresh()
+        return [key for key, _ in self.entries.get(category_name, {}).values()]
+
+    # --- Aggiornamenti write-through ---
+
+    def set_category(self, name, category_id=None, **fields):
+        """Aggiunge o aggiorna una categoria (fields: comment, group_name)"""
+        if not self.loaded:
+            return
+        category = self.categories.setdefault(
+            name, {'id': category_id, 'comment': None, 'group_name': None})
+        if category_id is not None:
+            category['id'] = category_id
+        category.update(fields)
+        self.entries.setdefault(name, {})
+        self.mark_synced()
+
+    def remove_category(self, name):
+        """Rimuove una categoria e le sue definizioni"""
+        if not self.loaded:
+            return
+        self.categories.pop(name, None)
+        self.entries.pop(name, None)
+        self.mark_synced()
+
+    def set_entry(self, category_name, key, entry_id):
+        """Aggiunge o aggiorna il riepilogo di una definizione"""
+        if not self.loaded:
+            return
+        # Le chiavi sono univoche senza distinzione tra maiuscole e minuscole:
+        # la chiave canonica sostituisce l'eventuale grafia precedente
+        self.entries.setdefault(category_name, {})[canonical_key(key)] = (key, entry_id)
+        self.mark_synced()
+
+    def remove_entry(self, category_name, key):
+        """Rimuove il riepilogo di una definizione"""
+        if not self.loaded:
+            return
+        self.entries.get(category_name, {}).pop(canonical_key(key), None)
+        self.mark_synced()
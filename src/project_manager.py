@@ -1,12 +1,19 @@
 # src/project_manager.py
 
 import sqlite3
+import os
+import time
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox,filedialog
 from datetime import datetime
 from pathlib import Path
 from .glossary_os_handler import GlossaryOSHandler
 from .glossary_db import GlossaryDatabase
+from .snapshots import SnapshotManager, DeletedProjectsDialog
+from .project_bundle import (export_project_bundle, import_project_bundle,
+                             BUNDLE_EXTENSION)
 
 class ProjectManager:
     def __init__(self):
@@ -31,6 +38,19 @@ class ProjectManager:
                     is_imported BOOLEAN DEFAULT 0
                 )
             ''')
+
+            # Statistiche dei progetti in cache (aggiornate in scrittura o in background)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS project_stats (
+                    project_name TEXT PRIMARY KEY,
+                    entry_count INTEGER,
+                    category_count INTEGER,
+                    db_size INTEGER,
+                    db_mtime REAL,
+                    last_import_seconds REAL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
             conn.commit()
     
     def get_all_projects(self):
@@ -47,12 +67,134 @@ class ProjectManager:
             print(f"Errore nel recupero dei progetti: {e}")
             return []
 
+    def get_all_project_stats(self):
+        """Restituisce le statistiche in cache di tutti i progetti: nome -> dict"""
+        try:
+            with sqlite3.connect(self.projects_db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT project_name, entry_count, category_count, db_size,
+                           db_mtime, last_import_seconds
+                    FROM project_stats
+                ''')
+                columns = [desc[0] for desc in cursor.description]
+                return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+        except sqlite3.Error as e:
+            print(f"Errore nel recupero delle statistiche: {e}")
+            return {}
+
+    def get_project_db_path(self, project):
+        """Restituisce il percorso del database di un progetto (riga della tabella projects)"""
+        return self.os_handler.get_database_path(project[4])  # project[4] è database_name
+
+    def is_stats_stale(self, project, stats):
+        """Verifica se le statistiche in cache non corrispondono più al file del database"""
+        if not stats or stats.get('entry_count') is None:
+            return True
+        try:
+            stat = os.stat(self.get_project_db_path(project))
+        except OSError:
+            return False  # Database non presente: niente da ricalcolare
+        return stat.st_size != stats.get('db_size') or stat.st_mtime != stats.get('db_mtime')
+
+    def refresh_project_stats(self, name, last_import_seconds=None):
+        """
+        Ricalcola le statistiche di un progetto dal suo database e le salva in cache
+        Args:
+            name (str): Nome del progetto
+            last_import_seconds (float): Durata dell'ultima importazione, se appena eseguita
+        Returns:
+            dict: Le statistiche aggiornate o None se il progetto non esiste
+        """
+        project = self.get_project(name)
+        if not project:
+            return None
+        db_path = self.get_project_db_path(project)
+        stats = {'entry_count': 0, 'category_count': 0, 'db_size': 0, 'db_mtime': None}
+        try:
+            if db_path.exists():
+                with sqlite3.connect(db_path) as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+                    tables = {row[0] for row in cursor.fetchall()}
+                    if 'category_stats' in tables:
+                        # Tabella aggregata: una riga per categoria invece di una per definizione
+                        cursor.execute('SELECT COALESCE(SUM(entry_count), 0) FROM category_stats')
+                        stats['entry_count'] = cursor.fetchone()[0]
+                    elif 'entries' in tables:
+                        cursor.execute('SELECT COUNT(*) FROM entries')
+                        stats['entry_count'] = cursor.fetchone()[0]
+                    if 'categories' in tables:
+                        cursor.execute('SELECT COUNT(*) FROM categories')
+                        stats['category_count'] = cursor.fetchone()[0]
+                stat = os.stat(db_path)
+                stats['db_size'] = stat.st_size
+                stats['db_mtime'] = stat.st_mtime
+
+            with sqlite3.connect(self.projects_db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO project_stats
+                    (project_name, entry_count, category_count, db_size, db_mtime,
+                     last_import_seconds, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(project_name) DO UPDATE SET
+                        entry_count = excluded.entry_count,
+                        category_count = excluded.category_count,
+                        db_size = excluded.db_size,
+                        db_mtime = excluded.db_mtime,
+                        last_import_seconds = COALESCE(excluded.last_import_seconds,
+                                                       project_stats.last_import_seconds),
+                        updated_at = CURRENT_TIMESTAMP
+                ''', (name, stats['entry_count'], stats['category_count'], stats['db_size'],
+                      stats['db_mtime'], last_import_seconds))
+                conn.commit()
+            stats['last_import_seconds'] = last_import_seconds
+            return stats
+        except sqlite3.Error as e:
+            print(f"Errore nell'aggiornamento delle statistiche di {name}: {e}")
+            return None
+
+    def register_project(self, name, description="", latex_file_path=None, is_imported=True):
+        """
+        Registra un progetto il cui database verrà fornito dal chiamante (es. da un pacchetto)
+        Se il nome è già usato aggiunge un suffisso numerico, come per l'importazione LaTeX
+        Returns:
+            tuple: (nome del progetto, nome del file di database)
+        """
+        with sqlite3.connect(self.projects_db_path) as conn:
+            cursor = conn.cursor()
+            counter = 0
+            while True:
+                project_name = name if counter == 0 else f"{name}_{counter}"
+                database_name = f"{project_name.lower().replace(' ', '_')}.db"
+                if not self.os_handler.get_database_path(database_name).exists():
+                    try:
+                        cursor.execute('''
+                            INSERT INTO projects
+                            (name, description, latex_file_path, database_name, is_imported)
+                            VALUES (?, ?, ?, ?, ?)
+                        ''', (project_name, description, latex_file_path, database_name, is_imported))
+                        conn.commit()
+                        return project_name, database_name
+                    except sqlite3.IntegrityError:
+                        pass
+                counter += 1
+
+    def unregister_project(self, name):
+        """Rimuove la riga di un progetto senza toccare il suo database"""
+        with sqlite3.connect(self.projects_db_path) as conn:
+            conn.execute('DELETE FROM projects WHERE name = ?', (name,))
+            conn.execute('DELETE FROM project_stats WHERE project_name = ?', (name,))
+            conn.commit()
+
     def create_project_from_import(self, latex_file_path, description=""):
         """Crea un nuovo progetto da un file LaTeX importato"""
         try:
             # Usa il nome del file LaTeX come nome del progetto e del database
             file_name = Path(latex_file_path).stem
             database_name = f"{file_name}.db"
+            project_name = file_name
             
             # Crea il progetto nel database principale
             with sqlite3.connect(self.projects_db_path) as conn:
@@ -77,6 +219,7 @@ class ProjectManager:
                                 VALUES (?, ?, ?, ?, 1)
                             ''', (new_name, description, latex_file_path, database_name))
                             conn.commit()
+                            project_name = new_name
                             break
                         except sqlite3.IntegrityError:
                             counter += 1
@@ -86,9 +229,13 @@ class ProjectManager:
             db = GlossaryDatabase(db_path)
             
             # Legge e importa il contenuto del file LaTeX
+            start = time.perf_counter()
             with open(latex_file_path, 'r', encoding='utf-8') as file:
                 content = file.read()
                 db.import_from_latex(content)
+            import_seconds = time.perf_counter() - start
+
+            self.refresh_project_stats(project_name, last_import_seconds=import_seconds)
             
             return db_path
                     
@@ -114,6 +261,8 @@ class ProjectManager:
                 db_path = self.os_handler.get_database_path(database_name)
                 with sqlite3.connect(db_path) as project_conn:
                     project_cursor = project_conn.cursor()
+                    # Va impostato prima della prima tabella: dopo servirebbe un VACUUM completo
+                    project_cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
                     
                     # Crea le tabelle necessarie
                     project_cursor.execute('''
@@ -152,15 +301,47 @@ class ProjectManager:
                 if result:
                     database_path = self.os_handler.get_database_path(result[0])
                     if database_path.exists():
-                        database_path.unlink()
+                        # Il database passa tra gli snapshot: il progetto resta recuperabile
+                        # con restore_deleted_project
+                        SnapshotManager().archive_database(database_path)
                     
                 cursor.execute('DELETE FROM projects WHERE name = ?', (name,))
+                cursor.execute('DELETE FROM project_stats WHERE project_name = ?', (name,))
                 conn.commit()
                 return True
         except Exception as e:
             print(f"Errore nell'eliminazione del progetto: {e}")
             return False
             
+    def list_deleted_projects(self):
+        """Progetti eliminati che si possono ancora recuperare dai loro snapshot"""
+        return SnapshotManager().list_deleted_projects(self.os_handler.get_database_directory())
+
+    def restore_deleted_project(self, snapshot_path, name, progress=None):
+        """
+        Recupera un progetto eliminato copiando il suo snapshot in un nuovo database
+        Args:
+            snapshot_path (Path): Snapshot da cui ripartire
+            name (str): Nome del progetto (con suffisso numerico se già usato)
+            progress (callable): progress(pagine_copiate, pagine_totali)
+        Returns:
+            str: Il nome del progetto recuperato
+        """
+        project_name, database_name = self.register_project(
+            name, description="Recuperato da snapshot", is_imported=False)
+        db_path = self.os_handler.get_database_path(database_name)
+        partial = db_path.with_suffix('.db.partial')
+        try:
+            SnapshotManager().copy_database(snapshot_path, partial, progress)
+            os.replace(partial, db_path)
+        except BaseException:
+            if partial.exists():
+                partial.unlink()
+            self.unregister_project(project_name)
+            raise
+        print(f"Progetto '{project_name}' recuperato da {snapshot_path}")
+        return project_name
+
     def get_project(self, name):
         """Recupera i dettagli di un progetto specifico"""
         with sqlite3.connect(self.projects_db_path) as conn:
@@ -214,6 +395,13 @@ class ProjectDialog:
         
         self.window.transient(parent)
         self.window.grab_set()
+
+        # Statistiche caricate in background e consegnate all'interfaccia tramite coda
+        self._stats_queue = queue.Queue()
+        self._stats_generation = 0
+        self._project_items = {}
+        # Esportazione e importazione dei pacchetti in background
+        self._bundle_queue = queue.Queue()
         
         self._create_widgets()
         self._update_project_list()
@@ -231,6 +419,14 @@ class ProjectDialog:
                    command=self._new_project).pack(side=tk.LEFT, padx=5)
         ttk.Button(top_frame, text="Nuovo Progetto da LaTeX", 
                    command=self._import_latex).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top_frame, text="Importa Pacchetto",
+                   command=self._import_bundle).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top_frame, text="Esporta Pacchetto",
+                   command=self._export_bundle).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top_frame, text="Recupera Eliminato",
+                   command=self._restore_deleted).pack(side=tk.LEFT, padx=5)
+        self.bundle_status_var = tk.StringVar()
+        ttk.Label(top_frame, textvariable=self.bundle_status_var).pack(side=tk.LEFT, padx=5)
         
         # Lista progetti e dettagli
         content_frame = ttk.Frame(main_frame)
@@ -240,9 +436,16 @@ class ProjectDialog:
         list_frame = ttk.LabelFrame(content_frame, text="Progetti", padding="5")
         list_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
         
-        self.project_list = ttk.Treeview(list_frame, columns=('type',), show='tree')
+        self.project_list = ttk.Treeview(list_frame, columns=('type', 'entries', 'categories', 'size'),
+                                         show='tree headings')
         self.project_list.heading('#0', text='Nome')
         self.project_list.heading('type', text='Tipo')
+        self.project_list.heading('entries', text='Definizioni')
+        self.project_list.heading('categories', text='Categorie')
+        self.project_list.heading('size', text='Dimensione')
+        self.project_list.column('#0', width=150)
+        for column in ('type', 'entries', 'categories', 'size'):
+            self.project_list.column(column, width=75, anchor=tk.E if column != 'type' else tk.W)
         
         scrollbar = ttk.Scrollbar(list_frame, orient="vertical", 
                                  command=self.project_list.yview)
@@ -303,18 +506,177 @@ class ProjectDialog:
             except Exception as e:
                 messagebox.showerror("Errore", f"Errore durante l'importazione: {str(e)}")
     
+    def _export_bundle(self):
+        """Esporta il progetto selezionato in un pacchetto compresso"""
+        selected_items = self.project_list.selection()
+        if not selected_items:
+            messagebox.showwarning("Attenzione", "Seleziona un progetto da esportare")
+            return
+        project_name = self.project_list.item(selected_items[0])['text']
+        file_path = filedialog.asksaveasfilename(
+            initialdir=self.project_manager.os_handler.get_export_directory(),
+            initialfile=f"{project_name}{BUNDLE_EXTENSION}",
+            defaultextension=BUNDLE_EXTENSION,
+            filetypes=[("Pacchetto progetto", f"*{BUNDLE_EXTENSION}"), ("Tutti i file", "*.*")]
+        )
+        if file_path:
+            self._run_bundle_task(
+                f"Esportazione di '{project_name}'...",
+                lambda progress: export_project_bundle(
+                    self.project_manager, project_name, file_path, progress),
+                lambda manifest: messagebox.showinfo(
+                    "Successo", f"Progetto esportato in:\n{file_path}"))
+
+    def _import_bundle(self):
+        """Importa un pacchetto come nuovo progetto"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Pacchetto progetto", f"*{BUNDLE_EXTENSION}"), ("Tutti i file", "*.*")]
+        )
+        if file_path:
+            def done(project_name):
+                self._update_project_list()
+                messagebox.showinfo("Successo", f"Pacchetto importato come progetto '{project_name}'")
+
+            self._run_bundle_task(
+                "Importazione del pacchetto...",
+                lambda progress: import_project_bundle(self.project_manager, file_path, progress),
+                done)
+
+    def _restore_deleted(self):
+        """Recupera un progetto eliminato dal suo ultimo snapshot"""
+        deleted = self.project_manager.list_deleted_projects()
+        if not deleted:
+            messagebox.showinfo("Progetti eliminati", "Nessun progetto eliminato da recuperare",
+                                parent=self.window)
+            return
+        dialog = DeletedProjectsDialog(self.window, deleted)
+        self.window.wait_window(dialog.window)
+        self.window.grab_set()
+        if not dialog.selected:
+            return
+
+        def done(project_name):
+            self._update_project_list()
+            messagebox.showinfo("Successo", f"Progetto recuperato come '{project_name}'",
+                                parent=self.window)
+
+        selected = dialog.selected
+        self._run_bundle_task(
+            f"Recupero di '{selected['name']}'...",
+            lambda progress: self.project_manager.restore_deleted_project(
+                selected['snapshot']['path'], selected['name'], progress),
+            done)
+
+    def _run_bundle_task(self, description, func, on_done):
+        """Esegue func(progress) in un thread, mostrando l'avanzamento nella finestra"""
+        self.bundle_status_var.set(description)
+
+        def progress(done, total):
+            if total:
+                self._bundle_queue.put(('progress', f"{description} {done * 100 // total}%"))
+
+        def worker():
+            try:
+                self._bundle_queue.put(('done', func(progress)))
+            except Exception as e:
+                # Qualunque errore deve arrivare all'interfaccia, che altrimenti attende per sempre
+                self._bundle_queue.put(('error', str(e)))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.window.after(100, self._poll_bundle_queue, on_done)
+
+    def _poll_bundle_queue(self, on_done):
+        """Consegna all'interfaccia avanzamento ed esito dell'operazione sul pacchetto"""
+        if not self.window.winfo_exists():
+            return
+        try:
+            while True:
+                kind, value = self._bundle_queue.get_nowait()
+                if kind == 'progress':
+                    self.bundle_status_var.set(value)
+                    continue
+                self.bundle_status_var.set("")
+                if kind == 'error':
+                    messagebox.showerror("Errore", value, parent=self.window)
+                else:
+                    on_done(value)
+                return
+        except queue.Empty:
+            self.window.after(100, self._poll_bundle_queue, on_done)
+
     def _update_project_list(self):
         """Aggiorna la lista dei progetti nel Treeview"""
         # Pulisci la lista esistente
         for item in self.project_list.get_children():
             self.project_list.delete(item)
+        self._project_items = {}
             
-        # Inserisci i progetti
-        for project in self.project_manager.get_all_projects():
+        # Inserisci i progetti con le statistiche in cache (eventualmente non aggiornate)
+        projects = self.project_manager.get_all_projects()
+        cached_stats = self.project_manager.get_all_project_stats()
+        for project in projects:
             project_type = "Importato" if project[7] else "Nuovo"  # Controlla is_imported
-            self.project_list.insert('', 'end', 
+            item = self.project_list.insert('', 'end', 
                                    text=project[1],  # nome del progetto
-                                   values=(project_type,))  # tipo di progetto
+                                   values=(project_type,) + self._format_stats(cached_stats.get(project[1])))
+            self._project_items[project[1]] = item
+
+        # Le statistiche mancanti o non aggiornate vengono calcolate in background
+        self._stats_generation += 1
+        threading.Thread(
+            target=self._load_stale_stats,
+            args=(self._stats_generation, projects, cached_stats),
+            daemon=True
+        ).start()
+        self.window.after(100, self._poll_stats_queue, self._stats_generation)
+
+    def _format_stats(self, stats):
+        """Restituisce i valori delle colonne statistiche per il Treeview"""
+        if not stats or stats.get('entry_count') is None:
+            return ("…", "…", "…")
+        size = stats.get('db_size') or 0
+        for unit in ("B", "KB", "MB", "GB"):
+            if size < 1024 or unit == "GB":
+                break
+            size /= 1024
+        size_text = f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        return (stats['entry_count'], stats['category_count'], size_text)
+
+    def _load_stale_stats(self, generation, projects, cached_stats):
+        """Eseguito in un thread: ricalcola le statistiche non aggiornate"""
+        for project in projects:
+            if generation != self._stats_generation:
+                return  # La lista è stata ricaricata nel frattempo
+            try:
+                if self.project_manager.is_stats_stale(project, cached_stats.get(project[1])):
+                    stats = self.project_manager.refresh_project_stats(project[1])
+                    if stats:
+                        self._stats_queue.put((generation, project[1], stats))
+            except Exception as e:
+                print(f"Errore nel calcolo delle statistiche di {project[1]}: {e}")
+        self._stats_queue.put((generation, None, None))
+
+    def _poll_stats_queue(self, generation):
+        """Aggiorna il Treeview con le statistiche prodotte dal thread"""
+        if generation != self._stats_generation or not self.window.winfo_exists():
+            return
+        finished = False
+        try:
+            while True:
+                item_generation, name, stats = self._stats_queue.get_nowait()
+                if item_generation != generation:
+                    continue
+                if name is None:
+                    finished = True
+                    continue
+                item = self._project_items.get(name)
+                if item and self.project_list.exists(item):
+                    project_type = self.project_list.set(item, 'type')
+                    self.project_list.item(item, values=(project_type,) + self._format_stats(stats))
+        except queue.Empty:
+            pass
+        if not finished:
+            self.window.after(100, self._poll_stats_queue, generation)
     
     def _new_project(self):
         """Pulisce i campi per un nuovo progetto"""
@@ -373,7 +735,12 @@ class ProjectDialog:
         item = selected_items[0]
         project_name = self.project_list.item(item)['text']
         
-        if messagebox.askyesno("Conferma", f"Vuoi davvero eliminare il progetto '{project_name}'?"):
+        if messagebox.askyesno("Conferma", f"Vuoi davvero eliminare il progetto '{project_name}'?\n"
+                               "Potrà essere recuperato con 'Recupera Eliminato'."):
+            # Chiudi il progetto se era tra quelli recenti dell'editor: il database
+            # viene spostato tra gli snapshot e non deve restare aperto
+            if hasattr(self.parent, 'forget_project'):
+                self.parent.forget_project(project_name)
             if self.project_manager.delete_project(project_name):
                 self._update_project_list()
                 # Pulisci i campi
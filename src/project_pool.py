@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+from .db_maintenance import DatabaseMaintenance
+
+
+class ProjectHandle:
+    """Progetto aperto: database, connessione, cache e stato della vista"""
+    def __init__(self, name, db, db_manager):
+        self.name = name
+        self.db = db
+        self.db_manager = db_manager
+        # Stato dell'editor da ripristinare quando si torna al progetto
+        self.view_state = {}
+        # Righe della vista database già caricate
+        self.viewer_rows = None
+
+    def estimated_size(self):
+        """Stima in byte della memoria occupata dal progetto aperto"""
+        size = self.db.cache.estimated_size()
+        if self.viewer_rows:
+            # Stima grossolana: circa 100 byte per valore mostrato nella vista
+            size += len(self.viewer_rows) * len(self.viewer_rows[0]) * 100
+        return size
+
+    def close(self, maintenance=False):
+        """
+        Chiude le connessioni del progetto. La manutenzione leggera, se richiesta,
+        gira in un thread separato per non bloccare l'interfaccia
+        Returns:
+            threading.Thread: Il thread della manutenzione, o None
+        """
+        self.db_manager.close()
+        self.db.cache.close()
+        if not maintenance:
+            return None
+        # Non daemon: all'uscita dal programma la manutenzione in corso viene completata
+        thread = threading.Thread(target=self._run_maintenance,
+                                  name=f"maintenance-{self.name}")
+        thread.start()
+        return thread
+
+    def _run_maintenance(self):
+        try:
+            DatabaseMaintenance(self.db.db_path).run_quick()
+        except Exception as e:
+            print(f"Errore nella manutenzione del progetto '{self.name}': {str(e)}")
+
+
+class ProjectPool:
+    """Mantiene aperti i progetti usati di recente (LRU) per un cambio progetto rapido"""
+    def __init__(self, max_projects=6, max_memory_mb=64, maintenance_on_close=False):
+        self.max_projects = max_projects
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.maintenance_on_close = maintenance_on_close
+        self._handles = OrderedDict()
+
+    def __contains__(self, name):
+        return name in self._handles
+
+    def __len__(self):
+        return len(self._handles)
+
+    def get(self, name):
+        """Restituisce il progetto aperto e lo segna come il più recente, o None"""
+        handle = self._handles.get(name)
+        if handle is not None:
+            self._handles.move_to_end(name)
+        return handle
+
+    def put(self, handle):
+        """Aggiunge un progetto aperto ed elimina i meno recenti oltre i limiti"""
+        previous = self._handles.pop(handle.name, None)
+        if previous is not None and previous is not handle:
+            previous.close()
+        self._handles[handle.name] = handle
+        self._evict()
+
+    def discard(self, name):
+        """Chiude e rimuove un progetto (es. dopo l'eliminazione o un ripristino)"""
+        handle = self._handles.pop(name, None)
+        if handle is not None:
+            handle.close()
+
+    def close_all(self):
+        """Chiude tutti i progetti aperti"""
+        while self._handles:
+            _, handle = self._handles.popitem(last=False)
+            handle.close(maintenance=self.maintenance_on_close)
+
+    def estimated_size(self):
+        """Stima in byte della memoria occupata da tutti i progetti aperti"""
+        return sum(handle.estimated_size() for handle in self._handles.values())
+
+    def _evict(self):
+        """Chiude i progetti meno recenti finché numero e memoria rientrano nei limiti"""
+        # Il progetto più recente (quello attivo) non viene mai eliminato
+        while len(self._handles) > 1 and (
+                len(self._handles) > self.max_projects
+                or self.estimated_size() > self.max_memory_bytes):
+            name, handle = self._handles.popitem(last=False)
+            print(f"Progetto '{name}' rimosso dai progetti recenti")
+            handle.close(maintenance=self.maintenance_on_close)
@@ -0,0 +1,401 @@
+import os
+import re
+import shutil
+import queue
+import sqlite3
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime
+from pathlib import Path
+from .glossary_os_handler import GlossaryOSHandler
+
+
+# Nome dei file: <database>_<AAAAMMGG_HHMMSS>[_<etichetta>].db
+_SNAPSHOT_NAME = re.compile(r'^(?P<stem>.+)_(?P<stamp>\d{8}_\d{6})(?:_(?P<label>[\w-]+))?\.db$')
+
+
+class _BackupRestarted(Exception):
+    """La copia è ripartita troppe volte per le scritture concorrenti"""
+
+
+class SnapshotManager:
+    """
+    Snapshot dei database di progetto con l'API di backup di SQLite.
+
+    La copia avviene a blocchi di pagine: tra un blocco e l'altro il database
+    sorgente è libero, quindi l'editor può continuare a leggere e scrivere anche
+    durante lo snapshot di progetti molto grandi.
+    """
+    def __init__(self, keep_last=10, keep_days=7, pages_per_step=256):
+        self.os_handler = GlossaryOSHandler()
+        self.keep_last = keep_last
+        self.keep_days = keep_days
+        self.pages_per_step = pages_per_step
+
+    def snapshot_directory(self, db_path):
+        """Cartella degli snapshot di un database"""
+        return self.os_handler.get_snapshot_directory() / Path(db_path).stem
+
+    # Riavvii della copia tollerati prima di passare alla copia in un solo passo
+    MAX_RESTARTS = 3
+
+    def copy_database(self, source_path, target_path, progress=None):
+        """
+        Copia un database con backup() a blocchi di pagine. Se un'altra connessione
+        scrive sul sorgente la copia riparte da capo: dopo MAX_RESTARTS riavvii
+        viene completata in un solo passo (i writer attendono la fine della lettura)
+        """
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path)
+        state = {'remaining': None, 'restarts': 0}
+
+        def on_progress(status, remaining, total):
+            if state['remaining'] is not None and remaining > state['remaining']:
+                state['restarts'] += 1
+                if state['restarts'] > self.MAX_RESTARTS:
+                    raise _BackupRestarted()
+            state['remaining'] = remaining
+            if progress:
+                progress(total - remaining, total)
+
+        try:
+            try:
+                source.backup(target, pages=self.pages_per_step, progress=on_progress)
+            except _BackupRestarted:
+                print("Database modificato durante lo snapshot: copia in un solo passo")
+                source.backup(target, pages=-1, progress=on_progress)
+        finally:
+            target.close()
+            source.close()
+
+    def _snapshot_target(self, db_path, label=None):
+        """Percorso libero per un nuovo snapshot del database"""
+        directory = self.snapshot_directory(db_path)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{Path(db_path).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if label:
+            name += '_' + re.sub(r'[^\w-]', '-', label)
+        target = directory / f"{name}.db"
+        counter = 1
+        while target.exists():
+            counter += 1
+            target = directory / f"{name}_{counter}.db"
+        return target
+
+    def create_snapshot(self, db_path, label=None, progress=None, retention=True):
+        """
+        Crea uno snapshot del database
+        Args:
+            db_path (Path): Database del progetto
+            label (str): Etichetta facoltativa (es. 'eliminazione', 'ripristino')
+            progress (callable): progress(pagine_copiate, pagine_totali), chiamata dal thread della copia
+            retention (bool): Applica la politica di conservazione dopo la copia
+        Returns:
+            Path: Il file dello snapshot
+        """
+        target = self._snapshot_target(db_path, label)
+        partial = target.with_suffix('.db.partial')
+
+        # Il file definitivo compare solo a copia completata
+        self.copy_database(db_path, partial, progress)
+        os.replace(partial, target)
+        print(f"Snapshot creato: {target}")
+        if retention:
+            self.apply_retention(db_path)
+        return target
+
+    # Etichetta dello snapshot che conserva un progetto eliminato
+    DELETED_LABEL = 'eliminazione'
+
+    def archive_database(self, db_path):
+        """
+        Sposta il database di un progetto eliminato tra i suoi snapshot: nessuna copia,
+        quindi l'eliminazione resta immediata anche per progetti molto grandi.
+        Il database non deve essere aperto da altre connessioni
+        Returns:
+            Path: Lo snapshot con il database eliminato
+        """
+        target = self._snapshot_target(db_path, self.DELETED_LABEL)
+        shutil.move(str(db_path), str(target))
+        print(f"Database archiviato: {target}")
+        return target
+
+    def list_deleted_projects(self, database_directory):
+        """
+        Progetti eliminati ancora recuperabili: cartelle di snapshot il cui database
+        non esiste più, con lo snapshot più recente di ciascuna
+        Args:
+            database_directory (Path): Cartella dei database dei progetti
+        Returns:
+            list: dict con name (nome del file di database senza estensione) e snapshot
+        """
+        root = self.os_handler.get_snapshot_directory()
+        if not root.exists():
+            return []
+        deleted = []
+        for directory in sorted(root.iterdir()):
+            db_path = Path(database_directory) / f"{directory.name}.db"
+            if not directory.is_dir() or db_path.exists():
+                continue
+            snapshots = self.list_snapshots(db_path)
+            if snapshots:
+                deleted.append({'name': directory.name, 'snapshot': snapshots[0]})
+        return deleted
+
+    def list_snapshots(self, db_path):
+        """Restituisce gli snapshot del database, dal più recente"""
+        directory = self.snapshot_directory(db_path)
+        if not directory.exists():
+            return []
+        snapshots = []
+        for path in directory.glob('*.db'):
+            match = _SNAPSHOT_NAME.match(path.name)
+            if not match:
+                continue
+            snapshots.append({
+                'path': path,
+                'created': datetime.strptime(match.group('stamp'), '%Y%m%d_%H%M%S'),
+                'label': match.group('label') or '',
+                'size': path.stat().st_size,
+            })
+        snapshots.sort(key=lambda snapshot: (snapshot['created'], snapshot['path'].name), reverse=True)
+        return snapshots
+
+    def apply_retention(self, db_path):
+        """
+        Elimina gli snapshot in eccesso: restano gli ultimi keep_last e il più
+        recente di ciascuno degli ultimi keep_days giorni
+        Returns:
+            list: Gli snapshot eliminati
+        """
+        snapshots = self.list_snapshots(db_path)
+        keep = {snapshot['path'] for snapshot in snapshots[:self.keep_last]}
+        days = []
+        for snapshot in snapshots:
+            day = snapshot['created'].date()
+            if day not in days:
+                days.append(day)
+                if len(days) <= self.keep_days:
+                    keep.add(snapshot['path'])
+
+        removed = []
+        for snapshot in snapshots:
+            if snapshot['path'] not in keep:
+                snapshot['path'].unlink()
+                removed.append(snapshot)
+        if removed:
+            print(f"Snapshot eliminati per la politica di conservazione: {len(removed)}")
+        return removed
+
+    def restore_snapshot(self, snapshot_path, db_path, progress=None):
+        """
+        Ripristina uno snapshot sul database del progetto. Prima salva lo stato
+        attuale in un nuovo snapshot, così anche il ripristino si può annullare
+        Returns:
+            Path: Lo snapshot dello stato precedente al ripristino
+        """
+        previous = None
+        if Path(db_path).exists():
+            # Senza conservazione: potrebbe eliminare proprio lo snapshot da ripristinare
+            previous = self.create_snapshot(db_path, label='prima-del-ripristino', retention=False)
+        # backup() sovrascrive il database di destinazione in un'unica transazione
+        self.copy_database(snapshot_path, db_path, progress)
+        print(f"Snapshot ripristinato: {snapshot_path} -> {db_path}")
+        self.apply_retention(db_path)
+        return previous
+
+
+class SnapshotDialog:
+    """Finestra per creare, ripristinare ed eliminare gli snapshot del progetto corrente"""
+    def __init__(self, parent, project_name, db_path, manager=None):
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"Snapshot - {project_name}")
+        self.window.geometry("600x380")
+        self.parent = parent
+        self.project_name = project_name
+        self.db_path = db_path
+        self.manager = manager or SnapshotManager()
+        self._snapshots = {}  # item del Treeview -> snapshot
+        self._queue = queue.Queue()
+        self._busy = False
+
+        self.window.transient(parent)
+        self._create_widgets()
+        self._update_list()
+
+    def _create_widgets(self):
+        main_frame = ttk.Frame(self.window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = ('Data', 'Etichetta', 'Dimensione')
+        self.tree = ttk.Treeview(main_frame, columns=columns, show='headings', height=10)
+        widths = {'Data': 180, 'Etichetta': 200, 'Dimensione': 100}
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=widths[col])
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.progress = ttk.Progressbar(main_frame, mode='determinate')
+        self.progress.pack(fill=tk.X, pady=(10, 0))
+        self.status_var = tk.StringVar()
+        ttk.Label(main_frame, textvariable=self.status_var).pack(anchor=tk.W)
+
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.pack(fill=tk.X, pady=(10, 0))
+        self.buttons = [
+            ttk.Button(btn_frame, text="Crea snapshot", command=self._create_snapshot),
+            ttk.Button(btn_frame, text="Ripristina", command=self._restore_selected),
+            ttk.Button(btn_frame, text="Elimina", command=self._delete_selected),
+        ]
+        for button in self.buttons:
+            button.pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Chiudi", command=self.window.destroy).pack(side=tk.RIGHT)
+
+    def _update_list(self):
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self._snapshots = {}
+        for snapshot in self.manager.list_snapshots(self.db_path):
+            item = self.tree.insert('', 'end', values=(
+                snapshot['created'].strftime('%d/%m/%Y %H:%M:%S'),
+                snapshot['label'],
+                f"{snapshot['size'] / 1024:.0f} KB"))
+            self._snapshots[item] = snapshot
+
+    def _selected_snapshot(self):
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("Attenzione", "Seleziona uno snapshot", parent=self.window)
+            return None
+        return self._snapshots.get(selection[0])
+
+    def _run(self, description, func, on_done):
+        """Esegue func(progress) in un thread e aggiorna la barra di avanzamento"""
+        if self._busy:
+            return
+        self._busy = True
+        for button in self.buttons:
+            button.state(['disabled'])
+        self.status_var.set(description)
+        self.progress['value'] = 0
+
+        def progress(done, total):
+            self._queue.put(('progress', (done, total)))
+
+        def worker():
+            try:
+                self._queue.put(('done', func(progress)))
+            except (sqlite3.Error, OSError) as e:
+                self._queue.put(('error', str(e)))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.window.after(100, self._poll_queue, on_done)
+
+    def _poll_queue(self, on_done):
+        try:
+            while True:
+                kind, value = self._queue.get_nowait()
+                if kind == 'progress':
+                    done, total = value
+                    self.progress['maximum'] = max(total, 1)
+                    self.progress['value'] = done
+                    continue
+                self._busy = False
+                for button in self.buttons:
+                    button.state(['!disabled'])
+                self._update_list()
+                if kind == 'error':
+                    self.status_var.set("")
+                    messagebox.showerror("Errore", value, parent=self.window)
+                else:
+                    on_done(value)
+                return
+        except queue.Empty:
+            pass
+        if self.window.winfo_exists():
+            self.window.after(100, self._poll_queue, on_done)
+
+    def _create_snapshot(self):
+        self._run("Creazione snapshot in corso...",
+                  lambda progress: self.manager.create_snapshot(self.db_path, progress=progress),
+                  lambda path: self.status_var.set(f"Snapshot creato: {Path(path).name}"))
+
+    def _restore_selected(self):
+        snapshot = self._selected_snapshot()
+        if not snapshot:
+            return
+        if not messagebox.askyesno(
+                "Conferma",
+                f"Ripristinare lo snapshot del {snapshot['created']:%d/%m/%Y %H:%M}?\n"
+                "Lo stato attuale verrà salvato in un nuovo snapshot.",
+                parent=self.window):
+            return
+
+        # L'editor rilegge il progetto quando il thread ha finito, anche se nel
+        # frattempo questa finestra è stata chiusa
+        notify = None
+        if hasattr(self.parent, 'reload_project_when_done'):
+            notify = self.parent.reload_project_when_done(self.project_name)
+
+        def restore(progress):
+            try:
+                return self.manager.restore_snapshot(snapshot['path'], self.db_path, progress=progress)
+            finally:
+                if notify:
+                    notify()
+
+        self._run("Ripristino in corso...", restore,
+                  lambda previous: self.status_var.set("Snapshot ripristinato"))
+
+    def _delete_selected(self):
+        snapshot = self._selected_snapshot()
+        if snapshot and messagebox.askyesno("Conferma", "Eliminare lo snapshot selezionato?",
+                                            parent=self.window):
+            snapshot['path'].unlink()
+            self._update_list()
+
+
+class DeletedProjectsDialog:
+    """
+    Finestra per scegliere un progetto eliminato da recuperare.
+    Dopo la chiusura, selected contiene il progetto scelto oppure None
+    """
+    def __init__(self, parent, deleted):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Progetti eliminati")
+        self.window.geometry("500x300")
+        self.window.transient(parent)
+        self.deleted = deleted
+        self.selected = None
+
+        main_frame = ttk.Frame(self.window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        columns = ('Progetto', 'Snapshot', 'Dimensione')
+        self.tree = ttk.Treeview(main_frame, columns=columns, show='headings', height=10)
+        widths = {'Progetto': 200, 'Snapshot': 160, 'Dimensione': 100}
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=widths[col])
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        for index, project in enumerate(deleted):
+            snapshot = project['snapshot']
+            self.tree.insert('', 'end', iid=str(index), values=(
+                project['name'],
+                snapshot['created'].strftime('%d/%m/%Y %H:%M:%S'),
+                f"{snapshot['size'] / 1024:.0f} KB"))
+        self.tree.bind('<Double-1>', lambda event: self._confirm())
+
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(btn_frame, text="Recupera", command=self._confirm).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Annulla", command=self.window.destroy).pack(side=tk.RIGHT)
+        self.window.grab_set()
+
+    def _confirm(self):
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("Attenzione", "Seleziona un progetto", parent=self.window)
+            return
+        self.selected = self.deleted[int(selection[0])]
+        self.window.destroy()
@@ -0,0 +1,321 @@
+import os
+import re
+import mmap
+import time
+import sqlite3
+import hashlib
+import multiprocessing
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from .glossary_usage import GLS_COMMANDS, iter_tex_files
+from .entry_record import canonical_key
+
+
+# Versione bytes del pattern di glossary_usage: i file vengono letti (o mappati)
+# senza decodificarli e il comando viene catturato insieme alle chiavi
+_GLS_REFERENCE_BYTES = re.compile(
+    rb'\\(' + b'|'.join(name.encode() for name in sorted(GLS_COMMANDS, key=len, reverse=True)) + rb')'
+    rb'(?![A-Za-z])[*+]?\s*(?:\[[^\]]*\])?\s*\{([^{}]*)\}'
+)
+_COMMENT_START = re.compile(rb'(?<!\\)%')
+
+
+def _find_references(content):
+    """Restituisce (chiave, comando, riga) per ogni riferimento fuori dai commenti"""
+    references = []
+    line = 1
+    last = 0
+    for match in _GLS_REFERENCE_BYTES.finditer(content):
+        start = match.start()
+        line += bytes(content[last:start]).count(b'\n')
+        last = start
+        line_start = content.rfind(b'\n', 0, start) + 1
+        if _COMMENT_START.search(bytes(content[line_start:start])):
+            continue
+        command = match.group(1).decode('ascii')
+        for key in match.group(2).decode('utf-8', errors='replace').split(','):
+            if key.strip():
+                references.append((key.strip(), command, line))
+    return references
+
+
+def _scan_file(task):
+    """
+    Scansiona un file (eseguita nei processi del pool, deve restare a livello di modulo)
+    Args:
+        task (tuple): (percorso, sha1 noto o None, soglia in byte oltre cui usare mmap)
+    Returns:
+        tuple: (percorso, mtime, dimensione, sha1, riferimenti o None se il contenuto
+               è identico a quello già indicizzato); mtime è None se il file è sparito
+               nel frattempo
+    """
+    path, known_sha1, mmap_threshold = task
+    try:
+        stat = os.stat(path)
+        with open(path, 'rb') as file:
+            if stat.st_size >= mmap_threshold:
+                # File grandi: niente copia in memoria, le pagine vengono lette su richiesta
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    sha1 = hashlib.sha1(content).hexdigest()
+                    references = None if sha1 == known_sha1 else _find_references(content)
+            else:
+                content = file.read()
+                sha1 = hashlib.sha1(content).hexdigest()
+                references = None if sha1 == known_sha1 else _find_references(content)
+    except OSError:
+        # Cancellato o rinominato durante la scansione (es. file temporanei dell'editor)
+        return path, None, None, None, None
+    return path, stat.st_mtime, stat.st_size, sha1, references
+
+
+class UsageScanner:
+    """
+    Indicizza i riferimenti \\gls, \\acrshort, ... dei sorgenti LaTeX nelle tabelle
+    usage e usage_files del database di progetto. Le scansioni successive rileggono
+    solo i file con mtime o dimensione cambiati, e li rianalizzano solo se cambia l'hash
+    """
+    def __init__(self, db_path, max_workers=None, mmap_threshold=1024 * 1024,
+                 parallel_threshold=16):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.mmap_threshold = mmap_threshold
+        # Sotto questo numero di file l'avvio del pool costa più della scansione
+        self.parallel_threshold = parallel_threshold
+
+    def scan(self, root, progress=None):
+        """
+        Scansiona (in modo incrementale) i file .tex di una cartella
+        Args:
+            root (str): Cartella dei sorgenti del documento
+            progress (callable): progress(file_elaborati, file_da_elaborare)
+        Returns:
+            dict: files, scanned, unchanged, removed, references e seconds
+        """
+        start = time.perf_counter()
+        root = Path(root).resolve()
+        files = [str(path.resolve()) for path in iter_tex_files([root])]
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT path, mtime, size, sha1 FROM usage_files')
+            known = {path: (mtime, size, sha1) for path, mtime, size, sha1 in cursor.fetchall()}
+
+        # File nuovi o con mtime/dimensione diversi; gli altri non vengono nemmeno aperti
+        tasks = []
+        missing = set()
+        for path in files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Sparito tra l'elenco della cartella e lo stat: lo si tratta come rimosso
+                missing.add(path)
+                continue
+            previous = known.get(path)
+            if previous and previous[0] == stat.st_mtime and previous[1] == stat.st_size:
+                continue
+            tasks.append((path, previous[2] if previous else None, self.mmap_threshold))
+
+        results = []
+        if len(tasks) >= self.parallel_threshold:
+            # spawn: i processi non ereditano thread e stato di Tk del processo principale
+            with ProcessPoolExecutor(max_workers=self.max_workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                chunksize = max(1, len(tasks) // ((self.max_workers or os.cpu_count() or 1) * 4))
+                for result in executor.map(_scan_file, tasks, chunksize=chunksize):
+                    results.append(result)
+                    if progress:
+                        progress(len(results), len(tasks))
+        else:
+            for task in tasks:
+                results.append(_scan_file(task))
+                if progress:
+                    progress(len(results), len(tasks))
+
+        missing.update(path for path, mtime, _, _, _ in results if mtime is None)
+        results = [result for result in results if result[1] is not None]
+        files = [path for path in files if path not in missing]
+
+        prefix = str(root) + os.sep
+        current = set(files)
+        removed = [path for path in known if path.startswith(prefix) and path not in current]
+        report = {'files': len(files), 'scanned': 0, 'unchanged': 0,
+                  'removed': len(removed), 'references': 0}
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            for path in removed:
+                cursor.execute('DELETE FROM usage WHERE path = ?', (path,))
+                cursor.execute('DELETE FROM usage_files WHERE path = ?', (path,))
+            for path, mtime, size, sha1, references in results:
+                if references is None:
+                    # Solo toccato (es. salvato senza modifiche): basta aggiornare mtime
+                    report['unchanged'] += 1
+                    cursor.execute('UPDATE usage_files SET mtime = ?, size = ? WHERE path = ?',
+                                   (mtime, size, path))
+                    continue
+                report['scanned'] += 1
+                report['references'] += len(references)
+                cursor.execute('DELETE FROM usage WHERE path = ?', (path,))
+                cursor.executemany('''
+                    INSERT INTO usage (path, canonical_key, key, command, line)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', [(path, canonical_key(key), key, command, line)
+                      for key, command, line in references])
+                cursor.execute('''
+                    INSERT INTO usage_files (path, mtime, size, sha1, reference_count, scanned_at)
+                    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(path) DO UPDATE SET
+                        mtime = excluded.mtime, size = excluded.size, sha1 = excluded.sha1,
+                        reference_count = excluded.reference_count, scanned_at = CURRENT_TIMESTAMP
+                ''', (path, mtime, size, sha1, len(references)))
+            conn.commit()
+
+        report['seconds'] = time.perf_counter() - start
+        print(f"Scansione di {root}: {report['files']} file, {report['scanned']} analizzati, "
+              f"{report['unchanged']} invariati, {report['removed']} rimossi, "
+              f"{report['references']} riferimenti in {report['seconds']:.2f} s")
+        return report
+
+    def usage_counts(self):
+        """Restituisce (categoria, chiave, numero di riferimenti, numero di file) per ogni definizione"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT c.name, e.key, COUNT(u.id), COUNT(DISTINCT u.path)
+                FROM entries e
+                JOIN categories c ON e.category_id = c.id
+                LEFT JOIN usage u ON u.canonical_key = e.canonical_key
+                GROUP BY e.id
+                ORDER BY c.name, e.sort_key, e.key
+            ''')
+            return cursor.fetchall()
+
+    def unused_entries(self):
+        """Definizioni mai citate nei sorgenti scansionati, come (categoria, chiave)"""
+        return [(category, key) for category, key, count, _ in self.usage_counts() if not count]
+
+    def undefined_keys(self):
+        """Chiavi citate nei sorgenti ma assenti dal progetto, con il numero di riferimenti"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT u.key, COUNT(*) FROM usage u
+                WHERE u.canonical_key NOT IN (SELECT canonical_key FROM entries)
+                GROUP BY u.canonical_key
+                ORDER BY u.canonical_key
+            ''')
+            return cursor.fetchall()
+
+    def references(self, key):
+        """Posizioni in cui una chiave è citata, come (file, riga, comando)"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT path, line, command FROM usage
+                WHERE canonical_key = ?
+                ORDER BY path, line
+            ''', (canonical_key(key),))
+            return cursor.fetchall()
+
+
+class UsageDialog:
+    """Finestra con l'uso delle definizioni nei sorgenti del documento"""
+    def __init__(self, parent, db_path, scanner=None):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Uso delle definizioni")
+        self.window.geometry("700x450")
+        self.window.transient(parent)
+        self.scanner = scanner or UsageScanner(db_path)
+        self._result = None
+
+        self._create_widgets()
+        self._update_list()
+
+    def _create_widgets(self):
+        main_frame = ttk.Frame(self.window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        top_frame = ttk.Frame(main_frame)
+        top_frame.pack(fill=tk.X)
+        self.scan_button = ttk.Button(top_frame, text="Scansiona cartella...", command=self._scan)
+        self.scan_button.pack(side=tk.LEFT)
+        self.unused_only = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_frame, text="Solo non usate", variable=self.unused_only,
+                        command=self._update_list).pack(side=tk.LEFT, padx=10)
+
+        columns = ('Categoria', 'Chiave', 'Riferimenti', 'File')
+        self.tree = ttk.Treeview(main_frame, columns=columns, show='headings', height=15)
+        widths = {'Categoria': 200, 'Chiave': 200, 'Riferimenti': 100, 'File': 80}
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=widths[col])
+        self.tree.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        self.tree.bind('<Double-1>', self._show_references)
+
+        self.status_var = tk.StringVar()
+        ttk.Label(main_frame, textvariable=self.status_var).pack(anchor=tk.W, pady=(5, 0))
+
+    def _update_list(self):
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        rows = self.scanner.usage_counts()
+        unused = sum(1 for row in rows if not row[2])
+        for row in rows:
+            if self.unused_only.get() and row[2]:
+                continue
+            self.tree.insert('', 'end', values=row)
+        self.status_var.set(f"{len(rows)} definizioni, {unused} non usate, "
+                            f"{len(self.scanner.undefined_keys())} chiavi citate ma non definite")
+
+    def _scan(self):
+        directory = filedialog.askdirectory(parent=self.window,
+                                            title="Cartella dei sorgenti del documento")
+        if not directory:
+            return
+        self.scan_button.state(['disabled'])
+        self.status_var.set("Scansione in corso...")
+
+        def worker():
+            try:
+                self._result = ('done', self.scanner.scan(directory))
+            except Exception as e:
+                # Anche BrokenProcessPool e simili: il pulsante va riattivato comunque
+                self._result = ('error', str(e))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.window.after(100, self._poll_scan)
+
+    def _poll_scan(self):
+        if not self.window.winfo_exists():
+            return
+        if self._result is None:
+            self.window.after(100, self._poll_scan)
+            return
+        kind, value = self._result
+        self._result = None
+        self.scan_button.state(['!disabled'])
+        if kind == 'error':
+            messagebox.showerror("Errore", value, parent=self.window)
+            return
+        self._update_list()
+        self.status_var.set(self.status_var.get() +
+                            f" - {value['files']} file, {value['scanned']} analizzati "
+                            f"in {value['seconds']:.2f} s")
+
+    def _show_references(self, event):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        key = self.tree.item(selection[0])['values'][1]
+        references = self.scanner.references(str(key))
+        if not references:
+            messagebox.showinfo("Riferimenti", f"'{key}' non è citata nei sorgenti scansionati",
+                                parent=self.window)
+            return
+        lines = [f"{path}:{line}  \\{command}" for path, line, command in references[:30]]
+        if len(references) > 30:
+            lines.append(f"... altri {len(references) - 30}")
+        messagebox.showinfo(f"Riferimenti a {key}", '\n'.join(lines), parent=self.window)